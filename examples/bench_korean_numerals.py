@@ -0,0 +1,108 @@
+"""
+한글 수사 → 숫자 변환 정확도 코퍼스 + 마이크로 벤치마크.
+
+기존 GroqClient._korean_numbers_to_digits(str.replace 55회, 순서 의존)와
+src/utils/korean_numerals.korean_numerals_to_digits(트라이 한 번 훑기 + 단어 경계)를 비교한다.
+각 문장에서 뽑힌 숫자 목록이 기대값과 같은지 보고, 같은 입력으로 속도를 잰다.
+실행: python examples/bench_korean_numerals.py  (프로젝트 루트에서)
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.korean_numerals import korean_numerals_to_digits
+
+_LEGACY_TABLE = [
+    ("십삼", " 13 "), ("십이", " 12 "), ("십일", " 11 "), ("십구", " 19 "), ("십팔", " 18 "),
+    ("십칠", " 17 "), ("십육", " 16 "), ("십오", " 15 "), ("십사", " 14 "),
+    ("열셋", " 13 "), ("열둘", " 12 "), ("열하나", " 11 "), ("열한", " 11 "), ("열아홉", " 19 "), ("열여덟", " 18 "),
+    ("열일곱", " 17 "), ("열여섯", " 16 "), ("열다섯", " 15 "), ("열넷", " 14 "),
+    ("스무아홉", " 29 "), ("스무여덟", " 28 "), ("스무일곱", " 27 "), ("스무여섯", " 26 "),
+    ("스무다섯", " 25 "), ("스무넷", " 24 "), ("스무셋", " 23 "), ("스무둘", " 22 "), ("스무하나", " 21 "),
+    ("스물", " 20 "), ("스무", " 20 "), ("이십", " 20 "), ("삼십", " 30 "), ("사십", " 40 "),
+    ("오십", " 50 "), ("육십", " 60 "), ("칠십", " 70 "),
+    ("하나", " 1 "), ("둘", " 2 "), ("셋", " 3 "), ("넷", " 4 "), ("다섯", " 5 "),
+    ("여섯", " 6 "), ("일곱", " 7 "), ("여덟", " 8 "), ("아홉", " 9 "), ("열", " 10 "),
+    ("일", " 1 "), ("이", " 2 "), ("삼", " 3 "), ("사", " 4 "), ("오", " 5 "),
+    ("육", " 6 "), ("칠", " 7 "), ("팔", " 8 "), ("구", " 9 "), ("십", " 10 "),
+]
+
+
+def legacy_korean_numbers_to_digits(text: str) -> str:
+    """기존 구현 (비교 기준)."""
+    if not text or not text.strip():
+        return text
+    s = " " + (text or "") + " "
+    for k, v in _LEGACY_TABLE:
+        s = s.replace(k, v)
+    return s
+
+
+# (문장, 기대 숫자 목록)
+CORPUS = [
+    ("일 십삼 오십", [1, 13, 50]),
+    ("하나 다섯 십삼", [1, 5, 13]),
+    ("이십일 삼십 사십오", [21, 30, 45]),
+    ("칠십팔번이요", [78]),
+    ("삼십사 삼십오 오십육", [34, 35, 56]),
+    ("스물하나랑 서른둘", [21, 32]),
+    ("열한 번", [11]),
+    ("일곱 여덟 아홉", [7, 8, 9]),
+    ("일흔여덟", [78]),
+    ("육십칠 번", [67]),
+    ("일이삼", [1, 2, 3]),
+    ("하나다섯", [1, 5]),
+    ("3 17 45", [3, 17, 45]),
+    ("34번 칠번 하나", [34, 7, 1]),
+    ("오번이랑 구번", [5, 9]),
+    # 일반 단어 속 글자는 숫자가 아님
+    ("사랑해요", []),
+    ("오늘 운세 봐주세요", []),
+    ("이제 골라볼게요", []),
+    ("구독 눌렀어요", []),
+    ("삼성 폰 써요", []),
+    ("이번에는 3 4 5", [3, 4, 5]),
+    ("이번 주 연애운", []),
+    ("칠칠맞게 굴지 마", []),
+    ("열어봐요", []),
+    ("일어나서 할게요", []),
+    ("사십오 일 이", [45, 1, 2]),
+    ("타로 보고 싶어요", []),
+    ("육개장 먹었어", []),
+    ("팔로우 했어요 12번", [12]),
+    ("오 좋아요 7번", [7]),
+]
+
+
+def _numbers(converted: str) -> list:
+    return [int(x) for x in re.findall(r"\d+", converted or "")]
+
+
+def main() -> None:
+    ok_old = ok_new = 0
+    for text, expected in CORPUS:
+        old = _numbers(legacy_korean_numbers_to_digits(text))
+        new = _numbers(korean_numerals_to_digits(text))
+        ok_old += old == expected
+        ok_new += new == expected
+        if new != expected or old != expected:
+            mark = "OK " if new == expected else "ERR"
+            print(f"  [{mark}] {text!r}: 기대 {expected}, 기존 {old}, 신규 {new}")
+    print(f"정확도: 기존 {ok_old}/{len(CORPUS)}, 신규 {ok_new}/{len(CORPUS)}")
+
+    texts = [t for t, _ in CORPUS]
+    n = 2000
+    t_old = timeit.timeit(lambda: [legacy_korean_numbers_to_digits(t) for t in texts], number=n)
+    t_new = timeit.timeit(lambda: [korean_numerals_to_digits(t) for t in texts], number=n)
+    per = n * len(texts)
+    print(f"기존: {t_old / per * 1e6:.1f} µs/문장, 신규: {t_new / per * 1e6:.1f} µs/문장")
+    if ok_new != len(CORPUS):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+TTS 텍스트 정규화 마이크로 벤치마크 + 기존 구현과의 출력 일치 확인.
+
+기존 text_for_tts_numbers(자모 re.sub 6회 + 'N번' 78회 + 'N개' 10회)와
+src/tts/text_normalizer.normalize_for_tts(단일 패스)를 같은 입력으로 비교한다.
+실행: python examples/bench_tts_normalizer.py  (프로젝트 루트에서)
+"""
+
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.tts.text_normalizer import normalize_for_tts
+
+_NUM_KOR = (
+    "", "일", "이", "삼", "사", "오", "육", "칠", "팔", "구",
+    "십", "십일", "십이", "십삼", "십사", "십오", "십육", "십칠", "십팔", "십구",
+    "이십", "이십일", "이십이", "이십삼", "이십사", "이십오", "이십육", "이십칠", "이십팔", "이십구",
+    "삼십", "삼십일", "삼십이", "삼십삼", "삼십사", "삼십오", "삼십육", "삼십칠", "삼십팔", "삼십구",
+    "사십", "사십일", "사십이", "사십삼", "사십사", "사십오", "사십육", "사십칠", "사십팔", "사십구",
+    "오십", "오십일", "오십이", "오십삼", "오십사", "오십오", "오십육", "오십칠", "오십팔", "오십구",
+    "육십", "육십일", "육십이", "육십삼", "육십사", "육십오", "육십육", "육십칠", "육십팔", "육십구",
+    "칠십", "칠십일", "칠십이", "칠십삼", "칠십사", "칠십오", "칠십육", "칠십칠", "칠십팔",
+)
+_NUM_KOR_CNT = ("", "한", "두", "세", "네", "다섯", "여섯", "일곱", "여덟", "아홉", "열")
+
+
+def legacy_text_for_tts_numbers(text: str) -> str:
+    """기존 구현 (비교 기준)."""
+    if not text or not text.strip():
+        return text
+    s = text
+    s = re.sub(r"ㅋ+", "", s)
+    s = re.sub(r"ㅎ+", "", s)
+    s = re.sub(r"ㄷㄷ", "", s)
+    s = re.sub(r"ㅠ+", "", s)
+    s = re.sub(r"ㅜ+", "", s)
+    s = re.sub(r"ㅡ+", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    if not s:
+        return "."
+    for n in range(78, 0, -1):
+        s = re.sub(rf"(?<!\d){n}(?!\d)\s*번", f"{_NUM_KOR[n]} 번", s)
+    for n in range(10, 0, -1):
+        s = re.sub(rf"(?<!\d){n}(?!\d)\s*개", f"{_NUM_KOR_CNT[n]} 개", s)
+    return s
+
+
+FIXED_CASES = [
+    "이번 타로 끝났어요. 아까 타로 요청하셨던 분 다시 요청해 주세요.",
+    "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요.",
+    "1번부터 78번까지 번호 3개만 골라주세요.",
+    "34번, 35번, 56번 선택하셨네요.",
+    "7 번이랑 12번 그리고 78번!",
+    "ㅋㅋㅋㅋ 그거 완전 웃기다ㅎㅎ",
+    "ㄷㄷㄷ 대박 ㅠㅠ",
+    "ㅋㅋㅋ",
+    "ㄷㅋㄷ",
+    "  여러   공백   ",
+    "5개 중에 10개, 그리고 1 개",
+    "",
+    "   ",
+]
+
+
+def _random_legacy_case(rng: random.Random) -> str:
+    """기존 구현이 다루는 입력만으로 구성 (숫자는 1~78번 / 1~10개 형태로만)."""
+    words = ["오늘", "타로", "번호", "골라", "주세요", "ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㄷㄷ", "ㅡㅡ", "좋아요", "!", "?", "~"]
+    parts = []
+    for _ in range(rng.randint(1, 12)):
+        r = rng.random()
+        if r < 0.2:
+            parts.append(f"{rng.randint(1, 78)}{' ' * rng.randint(0, 2)}번")
+        elif r < 0.3:
+            parts.append(f"{rng.randint(1, 10)}{' ' * rng.randint(0, 1)}개")
+        else:
+            parts.append(rng.choice(words))
+    return (" " if rng.random() < 0.7 else "").join(parts)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    corpus = FIXED_CASES + [_random_legacy_case(rng) for _ in range(2000)]
+    mismatches = [(c, legacy_text_for_tts_numbers(c), normalize_for_tts(c)) for c in corpus
+                  if legacy_text_for_tts_numbers(c) != normalize_for_tts(c)]
+    print(f"일치 확인: {len(corpus) - len(mismatches)}/{len(corpus)}")
+    for c, old, new in mismatches[:10]:
+        print(f"  불일치: {c!r}\n    기존: {old!r}\n    신규: {new!r}")
+
+    sample = FIXED_CASES[:5]
+    n = 2000
+    t_old = timeit.timeit(lambda: [legacy_text_for_tts_numbers(c) for c in sample], number=n)
+    t_new = timeit.timeit(lambda: [normalize_for_tts(c) for c in sample], number=n)
+    per = n * len(sample)
+    print(f"기존: {t_old / per * 1e6:.1f} µs/문장, 신규: {t_new / per * 1e6:.1f} µs/문장, {t_old / max(t_new, 1e-9):.1f}배")
+
+    print("\n확장 예시:")
+    for c in ("10000원 후원 감사합니다!", "1,500원 후원", "3만원 후원", "2026-10-19 일정", "10월 9일에 봐요",
+              "오후 3시에 12명 모였어요", "확률 50%", "3.5점", "AI랑 TTS 테스트 OK", "010-1234-5678"):
+        print(f"  {c!r} → {normalize_for_tts(c)!r}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
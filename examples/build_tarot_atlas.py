@@ -0,0 +1,43 @@
+"""
+타로 카드 이미지를 WebP 스프라이트 아틀라스로 빌드 (assets/tarot/atlas/).
+
+카드 이미지를 바꾸거나 새로 받았을 때 한 번 실행. 아틀라스가 없으면 /tarot 오버레이는
+기존처럼 카드별 PNG를 쓴다 (페이지 로드 때 미리 받아 둠).
+실행: python examples/build_tarot_atlas.py [--width 256] [--quality 85]  (프로젝트 루트에서, Pillow 필요)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.overlay.tarot_atlas import (
+    ATLAS_DIRNAME,
+    DEFAULT_CARD_SIZE,
+    DEFAULT_QUALITY,
+    TAROT_ASSETS_DIR,
+    build_atlas,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="타로 카드 WebP 아틀라스 빌드")
+    parser.add_argument("--width", type=int, default=DEFAULT_CARD_SIZE[0], help="카드 한 장 가로(px). 세로는 2:3 비율")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="WebP 품질 (0~100)")
+    args = parser.parse_args()
+
+    card_size = (args.width, args.width * 3 // 2)
+    try:
+        index = build_atlas(card_size=card_size, quality=args.quality)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    total = sum(s["bytes"] for s in index["sheets"])
+    print(f"프레임 {len(index['frames'])}장 → 시트 {len(index['sheets'])}장, {total / 1024:.0f} KB")
+    for s in index["sheets"]:
+        print(f"  {TAROT_ASSETS_DIR / ATLAS_DIRNAME / s['file']} ({s['w']}x{s['h']}, {s['bytes'] / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,22 @@
 실행: python examples/chzzk_groq_example.py  (프로젝트 루트에서)
 
 - 채팅은 큐에만 쌓고, 말하기가 끝난 뒤에만 쌓인 채팅을 한꺼번에 처리합니다.
-- Groq가 도배/스팸을 걸러내고 비슷한 내용을 묶어 답변 1개만 생성합니다 (한 문장이 길어도 됨).
+- 큐는 후원 > 방장 > 역할(매니저) > 일반 순 우선순위. CHAT_QUEUE_MAX_BATCH(기본 20)개까지만 한 배치로 넘깁니다.
+- 큐 전체 상한 CHAT_QUEUE_MAX_SIZE(기본 300), 초과 시 CHAT_QUEUE_SHED_POLICY로 버림. 메트릭: http://127.0.0.1:8765/api/metrics
+- 큐에 넣기 전 로컬 사전 필터(src/chat/prefilter.py)가 봇/스팸·중복·자모 도배·사용자별 속도 초과를 거릅니다.
+- Groq가 남은 도배/스팸을 걸러내고 비슷한 내용을 묶어 답변 1개만 생성합니다 (한 문장이 길어도 됨).
 - 대화 히스토리(토큰 기반 + 요약 + RAG용 백업)를 유지합니다.
+- 타로 종료·대기·번호 재요청 같은 고정 멘트는 시작 시 미리 합성해 cache/tts_audio에 두고 바로 재생합니다 (TTS_AUDIO_CACHE=0 으로 끔).
 립싱크: .env에 TTS_OUTPUT_DEVICE=VB-Audio Virtual Cable 등으로 TTS 출력을 가상 케이블로 두고, VTS 오디오 입력을 해당 장치로 설정.
 Colab TTS: .env에 TTS_REMOTE_URL=https://xxx.ngrok-free.app 설정 시 TTS를 Colab에서 원격 실행. docs/COLAB_TTS.md 참고.
 수동 백업: history/DO_BACKUP 파일을 만들면 다음 채팅 처리 시점에 history/backups/ 에 타임스탬프 백업 후 삭제됩니다.
 방송 오버레이: 채팅/대사를 OBS에 표시하려면 OBS에서 브라우저 소스 추가 → URL에 http://127.0.0.1:8765/ 입력. 타로 전용 오버레이는 http://127.0.0.1:8765/tarot. 포트 변경 시 .env에 OVERLAY_PORT=8765 설정.
 타로: 시청자가 "타로 봐줘" 등으로 요청하면 1~78번 중 N장 선택 → 해석·시각화. .env TAROT_ENABLED=0 또는 false 로 두면 당일 타로 비활성화(요청 시 거절). TAROT_SELECT_TIMEOUT_SEC=300 (기본 5분).
+  번호를 고르는 동안 질문 기준 해석 틀(그래프 종류·항목·도입 문장)을 미리 만들고, 번호가 확정되면 확인 멘트 TTS와 해석 호출을 동시에 진행합니다.
+미리 답하기: 일반 채팅 답변을 재생하는 동안 그새 쌓인 채팅으로 다음 답변(LLM+TTS)을 미리 만들어 두고, 재생이 끝나면 바로 이어 말합니다.
+  다음 채팅은 배치 정책대로 재생이 끝나거나 목표 개수에 닿을 때까지 모읍니다. 그 뒤 온 채팅은 다음 배치로 넘기고, 타로가 시작됐을 때만 버리고 다시 만듭니다.
+  타로 진행 중에는 하지 않음. SPECULATIVE_REPLY=0 으로 끔.
+감정 먼저: 답변을 스트리밍으로 받아 emotion이 나오는 즉시(모델이 늦으면 첫 문장으로 로컬 분류) VTS 포즈와 TTS 참조 음성을 준비합니다. REPLY_EARLY_EMOTION=0 으로 끔.
 """
 
 import asyncio
@@ -21,18 +30,21 @@ import random
 import sys
 import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from dotenv import load_dotenv
 
-from src.chat import ChatClientFactory, ChatMessage
-from src.ai import GroqClient, AIResponse, ChatHistory
+from src.chat import BatchPolicy, ChatClientFactory, ChatMessage, ChatPrefilter, PriorityChatQueue
+from src.ai import GroqClient, AIResponse, ChatHistory, ViewerMemory
+from src.ai.groq_client import TAROT_WAIT_FALLBACK
+from src.ai.tarot_numbers import TAROT_REASK_DEFAULT, TAROT_REASK_DUPLICATE
 from src.tts import TTSService, text_for_tts_numbers
 from src.vtuber import VTSClient
-from src.utils import setup_logging
+from src.utils import metrics, setup_logging
 from src.overlay.state import (
     overlay_state,
     MAX_VIEWER_MESSAGES,
@@ -49,11 +61,11 @@ tts_pipeline_logger = logging.getLogger("src.tts.pipeline")
 
 
 def _tts_synthesize_only(
-    tts_service: TTSService, text: str, emotion: str, language: str = "Korean"
+    tts_service: TTSService, text: str, emotion: str, language: str = "Korean", out_path: Optional[Path] = None
 ):
     """동기: TTS만 합성해 파일로 저장(재생 안 함). asyncio.to_thread에서 호출. language로 원격 TTS 한국어 강제."""
     return tts_service.synthesize_to_file(
-        text, emotion=emotion, language=language, play=False
+        text, emotion=emotion, out_path=out_path, language=language, play=False
     )
 
 
@@ -141,6 +153,16 @@ async def idle_worker(
 
 
 TAROT_END_ANNOUNCE = "이번 타로 끝났어요. 아까 타로 요청하셨던 분 다시 요청해 주세요."
+TAROT_TIMEOUT_MSG = "시간이 지나서 이번 타로는 마무리할게요."
+
+
+def _fixed_phrases() -> List[str]:
+    """매번 같은 문장으로 읽는 멘트. 시작 시 TTS 캐시에 미리 합성해 두면 바로 재생됨."""
+    phrases = [TAROT_END_ANNOUNCE, TAROT_TIMEOUT_MSG, TAROT_WAIT_FALLBACK]
+    for n in range(1, 6):
+        phrases.append(TAROT_REASK_DEFAULT.format(n=n))
+        phrases.append(TAROT_REASK_DUPLICATE.format(n=n))
+    return phrases
 
 
 async def tarot_timeout_worker(tts_service: Optional[TTSService] = None):
@@ -178,25 +200,151 @@ async def tarot_timeout_worker(tts_service: Optional[TTSService] = None):
                         logger.debug("타로 만료 안내 TTS 실패: %s", e)
 
 
+def _tarot_session_key(tarot: dict) -> tuple:
+    """진행 중 타로 한 판을 구분하는 키 (요청자, 질문, 선택 마감 시각)."""
+    return (tarot.get("requester_id"), tarot.get("question"), tarot.get("select_deadline_ts"))
+
+
+async def _tarot_interpretation(
+    groq_client: GroqClient,
+    question: str,
+    chosen: List[dict],
+    prefetch_task: Optional[asyncio.Task],
+) -> Optional[dict]:
+    """선택 중에 미리 만든 틀(있으면)을 받아 해석 호출. 확인 멘트 TTS와 동시에 돌림."""
+    frame = None
+    if prefetch_task is not None:
+        try:
+            frame = await prefetch_task
+        except Exception as e:
+            logger.debug("타로 틀 미리 생성 결과 없음: %s", e)
+    return await asyncio.to_thread(groq_client.get_tarot_interpretation, question, chosen, frame)
+
+
+@dataclass
+class _Speculation:
+    """재생 중에 미리 만드는 다음 답변. items는 큐에서 가져간 시점에 채워짐 (None이면 아직 채팅 대기 중)."""
+    out_path: Path
+    task: Optional["asyncio.Task[Any]"] = None
+    items: Optional[List[Tuple[ChatMessage, int]]] = None
+
+    def drop(self) -> None:
+        """결과를 버림. 이미 끝나 예외가 남았으면 조용히 회수 (never retrieved 경고 방지)."""
+        if self.task is None:
+            return
+        self.task.cancel()
+        self.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+def _speculation_enabled() -> bool:
+    return os.environ.get("SPECULATIVE_REPLY", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _early_emotion_enabled() -> bool:
+    return os.environ.get("REPLY_EARLY_EMOTION", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _early_emotion_hook(
+    loop: asyncio.AbstractEventLoop, vts_client: Optional[VTSClient], tts_service: TTSService, applied: List[Optional[str]]
+):
+    """
+    reply_batch 스트리밍 중 emotion이 정해지면 (LLM 스레드에서) 불릴 콜백. 답변 생성이 끝나길 기다리지 않고
+    VTS 포즈와 TTS 참조 음성 준비를 바로 시작. applied[0]에 적용한 감정을 남겨 나중에 같은 포즈를 다시 보내지 않음.
+    """
+
+    def prepare(emotion: str) -> None:
+        try:
+            tts_service.prepare_voice(emotion)
+        except Exception as e:
+            logger.debug("TTS 참조 음성 미리 준비 실패: %s", e)
+
+    def on_emotion(emotion: str) -> None:
+        applied[0] = emotion
+        logger.info("답변 감정 먼저 결정: %s", emotion)
+        loop.call_soon_threadsafe(loop.run_in_executor, None, prepare, emotion)
+        if vts_client:
+            asyncio.run_coroutine_threadsafe(vts_client.set_emotion(emotion), loop)
+
+    return on_emotion
+
+
+async def _speculate_next_reply(
+    spec: _Speculation,
+    queue: PriorityChatQueue,
+    batch_policy: BatchPolicy,
+    groq_client: GroqClient,
+    tts_service: TTSService,
+    chat_history: ChatHistory,
+    viewer_memory: Optional[ViewerMemory],
+    tarot_enabled: bool,
+    search_enabled: bool,
+    is_playing: Callable[[], bool],
+):
+    """
+    재생 중 백그라운드: 배치 정책대로 채팅을 모아(재생 중이라 busy_max_wait까지, 목표 개수·토큰 예산에 닿으면 바로)
+    큐에서 가져가고, 답변 생성 + 첫 답변 TTS까지 미리 함.
+    히스토리·시청자 기억은 건드리지 않음 (확정할 때 reply_worker가 반영). 반환: (replies, {id(reply): wav 경로}).
+    """
+    await batch_policy.wait_ready(queue, queue.max_batch, is_busy=is_playing)
+    if overlay_state.get("tarot") is not None:
+        return None
+    spec.items = batch_policy.take_now(queue, queue.max_batch)
+    if not spec.items:
+        return None
+    metrics.incr("speculation.started")
+    msgs = [m for m, _ in spec.items]
+    # 확정 전이라 히스토리에 아직 없는 이번 채팅을 context 끝에 붙여, 평소 경로와 같은 입력으로 만듦
+    context = chat_history.get_context_messages(" ".join((m.message or "") for m in msgs))
+    context = context + [{"role": "user", "content": f"{m.user or '?'}: {m.message or ''}"} for m in msgs]
+    notes = (viewer_memory.notes_for(msgs) or None) if viewer_memory is not None else None
+    replies = await asyncio.to_thread(
+        groq_client.reply_batch, msgs, context, None, tarot_enabled, search_enabled, notes
+    )
+    paths = {}
+    first = next((r for r in replies if (r.response or "").strip()), None)
+    if first is not None:
+        tts_input = text_for_tts_numbers(getattr(first, "tts_text", None) or first.response)
+        if tts_input.strip() and tts_input != ".":
+            try:
+                paths[id(first)] = await asyncio.to_thread(
+                    _tts_synthesize_only, tts_service, tts_input, first.emotion, "Korean", spec.out_path
+                )
+            except Exception as e:
+                logger.debug("미리 답하기 TTS 실패 (확정 시 다시 합성): %s", e)
+    return replies, paths
+
+
 async def reply_worker(
-    queue: asyncio.Queue,
+    queue: PriorityChatQueue,
     groq_client: GroqClient,
     tts_service: TTSService,
     vts_client: Optional[VTSClient],
     chat_history: ChatHistory,
     is_speaking: List[bool],
     channel_id: Optional[str] = None,
+    viewer_memory: Optional[ViewerMemory] = None,
 ):
     """
     큐에서 메시지를 꺼내, 말 끝난 뒤에만 일괄 처리.
-    1) 한 개 get(대기) → 나머지 전부 drain
-    2) 히스토리에 user 추가, flush_summary, context 획득
+    1) 한 개 get(대기) → 우선순위(후원 > 방장 > 역할 > 일반) 순으로 최대 배치 크기까지 꺼냄
+    2) 히스토리에 user 추가, flush_summary, context 획득 (+ 이번 배치 시청자 메모)
     3) reply_batch(합치기/걸러내기) → 답변 1개
     4) 해당 답변: 히스토리에 assistant 추가 → TTS+재생 → VTS 감정
     5) flush_summary 한 번 더 후 반복
+    일반 채팅 답변을 재생하는 동안에는 다음 배치를 미리 만들어 두고(_speculate_next_reply), 다음 루프에서 확정함 (타로가 시작됐으면 버리고 합쳐 다시 만듦).
     """
     root = Path(__file__).resolve().parent.parent
     backup_trigger = root / "history" / "DO_BACKUP"
+    # 타로 세션 키 → 해석 틀 미리 생성 Task. overlay_state는 /api/state로 JSON 직렬화되므로 Task는 여기 보관
+    tarot_prefetch: dict = {}
+    # 첫 채팅 뒤 채팅 속도에 맞춰 잠깐 더 모아서 LLM 호출 수를 줄임 (최대 대기 CHAT_BATCH_MAX_WAIT_SEC)
+    batch_policy = BatchPolicy()
+    # 재생 중 미리 만드는 다음 답변 (한 번에 하나). wav는 두 파일을 번갈아 써서 재생 중인 파일을 덮지 않음
+    spec: Optional[_Speculation] = None
+    spec_count = 0
+    spec_dir = root / "assets" / "voice_samples"  # latest_reply.wav 옆
+    # 재생 끝 → 다음 재생 시작 간격(말이 끊긴 시간). 재생이 끝날 때 채팅이 밀려 있었던 경우만 잼
+    last_play_end: Optional[float] = None
     while True:
         try:
             if backup_trigger.exists():
@@ -205,14 +353,30 @@ async def reply_worker(
                     backup_trigger.unlink()
                 except Exception as be:
                     logger.warning("수동 백업 실패: %s", be)
-            first = await queue.get()
-            pending: List[Tuple[ChatMessage, int]] = [first]
-            while True:
-                try:
-                    item = queue.get_nowait()
-                    pending.append(item)
-                except asyncio.QueueEmpty:
-                    break
+            spec_result = None
+            prev_spec, spec = spec, None
+            if prev_spec is not None and prev_spec.items:
+                # 이미 채팅을 가져가 생성을 시작한 답은 그대로 확정 (그새 온 채팅은 다음 배치, 후원은 우선순위로 맨 앞).
+                # 버리면 Groq 호출이 두 번이 되고 to_thread 생성은 취소돼도 끝까지 돈다. 타로가 시작됐을 때만 다시 만듦
+                if overlay_state.get("tarot") is not None:
+                    # 타로 없이 만든 답이라 맞지 않음 → 버리고 합쳐서 평소 경로(타로 분기)로
+                    prev_spec.drop()
+                    room = max(0, queue.max_batch - len(prev_spec.items))
+                    pending = prev_spec.items + batch_policy.take_now(queue, room)
+                    metrics.incr("speculation.merged")
+                else:
+                    pending = prev_spec.items
+                    try:
+                        spec_result = await prev_spec.task
+                    except Exception as e:
+                        logger.warning("미리 만든 답변 실패, 다시 생성: %s", e)
+                    metrics.incr("speculation.committed" if spec_result else "speculation.failed")
+            else:
+                if prev_spec is not None:
+                    prev_spec.drop()  # 아직 채팅을 안 가져갔으면 평소대로
+                pending = await queue.get_batch(policy=batch_policy)
+            pending: List[Tuple[ChatMessage, int]]
+            overlay_state["chat_queue_stats"] = queue.stats()
 
             pending_msgs = [m for m, _ in pending]
             pending_ids = [oid for _, oid in pending]
@@ -311,7 +475,7 @@ async def reply_worker(
                             groq_client.generate_tarot_wait_reply, msg
                         )
                         if not reply_text:
-                            reply_text = "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요."
+                            reply_text = TAROT_WAIT_FALLBACK
                         ai_info(
                             "assistant_reply: emotion=neutral action=tarot_wait_reply response=%r tts_text=%r",
                             reply_text,
@@ -355,7 +519,7 @@ async def reply_worker(
                 deadline = tarot.get("select_deadline_ts") or 0
                 if time.time() > deadline:
                     overlay_state["tarot"] = None
-                    timeout_msg = "시간이 지나서 이번 타로는 마무리할게요."
+                    timeout_msg = TAROT_TIMEOUT_MSG
                     ai_info(
                         "assistant_reply: emotion=neutral action=tarot_timeout response=%r tts_text=%r",
                         timeout_msg,
@@ -476,6 +640,15 @@ async def reply_worker(
                         chosen = [deck[n - 1] for n in numbers[:spread_count] if 1 <= n <= len(deck)]
                         logger.info("타로 번호 확정: %s, 덱 %s장, chosen %s장", numbers[:spread_count], len(deck), len(chosen))
                         if len(chosen) == spread_count:
+                            # 해석 호출을 먼저 시작하고, 확인 멘트 TTS는 그동안 재생
+                            question = tarot.get("question") or ""
+                            numbers_ts = time.perf_counter()
+                            interp_task = asyncio.create_task(
+                                _tarot_interpretation(
+                                    groq_client, question, chosen, tarot_prefetch.pop(_tarot_session_key(tarot), None)
+                                )
+                            )
+                            tarot_prefetch.clear()
                             # 선택 확인 멘트가 있으면 먼저 TTS (예: "9, 3, 1번 선택하셨네요")
                             confirm_ment = (selection.get("response") or "").strip()
                             if confirm_ment and any(k in confirm_ment for k in ("선택", "고르셨", "확인")):
@@ -507,10 +680,12 @@ async def reply_worker(
                                     tts_exc("tts_play_error: %s", e)
                                 finally:
                                     is_speaking[0] = False
-                            question = tarot.get("question") or ""
-                            result = await asyncio.to_thread(
-                                groq_client.get_tarot_interpretation, question, chosen
-                            )
+                            try:
+                                result = await interp_task
+                            except Exception as e:
+                                logger.warning("타로 해석 호출 실패: %s", e)
+                                result = None
+                            metrics.observe("tarot.interpretation_wait_sec", time.perf_counter() - numbers_ts)
                             if result:
                                 interp_tts = result.get("tts_text") or result["interpretation"]
                                 ai_info(
@@ -530,6 +705,8 @@ async def reply_worker(
                                     "danger_alert": result.get("danger_alert"),
                                 }
                                 chat_history.add_assistant_message(result["interpretation"])
+                                if viewer_memory is not None:
+                                    viewer_memory.record_tarot(requester_id, question, chosen)
                                 overlay_state.setdefault("assistant_messages", []).append({
                                     "message": result["interpretation"],
                                     "ts": time.time(),
@@ -660,18 +837,36 @@ async def reply_worker(
                 )
                 chat_history.add_user_message(m.user or "?", m.message or "")
 
+            viewer_notes = None
+            if viewer_memory is not None:
+                viewer_notes = viewer_memory.notes_for(pending_msgs) or None
+                viewer_memory.observe_many(pending_msgs)
             chat_history.flush_summary(groq_client)
-            context = chat_history.get_context_messages()
             tarot_state = overlay_state.get("tarot")
 
-            replies = await asyncio.to_thread(
-                groq_client.reply_batch,
-                pending_msgs,
-                context,
-                tarot_state,
-                tarot_enabled,
-                search_enabled,
-            )
+            spec_paths: dict = {}
+            early_emotion: List[Optional[str]] = [None]
+            if spec_result is not None:
+                # 재생 중에 미리 만든 답변 확정 (히스토리·시청자 기억은 바로 위에서 반영)
+                replies, spec_paths = spec_result
+            else:
+                context = chat_history.get_context_messages(" ".join((m.message or "") for m in pending_msgs))
+                # 답변을 스트리밍으로 받아 emotion이 먼저 나오면 포즈·참조 음성부터 준비 (REPLY_EARLY_EMOTION=0 으로 끔)
+                on_emotion = (
+                    _early_emotion_hook(asyncio.get_running_loop(), vts_client, tts_service, early_emotion)
+                    if _early_emotion_enabled()
+                    else None
+                )
+                replies = await asyncio.to_thread(
+                    groq_client.reply_batch,
+                    pending_msgs,
+                    context,
+                    tarot_state,
+                    tarot_enabled,
+                    search_enabled,
+                    viewer_notes,
+                    on_emotion,
+                )
             if not replies:
                 logger.info("답변 없음 (API 한도 429 또는 파싱 실패 시 위 Groq 로그 확인)")
 
@@ -728,14 +923,21 @@ async def reply_worker(
                             "select_deadline_ts": time.time() + timeout_sec,
                             "deck": build_deck(shuffle=True),
                         }
+                        # 시청자가 번호 고르는 동안 질문 기준 해석 틀(visual_type·labels·도입)을 미리 생성
+                        tarot_prefetch.clear()
+                        tarot_prefetch[_tarot_session_key(overlay_state["tarot"])] = asyncio.create_task(
+                            asyncio.to_thread(groq_client.prefetch_tarot_frame, question, spread_count)
+                        )
                 elif tarot_state and tarot_state.get("phase") == "asking_question":
                     # AI가 타로 액션 없이 답했으면 = 거절/모르겠음 판단 → 타로 해제
                     overlay_state["tarot"] = None
 
                 chat_tts = getattr(ai_response, "tts_text", None) or ai_response.response
                 tts_input = text_for_tts_numbers(chat_tts)
-                path = None
-                if tts_input.strip() and tts_input != ".":
+                path = spec_paths.get(id(ai_response))
+                if path:
+                    tts_info("tts_synthesize_done: path=%s speculative=1", path)
+                elif tts_input.strip() and tts_input != ".":
                     try:
                         tts_info(
                             "tts_synthesize_start: emotion=%s text=%r",
@@ -778,16 +980,28 @@ async def reply_worker(
                 if vts_client:
                     try:
                         await vts_client.set_mouse_position(0.7, -0.7)
-                        await vts_client.set_emotion(ai_response.emotion)
+                        if ai_response.emotion != early_emotion[0]:
+                            await vts_client.set_emotion(ai_response.emotion)
                     except Exception as vts_e:
                         logger.debug("VTS 포즈 실패: %s", vts_e)
                 if path:
                     try:
                         is_speaking[0] = True
                         tts_info("tts_play_start: path=%s", path)
+                        if last_play_end is not None:
+                            metrics.observe("reply.dead_air_sec", time.monotonic() - last_play_end)
                         play_task = asyncio.create_task(
                             asyncio.to_thread(tts_service.play_file, path)
                         )
+                        if spec is None and _speculation_enabled() and overlay_state.get("tarot") is None:
+                            spec_count += 1
+                            spec = _Speculation(out_path=spec_dir / f"spec_reply_{spec_count % 2}.wav")
+                            spec.task = asyncio.create_task(
+                                _speculate_next_reply(
+                                    spec, queue, batch_policy, groq_client, tts_service, chat_history,
+                                    viewer_memory, tarot_enabled, search_enabled, lambda t=play_task: not t.done(),
+                                )
+                            )
                         if vts_client:
                             await asyncio.sleep(0.5)
                             await _animate_look_back_to_center(
@@ -800,8 +1014,14 @@ async def reply_worker(
                         tts_exc("tts_play_error: %s", play_e)
                     finally:
                         is_speaking[0] = False
+                        backlog = not queue.empty() or (spec is not None and spec.items is not None)
+                        last_play_end = time.monotonic() if backlog else None
             chat_history.flush_summary(groq_client)
+            if viewer_memory is not None:
+                viewer_memory.flush()
         except asyncio.CancelledError:
+            if spec is not None:
+                spec.drop()
             break
         except Exception as e:
             logger.exception("reply_worker 오류: %s", e)
@@ -822,6 +1042,7 @@ async def main():
     groq_client = GroqClient()
     tts_service = TTSService()
     chat_history = ChatHistory()
+    viewer_memory = ViewerMemory() if (os.getenv("VIEWER_MEMORY_ENABLED") or "1").strip().lower() not in ("0", "false", "no") else None
     root = Path(__file__).resolve().parent.parent
     pose_config = root / "config" / "pose_mapping.json"
     vts_client = VTSClient() if pose_config.exists() else None
@@ -841,13 +1062,16 @@ async def main():
         logger.debug("오버레이 서버 미시작: %s", e)
 
     is_speaking: List[bool] = [False]
-    queue: asyncio.Queue = asyncio.Queue()
+    queue = PriorityChatQueue(channel_id=channel_id)
+    prefilter = ChatPrefilter(channel_id=channel_id)
     worker_task = asyncio.create_task(
         reply_worker(
-            queue, groq_client, tts_service, vts_client, chat_history, is_speaking, channel_id
+            queue, groq_client, tts_service, vts_client, chat_history, is_speaking, channel_id, viewer_memory
         )
     )
     tarot_timeout_task = asyncio.create_task(tarot_timeout_worker(tts_service))
+    # 고정 멘트 음성 미리 합성 (첫 재생부터 캐시 히트). 실패해도 방송 진행에는 영향 없음
+    prewarm_task = asyncio.create_task(asyncio.to_thread(tts_service.prewarm, _fixed_phrases()))
     idle_task: Optional[asyncio.Task] = None
     if vts_client:
         idle_task = asyncio.create_task(idle_worker(vts_client, is_speaking))
@@ -860,6 +1084,14 @@ async def main():
     def on_message(msg: ChatMessage):
         if overlay_state.get("ignore_streamer_chat") and _is_streamer(msg, channel_id):
             return
+        # 로컬 사전 필터: 스팸은 표시도 안 함, 중복·도배·속도 초과는 표시만 하고 AI에는 안 넘김
+        # 타로 주제·번호를 답하는 요청자의 짧은 채팅("3", "그만")은 다른 시청자와 겹쳐도 중복으로 버리지 않음
+        tarot = overlay_state.get("tarot") or {}
+        requester = tarot.get("requester_id") if tarot.get("phase") in ("asking_question", "selecting") else None
+        checked = prefilter.check(msg, exempt_user_id=requester or None)
+        if checked.is_spam:
+            return
+        msg = checked.message
         viewer_list = overlay_state.setdefault("viewer_messages", [])
         next_id = overlay_state.get("_next_id", 0) + 1
         overlay_state["_next_id"] = next_id
@@ -867,12 +1099,15 @@ async def main():
             "id": next_id,
             "user": str(getattr(msg, "user", None) or "?"),
             "message": str(getattr(msg, "message", None) or ""),
-            "processed": False,
+            "processed": not checked.accepted,
             "ts": time.time(),
         })
         if len(viewer_list) > MAX_VIEWER_MESSAGES:
             overlay_state["viewer_messages"] = viewer_list[-MAX_VIEWER_MESSAGES:]
+        if not checked.accepted:
+            return
         queue.put_nowait((msg, next_id))
+        overlay_state["chat_queue_stats"] = queue.stats()
 
     client = ChatClientFactory.create(
         platform="chzzk",
@@ -893,6 +1128,7 @@ async def main():
     finally:
         worker_task.cancel()
         tarot_timeout_task.cancel()
+        prewarm_task.cancel()
         if idle_task is not None:
             idle_task.cancel()
         try:
@@ -908,6 +1144,9 @@ async def main():
                 await idle_task
             except asyncio.CancelledError:
                 pass
+        chat_history.close()
+        if viewer_memory is not None:
+            viewer_memory.flush()
         await client.stop()
 
 
@@ -3,5 +3,6 @@
 from .models import AIResponse, VALID_EMOTIONS
 from .groq_client import GroqClient
 from .chat_history import ChatHistory
+from .viewer_memory import ViewerMemory
 
-__all__ = ["AIResponse", "VALID_EMOTIONS", "GroqClient", "ChatHistory"]
+__all__ = ["AIResponse", "VALID_EMOTIONS", "GroqClient", "ChatHistory", "ViewerMemory"]
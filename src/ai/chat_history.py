@@ -1,6 +1,8 @@
 """
 채팅 히스토리 관리 (PRD 4.5.2, 6.2.1)
 토큰 기반 슬라이딩 윈도우 + 요약 + RAG용 주기적 백업 + 수동 백업.
+최근 대화는 추가 전용 로그(history/log, message_log.py)에도 남겨 재시작 시 이어서 쓴다.
+요약·밀려난 대화는 BM25 기억 인덱스(memory_index.py)에 넣어 배치마다 관련 있는 것만 다시 꺼낸다.
 """
 
 from __future__ import annotations
@@ -8,9 +10,13 @@ from __future__ import annotations
 import json
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, List, Optional, TYPE_CHECKING
 
+from .memory_index import MemoryIndex, chunk_exchanges
+from .message_log import MessageLog
+
 if TYPE_CHECKING:
     from .groq_client import GroqClient
 
@@ -20,8 +26,15 @@ logger = logging.getLogger(__name__)
 DEFAULT_MAX_TOKENS = 3000
 DEFAULT_SUMMARY_THRESHOLD = 7000
 DEFAULT_SUMMARY_TOKENS = 2000  # 요약 시 잘라낼 오래된 분량
+# 기억 인덱스를 쓸 때 프롬프트에 싣는 요약은 최근 분량만 (나머지는 검색으로)
+DEFAULT_SUMMARY_CONTEXT_TOKENS = 1000
+DEFAULT_MEMORY_TOP_K = 3
+DEFAULT_MEMORY_MAX_TOKENS = 400
+# 프롬프트에 넣는 최근 대화의 시작점을 이 개수 단위로만 옮김 (프롬프트 캐시용)
+DEFAULT_WINDOW_STEP = 8
 
 
+@lru_cache(maxsize=4096)
 def count_tokens(text: str) -> int:
     """대략적인 토큰 수. tiktoken 있으면 사용, 없으면 len//4 근사."""
     if not text:
@@ -42,6 +55,7 @@ class ChatHistory:
     """
     토큰 기반 슬라이딩 윈도우 + 요약.
     요약 시 history/summaries/ 에 타임스탬프 백업 (RAG 연동 가능).
+    메시지는 history/log/ 에 한 줄씩 추가 기록하고, 시작 시 요약되지 않은 최근 대화를 max_tokens 만큼 복원.
     """
 
     def __init__(
@@ -52,7 +66,14 @@ class ChatHistory:
         history_dir: Optional[Path] = None,
         summary_file: str = "summary.json",
         summaries_dir: str = "summaries",
+        message_log: Optional[MessageLog] = None,
+        memory_index: Optional[MemoryIndex] = None,
     ):
+        """
+        message_log: 미지정 시 .env CHAT_LOG_ENABLED(기본 켬)이면 history/log 에 생성. 끄면 기존처럼 메모리만.
+        memory_index: 미지정 시 .env CHAT_MEMORY_ENABLED(기본 켬)이면 history/memory_index.json.
+            처음 만들 때 기존 summaries/ 백업을 색인. 끄면 요약 전체를 그대로 프롬프트에 실음.
+        """
         self.max_tokens = int(os.environ.get("CHAT_HISTORY_MAX_TOKENS") or max_tokens)
         self.summary_threshold = int(os.environ.get("CHAT_HISTORY_SUMMARY_THRESHOLD") or summary_threshold)
         self.summary_tokens = int(os.environ.get("CHAT_HISTORY_SUMMARY_TOKENS") or summary_tokens)
@@ -68,20 +89,72 @@ class ChatHistory:
         self.recent_messages: List[dict] = []  # {"role": "user"|"assistant", "content": "..."}
         self._current_tokens = 0
         self.summary_content = ""
+        # 로그 seq 기준: 이 번호 미만은 요약에 반영됨, recent_messages[0]의 seq
+        self._summarized_seq = 0
+        self._recent_first_seq = 0
         self._load_summary()
+        if message_log is None and (os.environ.get("CHAT_LOG_ENABLED") or "1").strip().lower() not in ("0", "false", "no"):
+            message_log = MessageLog(self.root / "log")
+        self.message_log = message_log
+        self._replay_log()
+
+        env = os.environ
+        self.summary_context_tokens = int(env.get("CHAT_SUMMARY_CONTEXT_TOKENS") or DEFAULT_SUMMARY_CONTEXT_TOKENS)
+        self.memory_top_k = int(env.get("CHAT_MEMORY_TOP_K") or DEFAULT_MEMORY_TOP_K)
+        self.memory_max_tokens = int(env.get("CHAT_MEMORY_MAX_TOKENS") or DEFAULT_MEMORY_MAX_TOKENS)
+        self.window_step = max(1, int(env.get("CHAT_WINDOW_STEP") or DEFAULT_WINDOW_STEP))
+        if memory_index is None and (env.get("CHAT_MEMORY_ENABLED") or "1").strip().lower() not in ("0", "false", "no"):
+            memory_index = MemoryIndex(self.root / "memory_index.json")
+            if len(memory_index) == 0:
+                memory_index.bootstrap_from_summaries(self.summaries_dir)
+        self.memory_index = memory_index
 
     def _load_summary(self) -> None:
         if self.summary_path.exists():
             try:
                 data = json.loads(self.summary_path.read_text(encoding="utf-8"))
                 self.summary_content = (data.get("summary") or "").strip()
+                self._summarized_seq = int(data.get("log_seq") or 0)
             except Exception as e:
                 logger.warning("요약 로드 실패: %s", e)
 
     def _save_summary(self) -> None:
-        data = {"summary": self.summary_content, "message_count": len(self.recent_messages)}
+        data = {
+            "summary": self.summary_content,
+            "message_count": len(self.recent_messages),
+            "log_seq": self._summarized_seq,
+        }
         self.summary_path.write_text(json.dumps(data, ensure_ascii=False, indent=0), encoding="utf-8")
 
+    def _replay_log(self) -> None:
+        """요약 이후의 로그 꼬리를 max_tokens 만큼만 읽어 recent_messages 복원."""
+        if self.message_log is None:
+            return
+        records = self.message_log.tail(self.max_tokens, min_seq=self._summarized_seq, count_tokens=count_tokens)
+        for rec in records:
+            content = rec.get("content") or ""
+            self.recent_messages.append({"role": rec.get("role") or "user", "content": content})
+            self._current_tokens += count_tokens(content)
+        self._recent_first_seq = records[0]["seq"] if records else self.message_log.next_seq
+        if records:
+            logger.info("대화 로그에서 최근 메시지 %d개 복원", len(records))
+
+    def _log(self, role: str, content: str) -> None:
+        if self.message_log is None:
+            return
+        try:
+            seq = self.message_log.append(role, content)
+        except OSError as e:
+            logger.warning("대화 로그 기록 실패: %s", e)
+            return
+        if len(self.recent_messages) == 1:
+            self._recent_first_seq = seq
+
+    def close(self) -> None:
+        """종료 시 로그 fsync 후 닫기."""
+        if self.message_log is not None:
+            self.message_log.close()
+
     def _backup_summary(self, summary_snapshot: str) -> Path:
         """RAG용 타임스탬프 백업 파일 생성."""
         from datetime import datetime
@@ -95,12 +168,14 @@ class ChatHistory:
         """user 메시지 추가 (닉네임: 내용 형식)."""
         text = f"{user_name}: {content}" if user_name else content
         self.recent_messages.append({"role": "user", "content": text})
+        self._log("user", text)
         self._current_tokens += count_tokens(text)
         self._maybe_summarize()
 
     def add_assistant_message(self, content: str) -> None:
         """assistant 메시지 추가."""
         self.recent_messages.append({"role": "assistant", "content": content})
+        self._log("assistant", content)
         self._current_tokens += count_tokens(content)
         self._maybe_summarize()
 
@@ -120,11 +195,13 @@ class ChatHistory:
             return
         to_summarize = self.recent_messages[:idx]
         self.recent_messages = self.recent_messages[idx:]
+        self._recent_first_seq += idx
         for m in to_summarize:
             self._current_tokens -= count_tokens(m.get("content", ""))
 
         # 요약 생성은 외부 GroqClient에 위임 (호출하는 쪽에서 groq_client 주입 후 호출)
         self._pending_summarize = to_summarize
+        self._pending_summarized_seq = self._recent_first_seq
 
     def flush_summary(self, groq_client: "GroqClient") -> None:
         """
@@ -135,7 +212,9 @@ class ChatHistory:
         if not pending:
             return
         del self._pending_summarize
+        self._summarized_seq = max(self._summarized_seq, getattr(self, "_pending_summarized_seq", 0))
         summary_text = groq_client.summarize(pending)
+        self._remember(pending, summary_text)
         if not summary_text:
             self.summary_content += "\n"
             return
@@ -147,20 +226,83 @@ class ChatHistory:
         self._backup_summary(self.summary_content)
         logger.info("요약 반영 및 백업 저장: %s", self.summaries_dir)
 
-    def get_context_messages(self) -> List[dict]:
-        """API에 넘길 messages (시스템 제외). 요약 + 최근 대화. 토큰 상한 유지."""
-        out: List[dict] = []
-        if self.summary_content:
-            out.append({"role": "system", "content": f"[이전 대화 요약] {self.summary_content}"})
+    def _remember(self, pending: List[dict], summary_text: str) -> None:
+        """요약 문단(줄 단위)과 밀려난 대화 묶음을 기억 인덱스에 추가."""
+        if self.memory_index is None:
+            return
+        lines = [ln.strip() for ln in (summary_text or "").splitlines() if ln.strip()]
+        self.memory_index.add_many(lines, kind="summary")
+        self.memory_index.add_many(chunk_exchanges(pending), kind="exchange")
+
+    def _summary_for_context(self) -> List[str]:
+        """프롬프트에 실을 요약 줄. 기억 인덱스가 있으면 최근 summary_context_tokens 만큼만."""
+        lines = [ln for ln in self.summary_content.splitlines() if ln.strip()]
+        if self.memory_index is None or self.summary_context_tokens <= 0:
+            return lines
+        kept: List[str] = []
+        acc = 0
+        for ln in reversed(lines):
+            t = count_tokens(ln)
+            if kept and acc + t > self.summary_context_tokens:
+                break
+            kept.append(ln)
+            acc += t
+        return list(reversed(kept))
+
+    def recall(self, query: str, exclude: Optional[List[str]] = None) -> List[str]:
+        """query와 관련된 기억 텍스트 (토큰 상한 memory_max_tokens)."""
+        if self.memory_index is None or not (query or "").strip():
+            return []
+        out: List[str] = []
         acc = 0
-        for m in self.recent_messages:
-            t = count_tokens(m.get("content", ""))
-            if acc + t > self.max_tokens:
+        for hit in self.memory_index.search(query, top_k=self.memory_top_k, exclude=exclude):
+            t = count_tokens(hit.text)
+            if out and acc + t > self.memory_max_tokens:
                 break
-            out.append(m)
+            out.append(hit.text)
             acc += t
         return out
 
+    def get_context_messages(self, query: Optional[str] = None) -> List[dict]:
+        """
+        API에 넘길 messages (시스템 제외). 토큰 상한 유지.
+        순서는 바뀌는 빈도 순: 요약(요약 때만) → 최근 대화(뒤에만 붙음) → 관련 기억(배치마다).
+        query: 지금 처리할 채팅 (있으면 기억 인덱스에서 관련 있는 것 top-k를 붙임).
+        """
+        out: List[dict] = []
+        summary_lines = self._summary_for_context()
+        if summary_lines:
+            out.append({"role": "system", "content": "[이전 대화 요약] " + "\n".join(summary_lines)})
+        out.extend(self.recent_messages[self._window_start():])
+        # 관련 기억은 배치마다 바뀌므로 최근 대화 뒤에 둬서 앞부분(요약·대화) 캐시를 깨지 않게
+        memories = self.recall(query or "", exclude=summary_lines)
+        if memories:
+            out.append({"role": "system", "content": "[관련 기억]\n" + "\n".join("- " + m.replace("\n", " / ") for m in memories)})
+        return out
+
+    def _window_start(self) -> int:
+        """
+        최근 대화 중 프롬프트에 넣을 시작 위치. 최신 쪽부터 max_tokens 안에 들어가는 만큼 고르고,
+        시작점은 window_step개 단위로만 앞으로 옮긴다. 그 사이에는 메시지가 뒤에만 붙으므로
+        요청 간 앞부분이 같아 제공자 프롬프트 캐시가 맞는다.
+        """
+        n = len(self.recent_messages)
+        if n == 0:
+            return 0
+        acc = 0
+        start = n
+        for i in range(n - 1, -1, -1):
+            t = count_tokens(self.recent_messages[i].get("content", ""))
+            if acc + t > self.max_tokens and start < n:
+                break
+            acc += t
+            start = i
+        if start == 0 or self.window_step <= 1:
+            return start
+        abs_start = self._recent_first_seq + start
+        snapped = -(-abs_start // self.window_step) * self.window_step  # 올림
+        return min(snapped - self._recent_first_seq, n - 1)
+
     def has_pending_summarize(self) -> bool:
         return getattr(self, "_pending_summarize", None) is not None
 
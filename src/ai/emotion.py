@@ -0,0 +1,117 @@
+"""
+로컬 감정 분류 (LLM 호출 없이).
+
+모델이 JSON 대신 평문으로 답했을 때(검색 경로 등) emotion을 채우려고 다시 LLM을 부르지 않도록,
+감정 단어·이모티콘·문장부호 사전으로 VALID_EMOTIONS 중 하나를 고른다. 정확도보다 속도 우선이라
+점수가 애매하면 neutral.
+
+EarlyEmotion: 스트리밍으로 받는 답변 JSON 조각에서 emotion을 가능한 한 일찍 꺼낸다. 스키마가 emotion을
+맨 앞에 두므로 보통 첫 몇 토큰 안에 나오고, 모델이 순서를 안 지켜 response 첫 문장이 먼저 끝나면
+그 문장으로 classify_emotion. TTS 참조 음성·VTS 포즈를 생성이 끝나기 전에 고를 수 있게 한다.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Optional, Tuple
+
+from .models import VALID_EMOTIONS
+
+# (감정, 가중치): 단어는 부분 문자열로 센다 (활용형 "좋아요/좋네요" 를 한 번에 잡으려고 어간 위주)
+_LEXICON: Dict[str, Tuple[str, ...]] = {
+    "happy": ("좋아", "좋네", "좋은", "다행", "감사", "고마", "행복", "기뻐", "기쁘", "반가", "축하", "웃기", "재밌", "재미있",
+              "귀엽", "사랑", "맛있", "따뜻", "최고", "ㅎㅎ", "^^", "😊", "😄", "💕"),
+    "excited": ("대박", "신나", "신난", "설레", "두근", "기대", "완전", "짱", "굉장", "멋지", "멋있", "최고예요", "ㅋㅋ", "!!",
+                "🎉", "🔥"),
+    "sad": ("슬프", "슬퍼", "아쉽", "아쉬", "안타깝", "속상", "우울", "힘들", "외로", "그립", "미안", "죄송", "눈물", "ㅠ",
+            "ㅜ", "😢", "😭"),
+    "angry": ("화나", "화가", "짜증", "열받", "싫어", "싫다", "어이없", "뭐하는", "그만해", "용서", "분노", "😡", "💢"),
+    "surprised": ("헉", "깜짝", "놀라", "놀랐", "세상에", "정말요", "진짜요", "설마", "어머", "어떻게 이런", "?!", "😮", "😲"),
+}
+_MIN_SCORE = 1.0
+_EXCLAIM = re.compile(r"!+")
+
+
+def classify_emotion(text: str) -> str:
+    """문장 → happy/sad/angry/surprised/neutral/excited. 사전에 걸리는 게 없으면 neutral."""
+    t = (text or "").strip()
+    if not t:
+        return "neutral"
+    scores: Dict[str, float] = {}
+    for emotion, words in _LEXICON.items():
+        score = float(sum(t.count(w) for w in words))
+        if score:
+            scores[emotion] = score
+    # 느낌표가 많으면 들뜬 쪽으로 조금 기울임 (기쁨과 동점일 때 excited)
+    bangs = sum(len(m) for m in _EXCLAIM.findall(t))
+    if bangs >= 2:
+        scores["excited"] = scores.get("excited", 0.0) + 0.5
+    if not scores:
+        return "neutral"
+    emotion, score = max(scores.items(), key=lambda kv: kv[1])
+    if score < _MIN_SCORE or emotion not in VALID_EMOTIONS:
+        return "neutral"
+    return emotion
+
+
+_EMOTION_FIELD = re.compile(r'"emotion"\s*:\s*"([a-zA-Z]+)"')
+_RESPONSE_START = re.compile(r'"response"\s*:\s*"')
+_SENTENCE_END = re.compile(r"[.!?…~]|[다요죠네까]\s")
+
+
+def _partial_string(buf: str, start: int) -> Tuple[str, bool]:
+    """buf[start:]의 JSON 문자열 내용 (닫는 따옴표 전까지, 이스케이프는 대충 풂). (내용, 닫혔는지)."""
+    out = []
+    escape = False
+    for ch in buf[start:]:
+        if escape:
+            out.append({"n": " ", "t": " "}.get(ch, ch))
+            escape = False
+        elif ch == "\\":
+            escape = True
+        elif ch == '"':
+            return "".join(out), True
+        else:
+            out.append(ch)
+    return "".join(out), False
+
+
+class EarlyEmotion:
+    """
+    스트리밍 답변 조각을 feed로 넣으면 emotion이 정해지는 순간 on_emotion(emotion)을 한 번 부름.
+    모델이 쓴 emotion이 먼저 오면 그것(source="model"), response 첫 문장이 먼저 끝나면 로컬 분류(source="local").
+    """
+
+    def __init__(self, on_emotion: Callable[[str], None]):
+        self._on_emotion = on_emotion
+        self._buf = ""
+        self.emotion: Optional[str] = None
+        self.source: Optional[str] = None
+
+    def _emit(self, emotion: str, source: str) -> None:
+        self.emotion = emotion
+        self.source = source
+        self._on_emotion(emotion)
+
+    def feed(self, chunk: str) -> None:
+        if self.emotion is not None or not chunk:
+            return
+        self._buf += chunk
+        m = _EMOTION_FIELD.search(self._buf)
+        if m and m.group(1).lower() in VALID_EMOTIONS:
+            self._emit(m.group(1).lower(), "model")
+            return
+        r = _RESPONSE_START.search(self._buf)
+        if r is None:
+            return
+        text, closed = _partial_string(self._buf, r.end())
+        end = _SENTENCE_END.search(text)
+        if closed or end is not None:
+            first = text[: end.end()] if end is not None else text
+            self._emit(classify_emotion(first), "local")
+
+    def finish(self, text: str = "") -> Optional[str]:
+        """스트림이 끝났는데 아직 못 정했으면 text(또는 받은 전체)로 로컬 분류해 부름."""
+        if self.emotion is None and (text or self._buf).strip():
+            self._emit(classify_emotion(text or self._buf), "local")
+        return self.emotion
@@ -12,15 +12,39 @@ import time
 import ast
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, List, Optional
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional
 
 from openai import OpenAI
 
+from src.overlay.tarot_knowledge import describe_cards
+from src.utils.korean_numerals import korean_numerals_to_digits
+from src.utils.metrics import metrics
+from .emotion import EarlyEmotion, classify_emotion
+from .json_repair import (
+    REPLIES_SCHEMA,
+    REPLY_SCHEMA,
+    TAROT_FRAME_SCHEMA,
+    TAROT_INTERPRET_SCHEMA,
+    TAROT_NUMBERS_SCHEMA,
+    TAROT_SELECTION_SCHEMA,
+    WAIT_REPLY_SCHEMA,
+    Schema,
+    extract_json,
+)
+from .model_router import ModelRouter
 from .models import AIResponse, VALID_EMOTIONS
-from .web_search import run_web_search
+from .prompt_budget import PromptBudget
+from .prompt_prefix import PrefixTracker, record_usage
+from .system_prompts import SystemPrompts
+from .tarot_numbers import TAROT_REASK_DEFAULT, TAROT_REASK_DUPLICATE, resolve_tarot_selection
+from .web_search import run_web_searches
 
 logger = logging.getLogger(__name__)
 
+# 평문 답변을 TTS로 읽을 때 거슬리는 마크다운 (굵게·제목·목록 기호·링크 주소)
+_MARKDOWN = re.compile(r"\*\*|__|^#+\s*|^\s*[-*]\s+|\(https?://[^)]*\)|`", re.MULTILINE)
+
 # 웹 검색 도구 스키마 (모델이 필요 시 호출)
 SEARCH_WEB_TOOL = {
     "type": "function",
@@ -116,6 +140,60 @@ def _first_choice_content(response: Any, where: str) -> str:
     return str(content)
 
 
+def _stream_usage(chunk: Any) -> Any:
+    """
+    스트림 조각에 usage가 있으면 record_usage에 넘길 객체(.usage 속성), 없으면 None.
+    OpenAI 방식(stream_options include_usage → 마지막 조각 chunk.usage)과 Groq x_groq.usage 둘 다.
+    """
+    if getattr(chunk, "usage", None) is not None:
+        return chunk
+    x_groq = getattr(chunk, "x_groq", None)
+    usage = x_groq.get("usage") if isinstance(x_groq, dict) else getattr(x_groq, "usage", None)
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details")
+        usage = SimpleNamespace(
+            prompt_tokens=usage.get("prompt_tokens"),
+            prompt_tokens_details=SimpleNamespace(**details) if isinstance(details, dict) else None,
+        )
+    return SimpleNamespace(usage=usage)
+
+
+def _load_json(raw: Optional[str], schema: Schema, where: str) -> dict:
+    """LLM 출력 → 스키마에 맞는 dict (코드펜스·앞뒤 설명·잘림 등 로컬 복구). 못 꺼내면 JSONDecodeError."""
+    data = extract_json(raw, schema, where)
+    if data is None:
+        raise json.JSONDecodeError(f"{where}: 스키마에 맞는 JSON 없음", raw or "", 0)
+    return data
+
+
+def _repair_failed_generation(err: Exception, schema: Schema, where: str) -> Optional[dict]:
+    """400 json_validate_failed의 failed_generation을 로컬에서 고쳐 봄. 되면 피드백 재요청 생략."""
+    if "json_validate_failed" not in str(err).lower():
+        return None
+    failed_gen = _extract_failed_generation(err)
+    data = extract_json(failed_gen, schema, f"{where}.failed_generation") if failed_gen else None
+    if data is not None:
+        logger.info("%s: JSON 검증 실패 출력을 로컬에서 복구 (재요청 생략)", where)
+    return data
+
+
+def _wrap_search_answer(content: str) -> str:
+    """
+    검색 후 최종 답변 → reply_batch가 파싱하는 {"replies": [...]} JSON 문자열.
+    이미 replies JSON(또는 앞뒤에 설명이 붙은 JSON)이면 그대로, 평문이면 마크다운을 걷어내고 감정은 로컬 분류.
+    """
+    text = content.strip()
+    data = extract_json(text, REPLIES_SCHEMA, "search_answer") if "{" in text else None
+    if data is not None and data["replies"]:
+        return json.dumps(data, ensure_ascii=False)
+    plain = _MARKDOWN.sub("", text)
+    plain = re.sub(r"\s*\n+\s*", " ", plain).strip()
+    metrics.incr("reply_batch.search_plain_wrapped")
+    return json.dumps({"replies": [{"response": plain, "emotion": classify_emotion(plain)}]}, ensure_ascii=False)
+
+
 def _parse_int_list(raw_value: Any) -> List[int]:
     """list/문자열(세미콜론, 콤마, JSON 배열) 입력을 int 리스트로 변환."""
     if isinstance(raw_value, list):
@@ -163,34 +241,13 @@ def _sanitize_user_text(value: Any, max_len: int = 1000) -> str:
         s = s[:max_len]
     return s
 
-# config/character.txt 가 있으면 시스템 프롬프트 앞에 붙임
-def _project_root() -> Path:
-    return Path(__file__).resolve().parent.parent.parent
-
-
-def _load_character_prompt(character_path: Optional[Path] = None) -> str:
-    """config/character.txt 내용 로드. 없으면 빈 문자열."""
-    p = character_path or (_project_root() / "config" / "character.txt")
-    if not p.exists():
-        return ""
-    try:
-        text = p.read_text(encoding="utf-8").replace("\0", "").strip()
-        # character 프롬프트 과도 확장을 막기 위한 상한
-        if len(text) > 12000:
-            logger.warning("캐릭터 프롬프트가 너무 깁니다(%d자). 12000자로 잘라서 사용합니다.", len(text))
-            text = text[:12000]
-        return text
-    except Exception as e:
-        logger.warning("캐릭터 파일 로드 실패 %s: %s", p, e)
-        return ""
-
 GROQ_BASE_URL = "https://api.groq.com/openai/v1"
 # openai/gpt-oss-120b: 131K context, 8K 분당 등 제한에 맞춰 .env GROQ_MODEL 로 변경 가능
 DEFAULT_MODEL = "openai/gpt-oss-120b"
 
 SYSTEM_PROMPT = """시청자 채팅에 한 문장으로 짧게 한국어로 답하세요.
 반드시 아래 JSON만 출력하세요. 따옴표나 줄바꿈 없이 한 줄로 작성하세요.
-{"response": "한 문장 답변", "emotion": "감정키"}
+{"emotion": "감정키", "response": "한 문장 답변"}
 emotion은 반드시 다음 중 하나: happy, sad, angry, surprised, neutral, excited."""
 
 BATCH_SYSTEM_PROMPT = """아래는 말하는 동안 들어온 채팅 목록입니다.
@@ -206,8 +263,8 @@ BATCH_SYSTEM_PROMPT = """아래는 말하는 동안 들어온 채팅 목록입
 - **숫자만 있는 채팅**(예: 7 11 18, 1 2 3)은 타로 요청이 아님. 이전 대화에 타로 요청이 있어도, 현재 채팅이 "타로·운세·봐줘" 등 없이 숫자·공백 위주면 action 절대 넣지 말고 일반 반응만 할 것.
 - 일반 대화면 action 생략.
 
-JSON 형식 (한 줄, 설명 없이):
-{"replies": [{"response": "한 문장(화면 표시용)", "tts_text": "TTS로 읽었을 때 한국어로 자연스럽게 들리도록 같은 내용을 말하기 좋은 문장(선택)", "emotion": "감정키", "action": "tarot_ask_question"|"tarot"|생략, "tarot_question": "주제"|""|생략, "tarot_spread_count": 1|2|3|4|5}]}
+JSON 형식 (한 줄, 설명 없이. emotion을 맨 앞에):
+{"replies": [{"emotion": "감정키", "response": "한 문장(화면 표시용)", "tts_text": "TTS로 읽었을 때 한국어로 자연스럽게 들리도록 같은 내용을 말하기 좋은 문장(선택)", "action": "tarot_ask_question"|"tarot"|생략, "tarot_question": "주제"|""|생략, "tarot_spread_count": 1|2|3|4|5}]}
 action이 "tarot"일 때는 tarot_spread_count 반드시 1~5 중 하나로 넣기. 생략하지 말 것.
 replies는 최대 1개. emotion은 반드시: happy, sad, angry, surprised, neutral, excited 중 하나. tts_text 없으면 response로 TTS."""
 
@@ -216,6 +273,9 @@ BATCH_SYSTEM_PROMPT_SEARCH_SUFFIX = """
 
 웹 검색: 시청자가 최신 뉴스, 날씨, 시세, 현재 정보 등을 물을 때는 search_web 도구를 호출하세요. 검색이 필요 없다면 도구를 호출하지 말고 바로 위 JSON 형식으로 답하세요. 검색 결과를 받은 뒤에는 그 내용을 바탕으로 한 문장으로 요약해, 반드시 같은 JSON 한 줄만 출력하세요. 시간·날짜를 물어보면 [현재 시각 (한국 기준)]이 있으면 그 값을 쓰고, 별말 없으면 한국 시간 기준으로 답하세요."""
 
+# 매번 같은 문장으로 읽는 고정 멘트 (TTS 음성 캐시 미리 합성 대상)
+TAROT_WAIT_FALLBACK = "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요."
+
 SUMMARIZE_PROMPT = """다음 대화 내용을 간결하게 요약해주세요. 중요한 맥락과 주제는 유지하세요. 한국어로 한 문단 이내."""
 
 # src/ai/groq_client.py 의 TAROT_INTERPRET_SYSTEM 변수를 이걸로 교체하세요.
@@ -245,6 +305,13 @@ yes_no: {"interpretation": "...", "tts_text": "...", "visual_data": {"visual_typ
 radar: {"interpretation": "...", "tts_text": "...", "visual_data": {"visual_type": "radar", "labels": ["금전","애정","건강","학업","대인"], "scores": "80;70;60;90;75"}, "soul_color": "#FFD700", "danger_alert": false}"""
 
 
+TAROT_FRAME_SYSTEM = """타로 해석 전 준비 단계입니다. 아직 카드는 모릅니다. 질문만 보고 결과 화면의 틀을 정하세요.
+- visual_type: 예/아니오 질문이면 "yes_no", 둘 중 비교면 "bar", 종합 운세·일반이면 "radar"
+- labels: bar면 비교 대상 2개 이상, radar면 항목 5개 안팎(예: 금전, 애정, 건강, 학업/일, 대인관계). yes_no면 빈 배열
+- intro: 해석 첫머리에 쓸 질문 정리 한 문장 (존댓말, 카드 내용 언급 금지)
+JSON 한 줄만: {"visual_type": "radar", "labels": ["금전","애정","건강","학업/일","대인관계"], "intro": "..."}"""
+
+
 class GroqClient:
     """Groq API로 채팅 답변 + 감정 생성. config/character.txt 있으면 성격·자기 정보로 시스템 프롬프트 보강."""
 
@@ -261,25 +328,47 @@ class GroqClient:
         _model = (model or "").strip()
         self.model = _model or (os.environ.get("GROQ_MODEL") or "").strip() or DEFAULT_MODEL
         self.max_tokens = max_tokens
-        self._character_prompt = _load_character_prompt(character_path)
-        if self._character_prompt:
+        # config/character.txt 가 있으면 시스템 프롬프트 앞에 붙임 (미리 합쳐 두고, 파일이 바뀌면 다시 합침)
+        self._prompts = SystemPrompts(
+            {
+                "reply": SYSTEM_PROMPT,
+                "batch": BATCH_SYSTEM_PROMPT,
+                "batch_search": BATCH_SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT_SEARCH_SUFFIX,
+                "tarot_interpret": TAROT_INTERPRET_SYSTEM,
+                "tarot_selection": self.TAROT_SELECTION_SYSTEM,
+                "tarot_wait": self.TAROT_WAIT_SYSTEM,
+            },
+            character_path,
+        )
+        if self._prompts.character:
             logger.info("캐릭터 설정 로드: config/character.txt")
+        # 재시도는 ModelRouter·RequestExecutor가 맡음. SDK 기본 재시도(max_retries=2)가 429를 안에서 기다리면
+        # 라우터가 쿨다운·다른 모델로 넘기기를 못 하고 호출 스레드가 백오프 동안 묶인다
         self._client = OpenAI(
             api_key=self.api_key,
             base_url=GROQ_BASE_URL,
+            max_retries=0,
         )
+        self._prefix = PrefixTracker()
+        self._budget = PromptBudget()
+        self._stream_json_mode = True  # 스트리밍에 response_format이 거부되면 False로 바꾸고 계속 그렇게 보냄
+        self._router = ModelRouter(self._client, self.model)
         logger.info(
-            "GroqClient 초기화 완료: model=%s, max_tokens=%s, character_prompt=%s",
+            "GroqClient 초기화 완료: model=%s, fast_model=%s, fallback=%s, max_tokens=%s, character_prompt=%s",
             self.model,
+            self._router.fast_model,
+            self._router.fallback_models,
             self.max_tokens,
-            bool(self._character_prompt),
+            bool(self._prompts.character),
         )
 
-    def _system_prompt(self, base: str) -> str:
-        """캐릭터 설정이 있으면 앞에 붙여서 반환."""
-        if not self._character_prompt:
-            return base
-        return f"{self._character_prompt}\n\n{base}"
+    def _create(self, task: str, messages: List[dict], **kwargs: Any) -> Any:
+        """작업(task)별 모델·max_tokens·timeout으로 호출하고, 429·5xx 등이면 다른 모델로 넘김 (model_router.TASK_PROFILES)."""
+        return self._router.create(task, messages, **kwargs)
+
+    def _system_prompt(self, name: str) -> str:
+        """캐릭터 설정까지 합쳐 둔 system 프롬프트 (system_prompts.SystemPrompts)."""
+        return self._prompts.text(name)
 
     def reply(
         self,
@@ -312,15 +401,15 @@ class GroqClient:
             len(context_messages or []),
         )
 
-        messages = [{"role": "system", "content": self._system_prompt(SYSTEM_PROMPT)}]
+        messages = [{"role": "system", "content": self._system_prompt("reply")}]
         if context_messages:
             messages.extend(context_messages)
         messages.append({"role": "user", "content": content})
 
         start = time.perf_counter()
         try:
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "reply",
                 messages=messages,
                 max_tokens=self.max_tokens,
                 response_format={"type": "json_object"},
@@ -337,12 +426,7 @@ class GroqClient:
             )
 
         try:
-            text = raw.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[-1] if "\n" in text else text[3:]
-            if text.endswith("```"):
-                text = text.rsplit("```", 1)[0].strip()
-            data = json.loads(text)
+            data = _load_json(raw, REPLY_SCHEMA, "reply")
             response_text = data.get("response", "").strip() or "(응답 없음)"
             emotion = (data.get("emotion") or "neutral").strip().lower()
             if emotion not in VALID_EMOTIONS:
@@ -370,13 +454,12 @@ class GroqClient:
             f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages
         )
         try:
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "summarize",
                 messages=[
                     {"role": "system", "content": SUMMARIZE_PROMPT},
                     {"role": "user", "content": text[:8000]},
                 ],
-                max_tokens=512,
             )
             raw = _first_choice_content(response, "summarize").strip()
             return raw
@@ -394,36 +477,89 @@ class GroqClient:
         """60초 대기 중 타로/봐줘 요청에 쓸 '창 닫힐 때까지 기다려 주세요' 멘트 생성."""
         content = (user_message or "").strip()
         if not content:
-            return "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요."
+            return TAROT_WAIT_FALLBACK
         messages = [
-            {"role": "system", "content": self._system_prompt(self.TAROT_WAIT_SYSTEM)},
+            {"role": "system", "content": self._system_prompt("tarot_wait")},
             {"role": "user", "content": content},
         ]
         try:
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "tarot_wait",
                 messages=messages,
-                max_tokens=128,
                 response_format={"type": "json_object"},
             )
             raw = _first_choice_content(response, "generate_tarot_wait_reply").strip()
-            data = json.loads(raw)
+            data = _load_json(raw, WAIT_REPLY_SCHEMA, "generate_tarot_wait_reply")
             text = (data.get("response") or "").strip()
-            return text or "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요."
+            return text or TAROT_WAIT_FALLBACK
         except Exception as e:
             logger.warning("타로 대기 멘트 생성 실패: %s", e)
-            return "아직 이번 타로가 끝나지 않았어요. 창이 닫힐 때까지 잠시만 기다려 주세요."
+            return TAROT_WAIT_FALLBACK
+
+    def _reply_batch_streaming(self, messages: List[dict], start_time: float, early: EarlyEmotion) -> Optional[str]:
+        """
+        답변을 스트리밍으로 받으면서 조각마다 early.feed (emotion이 정해지는 즉시 콜백). 전체 텍스트 반환.
+        JSON 모드(response_format)를 같이 요청하고, 모델·제공자가 스트리밍 JSON 모드를 거부하면(400) 그 뒤로는
+        프롬프트 형식만 믿고 보냄 (파싱은 extract_json이 고침). usage는 마지막 조각에서 받아 record_usage.
+        스트림이 실패하면 None → 호출한 쪽이 평소(비스트리밍) 요청으로 다시 보냄.
+        """
+        parts: List[str] = []
+        try:
+            stream = self._open_reply_stream(messages)
+            for chunk in stream:
+                usage = _stream_usage(chunk)
+                if usage is not None:
+                    record_usage(usage, "reply_batch")
+                choices = getattr(chunk, "choices", None) or []
+                delta = getattr(choices[0], "delta", None) if choices else None
+                piece = getattr(delta, "content", None) if delta is not None else None
+                if not piece:
+                    continue
+                if not parts:
+                    metrics.observe("reply_batch.first_token_sec", time.perf_counter() - start_time)
+                parts.append(piece)
+                had = early.emotion
+                early.feed(piece)
+                if had is None and early.emotion is not None:
+                    metrics.observe("reply_batch.emotion_sec", time.perf_counter() - start_time)
+                    metrics.incr(f"reply_batch.emotion_source.{early.source}")
+        except Exception as e:
+            metrics.incr("reply_batch.stream_failed")
+            logger.warning("reply_batch 스트리밍 실패, 일반 요청으로 재시도: %s", str(e)[:200])
+            return None
+        raw = "".join(parts)
+        if raw.strip():
+            if early.emotion is None:
+                early.finish()
+                metrics.incr(f"reply_batch.emotion_source.{early.source}")
+        return raw or None
+
+    def _open_reply_stream(self, messages: List[dict]) -> Any:
+        kwargs: dict = {"stream": True, "stream_options": {"include_usage": True}}
+        if self._stream_json_mode:
+            try:
+                return self._create("reply_batch_stream", messages=messages, response_format={"type": "json_object"}, **kwargs)
+            except Exception as e:
+                err = str(e).lower()
+                if not ("400" in err and ("response_format" in err or "json" in err or "stream" in err)):
+                    raise
+                self._stream_json_mode = False
+                logger.info("스트리밍 JSON 모드 미지원 → 이후 프롬프트 형식만으로 스트리밍: %s", str(e)[:200])
+        return self._create("reply_batch_stream", messages=messages, **kwargs)
 
     def _reply_batch_with_search(self, messages: List[dict], start_time: float, max_iterations: int = 3) -> Optional[str]:
-        """도구(search_web) 루프: tool_calls 있으면 검색 실행 후 재호출, content 나올 때까지 반복. 최종 답변이 평문이면 JSON으로 한 번 더 요청."""
+        """
+        도구(search_web) 루프: tool_calls 있으면 검색 실행 후 재호출, content 나올 때까지 반복.
+        최종 답변이 평문이면 다시 LLM에 JSON 변환을 맡기지 않고 로컬에서 replies JSON으로 감쌈 (감정은 emotion.classify_emotion).
+        """
         for _ in range(max_iterations):
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "reply_batch",
                 messages=messages,
-                max_tokens=1024,
                 tools=[SEARCH_WEB_TOOL],
                 tool_choice="auto",
             )
+            record_usage(response, "reply_batch")
             msg = _first_choice_message(response, "_reply_batch_with_search")
             if msg is None:
                 return None
@@ -431,46 +567,27 @@ class GroqClient:
                 content = (msg.content or "").strip()
                 if not content:
                     return None
-                # 검색 경로는 모델이 평문으로 답할 수 있음 → replies JSON이면 그대로, 아니면 JSON으로 한 번 더 요청
-                try:
-                    data = json.loads(content)
-                    if isinstance(data, dict) and isinstance(data.get("replies"), list) and len(data["replies"]) > 0:
-                        return content
-                except json.JSONDecodeError:
-                    pass
-                # 평문이면 동일 형식(JSON)으로 다시 요청
-                formatted = messages + [
-                    {"role": "assistant", "content": content},
-                    {"role": "user", "content": "위 답변을 그대로 유지한 채, 아래 JSON 형식 한 줄로만 출력하세요. 설명·마크다운 없이. {\"replies\": [{\"response\": \"위 답변 내용 전체\", \"emotion\": \"neutral\"}]}"},
-                ]
-                try:
-                    resp2 = self._client.chat.completions.create(
-                        model=self.model,
-                        messages=formatted,
-                        max_tokens=1024,
-                        response_format={"type": "json_object"},
-                    )
-                    out = _first_choice_content(resp2, "_reply_batch_with_search.reformat").strip()
-                    if out:
-                        return out
-                except Exception as e:
-                    logger.warning("검색 답변 JSON 재요청 실패, 평문 반환: %s", e)
-                return content
+                # 검색 경로는 도구와 response_format을 같이 못 써서 모델이 평문으로 답할 수 있음 → 로컬에서 JSON으로
+                return _wrap_search_answer(content)
             messages.append({"role": "assistant", "content": msg.content or "", "tool_calls": msg.tool_calls})
+            # 한 턴에 검색 여러 개면 동시에 실행 (시간 = 가장 느린 검색), 결과는 tool_calls 순서대로 붙임
+            queries: List[Optional[str]] = []
             for tc in msg.tool_calls:
                 name = getattr(tc.function, "name", None) or ""
                 args_str = getattr(tc.function, "arguments", None) or "{}"
-                try:
-                    args = json.loads(args_str)
-                except json.JSONDecodeError:
-                    args = {}
-                if name == "search_web":
-                    query = args.get("query", "").strip()
-                    result = run_web_search(query)
+                args = extract_json(args_str, None, "tool_arguments") or {}
+                queries.append(str(args.get("query") or "").strip() if name == "search_web" else None)
+            search_started = time.perf_counter()
+            found = iter(run_web_searches([q for q in queries if q is not None]))
+            for tc, query in zip(msg.tool_calls, queries):
+                if query is not None:
+                    result = next(found)
                     logger.info("search_web 실행: query=%r, 결과 %d자", query, len(result))
                 else:
                     result = "도구를 처리할 수 없습니다."
                 messages.append({"role": "tool", "tool_call_id": tc.id, "content": result})
+            if len(queries) > 1:
+                metrics.observe("web_search.turn_sec", time.perf_counter() - search_started)
         return None
 
     def reply_batch(
@@ -480,10 +597,15 @@ class GroqClient:
         tarot_state: Optional[dict] = None,
         tarot_enabled: bool = True,
         search_enabled: bool = False,
+        viewer_notes: Optional[str] = None,
+        on_emotion: Optional[Callable[[str], None]] = None,
     ) -> List[AIResponse]:
         """
         말하는 동안 쌓인 채팅을 한 번에 보고, 합치기/걸러내기 후 답변 1개 생성 (길어도 됨).
         search_enabled: True면 search_web 도구 사용 가능. 모델이 필요 시 검색 후 답변.
+        viewer_notes: 이번 배치 시청자의 이전 방문 메모 (ViewerMemory.notes_for). 있을 때만 붙임.
+        on_emotion: 주면 답변을 스트리밍으로 받아 emotion이 정해지는 즉시 (이 스레드에서) 한 번 부름.
+            TTS 참조 음성·VTS 포즈를 생성이 끝나기 전에 준비하는 용도. 검색 경로는 스트리밍하지 않음.
         """
         if not pending:
             return []
@@ -507,42 +629,56 @@ class GroqClient:
         if not content.strip():
             return []
 
-        user_content = f"채팅 목록:\n{content}"
+        header = "채팅 목록:\n"
+        extra = ""
+        if viewer_notes:
+            extra += f"\n\n[시청자 메모 (이전 기록, 자연스러울 때만 짧게 활용. 매번 언급하지 말 것)]\n{viewer_notes}"
         if not tarot_enabled:
-            user_content += "\n\n[오늘은 타로/운세 기능 비활성화. 지금 당장 타로 해달라고 요청하면 거절하고 action 넣지 말 것. \"내일은 되나\", \"언제 되나\"처럼 다음에 가능한지·일정을 묻는 말에는 문맥에 맞게 답할 것 (예: 내일/다음 방송 때는 될 수 있다고).]"
+            extra += "\n\n[오늘은 타로/운세 기능 비활성화. 지금 당장 타로 해달라고 요청하면 거절하고 action 넣지 말 것. \"내일은 되나\", \"언제 되나\"처럼 다음에 가능한지·일정을 묻는 말에는 문맥에 맞게 답할 것 (예: 내일/다음 방송 때는 될 수 있다고).]"
         elif tarot_state and tarot_state.get("phase") == "selecting":
             requester = tarot_state.get("requester_nickname") or "다른 분"
-            user_content += f"\n\n[현재 타로 **번호 선택** 단계. {requester}님이 1~78 중 N개 고르는 중. 새로 \"타로 봐줘\" 요청한 사람에게는 거절만. action 절대 넣지 말 것. 요청자가 번호(숫자)만 말한 내용은 타로 선택으로 처리되고, 그 외 사람의 타로 요청은 \"지금 다른 분이 보고 있어서 지금은 안 됩니다\" 같은 한 문장만.]"
+            extra += f"\n\n[현재 타로 **번호 선택** 단계. {requester}님이 1~78 중 N개 고르는 중. 새로 \"타로 봐줘\" 요청한 사람에게는 거절만. action 절대 넣지 말 것. 요청자가 번호(숫자)만 말한 내용은 타로 선택으로 처리되고, 그 외 사람의 타로 요청은 \"지금 다른 분이 보고 있어서 지금은 안 됩니다\" 같은 한 문장만.]"
         elif tarot_state and tarot_state.get("phase") == "revealed":
-            user_content += "\n\n[현재 타로 **결과 공개** 단계. 이미 카드를 뽑은 뒤 해석 보여주는 중임. 시청자가 숫자만 말해도(예: 5, 1) **새 타로나 N장 뽑기로 해석하지 말 것**. \"5장 골라주세요\", \"1번부터 78번 중\" 같은 멘트 금지. action 절대 넣지 말 것. 짧게 반응만 하거나 \"이번 타로 끝날 때까지 잠시만 기다려 주세요\" 식으로만 답할 것.]"
+            extra += "\n\n[현재 타로 **결과 공개** 단계. 이미 카드를 뽑은 뒤 해석 보여주는 중임. 시청자가 숫자만 말해도(예: 5, 1) **새 타로나 N장 뽑기로 해석하지 말 것**. \"5장 골라주세요\", \"1번부터 78번 중\" 같은 멘트 금지. action 절대 넣지 말 것. 짧게 반응만 하거나 \"이번 타로 끝날 때까지 잠시만 기다려 주세요\" 식으로만 답할 것.]"
         elif tarot_state and tarot_state.get("phase") == "asking_question":
-            user_content += "\n\n[현재 타로 단계: 시청자가 \"뭐에 대해 볼지\"에 답한 상태. 위 채팅이 그 답변. 주제를 말했으면 action \"tarot\", tarot_question에 주제, **tarot_spread_count에 주제에 맞는 장수(1~5)를 반드시 넣을 것.** 예/아니오 질문→1, 단순 주제→3, 장기·복잡→5. response에는 그 주제로 볼게요 + 1~78 중 N개 골라달라는 멘트를 존댓말로. 거절·모르겠음·없음이면 일반 답변만, action 넣지 말 것.]"
+            extra += "\n\n[현재 타로 단계: 시청자가 \"뭐에 대해 볼지\"에 답한 상태. 위 채팅이 그 답변. 주제를 말했으면 action \"tarot\", tarot_question에 주제, **tarot_spread_count에 주제에 맞는 장수(1~5)를 반드시 넣을 것.** 예/아니오 질문→1, 단순 주제→3, 장기·복잡→5. response에는 그 주제로 볼게요 + 1~78 중 N개 골라달라는 멘트를 존댓말로. 거절·모르겠음·없음이면 일반 답변만, action 넣지 말 것.]"
 
         if search_enabled:
             kst = timezone(timedelta(hours=9))
             now_str = datetime.now(kst).strftime("%Y-%m-%d %H:%M KST")
-            user_content += f"\n\n[현재 시각 (한국 기준): {now_str}]"
-
-        system_content = self._system_prompt(BATCH_SYSTEM_PROMPT)
-        if search_enabled:
-            system_content += BATCH_SYSTEM_PROMPT_SEARCH_SUFFIX
+            extra += f"\n\n[현재 시각 (한국 기준): {now_str}]"
+
+        # 캐시 친화 순서: 고정 system → 요약(가끔 바뀜) → 최근 대화(뒤에만 붙음) → 이번 user(매번 바뀜).
+        # 시각·타로 단계·시청자 메모처럼 매번 달라지는 건 전부 마지막 user 메시지에만 넣는다.
+        system = self._prompts.get("batch_search" if search_enabled else "batch")
+        system_content = system.text
+        # 채팅이 몰려도 입력 토큰이 CHAT_PROMPT_MAX_TOKENS 안에 들도록 뒤쪽 채팅·오래된 맥락부터 뺌
+        fitted = self._budget.fit(
+            system_content, context_messages or [], lines, header=header, extra=extra, system_tokens=system.tokens
+        )
+        body = "\n".join(fitted.lines + ([fitted.omitted_note] if fitted.omitted_note else []))
+        user_content = header + body + extra
         messages = [{"role": "system", "content": system_content}]
-        if context_messages:
-            messages.extend(context_messages)
+        messages.extend(fitted.context)
         messages.append({"role": "user", "content": user_content})
+        self._prefix.observe("reply_batch", messages)
 
         start = time.perf_counter()
         raw = None
+        early: Optional[EarlyEmotion] = None
         try:
             if search_enabled:
                 raw = self._reply_batch_with_search(messages, start)
-            else:
-                response = self._client.chat.completions.create(
-                    model=self.model,
+            elif on_emotion is not None:
+                early = EarlyEmotion(on_emotion)
+                raw = self._reply_batch_streaming(messages, start, early)
+            if not search_enabled and not raw:
+                response = self._create(
+                    "reply_batch",
                     messages=messages,
-                    max_tokens=1024,
                     response_format={"type": "json_object"},
                 )
+                record_usage(response, "reply_batch")
                 raw = _first_choice_content(response, "reply_batch")
         except Exception as e:
             err_msg = str(e).lower()
@@ -555,7 +691,10 @@ class GroqClient:
                     hint = "TPM(분당) 또는 TPD(일일) 한도. 1분 후 재시도 또는 한도 리셋 후 재시도."
                 logger.warning("Groq 429 Rate limit: %s 원문: %s", hint, e_str[:280])
                 return []
-            if "400" in err_msg and "json_validate_failed" in err_msg:
+            repaired = _repair_failed_generation(e, REPLIES_SCHEMA, "reply_batch")
+            if repaired is not None:
+                raw = json.dumps(repaired, ensure_ascii=False)
+            elif "400" in err_msg and "json_validate_failed" in err_msg:
                 failed_gen = _extract_failed_generation(e)
                 if failed_gen:
                     feedback = (
@@ -566,15 +705,14 @@ class GroqClient:
                 else:
                     feedback = (
                         "[JSON 검증 실패] 이전 응답이 JSON 검증에 걸렸습니다. "
-                        "반드시 요청한 형식({\"replies\": [{\"response\": \"...\", \"emotion\": \"...\", ...}]})만 한 줄로 출력하세요. 마크다운·설명·추가 문자 없이."
+                        "반드시 요청한 형식({\"replies\": [{\"emotion\": \"...\", \"response\": \"...\", ...}]})만 한 줄로 출력하세요. 마크다운·설명·추가 문자 없이."
                     )
                 logger.warning("Groq JSON 검증 실패, 피드백 담아 재시도: %s", e)
                 retry_messages = messages + [{"role": "user", "content": feedback}]
                 try:
-                    response = self._client.chat.completions.create(
-                        model=self.model,
+                    response = self._create(
+                        "reply_batch",
                         messages=retry_messages,
-                        max_tokens=1024,
                         response_format={"type": "json_object"},
                     )
                     raw = _first_choice_content(response, "reply_batch.retry_json_validate_failed")
@@ -584,15 +722,9 @@ class GroqClient:
             elif "400" in err_msg and ("tool_use_failed" in err_msg or "request.tools" in err_msg) and "json" in err_msg:
                 # 모델이 등록되지 않은 도구 'json'으로 답변을 보낸 경우: failed_generation에서 replies 추출
                 failed_gen = _extract_failed_generation(e)
-                if failed_gen:
-                    try:
-                        data = json.loads(failed_gen)
-                        if isinstance(data, dict) and (data.get("name") or "").strip().lower() == "json":
-                            args = data.get("arguments")
-                            if isinstance(args, dict) and "replies" in args:
-                                raw = json.dumps(args)
-                    except Exception:
-                        pass
+                data = extract_json(failed_gen, {"name": str, "arguments": dict}, "reply_batch.tool_use_failed")
+                if data is not None and data["name"].strip().lower() == "json" and "replies" in data["arguments"]:
+                    raw = json.dumps(data["arguments"], ensure_ascii=False)
                 if not raw or not raw.strip():
                     logger.warning("Groq tool_use_failed(json) 복구 실패: %s", e)
                     return []
@@ -611,30 +743,21 @@ class GroqClient:
             return []
 
         try:
-            text = (raw or "").strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[-1] if "\n" in text else text[3:]
-            if text.endswith("```"):
-                text = text.rsplit("```", 1)[0].strip()
-            try:
-                data = json.loads(text)
-            except json.JSONDecodeError:
-                beg, end = text.find("{"), text.rfind("}")
-                if beg != -1 and end > beg:
-                    data = json.loads(text[beg : end + 1])
-                else:
-                    raise
-            arr = data.get("replies") if isinstance(data, dict) else data
-            if not isinstance(arr, list):
-                arr = []
+            data = extract_json(raw, REPLIES_SCHEMA, "reply_batch")
+            if data is None:
+                # replies 없이 답변 객체 하나만 온 경우
+                single = _load_json(raw, REPLY_SCHEMA, "reply_batch.single")
+                data = {"replies": [single]}
+            arr = data["replies"]
             out = []
             for i, item in enumerate(arr[:1]):
                 if not isinstance(item, dict):
                     continue
                 r = (item.get("response") or "").strip()
-                e = (item.get("emotion") or "neutral").strip().lower()
+                e = str(item.get("emotion") or "").strip().lower()
                 if e not in VALID_EMOTIONS:
-                    e = "neutral"
+                    # 빠졌거나 엉뚱하면 스트리밍 중 먼저 정한 것, 없으면 답변 문장으로 로컬 분류
+                    e = (early.emotion if early is not None else None) or classify_emotion(r)
                 action = (item.get("action") or "").strip() or None
                 if action and action not in ("tarot_ask_question", "tarot"):
                     action = None
@@ -664,7 +787,7 @@ class GroqClient:
             if not out and (raw or "").strip():
                 out.append(AIResponse(
                     response=(raw or "").strip(),
-                    emotion="neutral",
+                    emotion=classify_emotion(raw or ""),
                     confidence=1.0,
                     processing_time=elapsed,
                 ))
@@ -677,17 +800,55 @@ class GroqClient:
                 logger.info("reply_batch 완료(plain fallback): replies=1, elapsed=%.3fs", time.perf_counter() - start)
                 return [AIResponse(
                     response=(raw or "").strip(),
-                    emotion="neutral",
+                    emotion=classify_emotion(raw or ""),
                     confidence=1.0,
                     processing_time=time.perf_counter() - start,
                 )]
             return []
 
+    def prefetch_tarot_frame(self, question: str, spread_count: int = 3) -> Optional[dict]:
+        """
+        번호 선택 중에 미리 호출. 카드와 무관한 부분(visual_type, labels, 도입 문장)을 먼저 정해 둔다.
+        get_tarot_interpretation(frame=...)에 넘기면 카드가 나온 뒤에는 카드 해석·점수만 생성.
+        실패하면 None (기존처럼 해석 한 번에 전부 생성).
+        """
+        safe_question = _sanitize_user_text(question, max_len=500)
+        if not safe_question:
+            return None
+        try:
+            response = self._create(
+                "tarot_frame",
+                messages=[
+                    {"role": "system", "content": TAROT_FRAME_SYSTEM},
+                    {"role": "user", "content": f"질문: {safe_question}\n뽑을 장수: {spread_count}"},
+                ],
+                response_format={"type": "json_object"},
+            )
+            data = _load_json(_first_choice_content(response, "prefetch_tarot_frame"), TAROT_FRAME_SCHEMA, "prefetch_tarot_frame")
+        except Exception as e:
+            logger.warning("타로 틀 미리 생성 실패: %s", e)
+            return None
+        visual_type = (data.get("visual_type") or "").strip()
+        if visual_type not in ("yes_no", "bar", "radar"):
+            return None
+        labels = [str(x).strip() for x in (data.get("labels") or []) if str(x).strip()]
+        if visual_type != "yes_no" and len(labels) < 2:
+            return None
+        frame = {
+            "visual_type": visual_type,
+            "labels": labels if visual_type != "yes_no" else [],
+            "intro": (data.get("intro") or "").strip(),
+        }
+        logger.info("타로 틀 미리 생성: %s", frame)
+        return frame
+
     def get_tarot_interpretation(
         self,
         question: str,
         cards: List[dict],
+        frame: Optional[dict] = None,
     ) -> Optional[dict]:
+        """카드 해석 + visual_data. frame(prefetch_tarot_frame 결과)이 있으면 틀은 고정하고 카드 부분만 생성."""
         if not cards:
             return None
 
@@ -698,24 +859,36 @@ class GroqClient:
 
         safe_question = _sanitize_user_text(question, max_len=500)
         user_content = f"질문: {safe_question}\n뽑은 카드: {cards_desc}\n상황에 맞는 visual_data를 포함해 JSON으로 답하세요."
+        card_notes = describe_cards(cards)
+        if card_notes:
+            # 카드 의미는 로컬 요약을 주고, 모델은 질문에 맞춘 종합 해석만 작성
+            user_content += (
+                f"\n\n[뽑은 카드 의미 요약]\n{card_notes}\n"
+                "카드 의미는 위 요약을 따르고 카드별 일반 설명을 길게 늘어놓지 말 것. 질문에 맞춘 종합 해석만 4~6문장 이내로."
+            )
+        if frame:
+            labels = frame.get("labels") or []
+            user_content += (
+                f"\n\n[미리 정한 틀] visual_type: {frame.get('visual_type')}"
+                + (f", labels: {json.dumps(labels, ensure_ascii=False)} (이 순서·개수 그대로, scores만 카드에 맞춰)" if labels else "")
+                + (f"\n도입 문장(그대로 interpretation 첫 문장으로): {frame['intro']}" if frame.get("intro") else "")
+                + "\n틀은 다시 고민하지 말고 카드 해석과 점수에만 집중할 것."
+            )
 
         messages = [
-            {"role": "system", "content": self._system_prompt(TAROT_INTERPRET_SYSTEM)},
+            {"role": "system", "content": self._system_prompt("tarot_interpret")},
             {"role": "user", "content": user_content},
         ]
 
         try:
             # 해석 문장이 길면 1024로는 JSON 완성 전에 한도 도달 → 2048로 여유
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "tarot_interpretation",
                 messages=messages,
-                max_tokens=2048,
                 response_format={"type": "json_object"},
             )
             raw = _first_choice_content(response, "get_tarot_interpretation").strip()
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[-1].replace("```", "").strip()
-            data = json.loads(raw)
+            data = _load_json(raw, TAROT_INTERPRET_SCHEMA, "get_tarot_interpretation")
 
             v = data.get("visual_data") or {}
             raw_scores = v.get("scores")
@@ -786,7 +959,8 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
         context_messages: Optional[List[dict]] = None,
     ) -> dict:
         """
-        타로 번호 선택 단계에서 시청자 말을 AI로 해석. 키워드 없이 자연어 처리.
+        타로 번호 선택 단계에서 시청자 말을 해석. 번호·취소만 있는 말은 tarot_numbers 문법으로 로컬 확정,
+        애매하면 AI로 자연어 처리.
         Returns: {"response": str, "emotion": str, "tarot_numbers": list|None, "tarot_cancel": bool}
         """
         try:
@@ -797,7 +971,7 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
             spread_count = 3
 
         out: dict = {
-            "response": "1번부터 78번까지 번호 %s개만 골라주세요." % spread_count,
+            "response": TAROT_REASK_DEFAULT.format(n=spread_count),
             "emotion": "neutral",
             "tarot_numbers": None,
             "tarot_cancel": False,
@@ -805,36 +979,40 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
         msg = _sanitize_user_text(user_message, max_len=500)
         if not msg:
             return out
+        # 번호만 말한 흔한 경우는 로컬 문법으로 바로 확정 (Groq 호출 없음)
+        local = resolve_tarot_selection(msg, spread_count)
+        if local is not None:
+            logger.info("타로 선택 로컬 처리: numbers=%s cancel=%s", local.get("tarot_numbers"), local.get("tarot_cancel"))
+            return local
         user_content = f"요청한 개수 N: {spread_count}\n시청자 말: {msg}"
         messages: List[dict] = []
         if context_messages:
             messages.extend(context_messages[-6:])
         messages.append({"role": "user", "content": user_content})
-        system = self._system_prompt(self.TAROT_SELECTION_SYSTEM)
+        system = self._system_prompt("tarot_selection")
         api_messages = [{"role": "system", "content": system}, *messages]
-        # 토큰 여유 필요 (JSON + tts_text 등). 256이면 'max completion tokens reached' 발생 가능
-        max_tok = 512
         try:
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "tarot_selection",
                 messages=api_messages,
-                max_tokens=max_tok,
                 response_format={"type": "json_object"},
             )
             raw = _first_choice_content(response, "process_tarot_selection").strip()
         except Exception as e:
             err_msg = str(e).lower()
-            if "400" in err_msg and "json_validate_failed" in err_msg:
+            repaired = _repair_failed_generation(e, TAROT_SELECTION_SCHEMA, "process_tarot_selection")
+            if repaired is not None:
+                raw = json.dumps(repaired, ensure_ascii=False)
+            elif "400" in err_msg and "json_validate_failed" in err_msg:
                 failed_gen = _extract_failed_generation(e)
                 if failed_gen:
                     feedback = "[JSON 검증 실패] 아래 출력을 유효한 JSON 한 줄로만 다시 출력하세요.\n\n실패한 출력:\n" + (failed_gen[:2000] if len(failed_gen) > 2000 else failed_gen)
                 else:
                     feedback = "[JSON 검증 실패] 이전 응답이 JSON 검증에 실패했습니다. response, emotion, tarot_numbers/tarot_cancel 형식만 한 줄 JSON으로 출력하세요."
                 try:
-                    response = self._client.chat.completions.create(
-                        model=self.model,
+                    response = self._create(
+                        "tarot_selection",
                         messages=api_messages + [{"role": "user", "content": feedback}],
-                        max_tokens=max_tok,
                         response_format={"type": "json_object"},
                     )
                     raw = _first_choice_content(response, "process_tarot_selection.retry_json_validate_failed").strip()
@@ -851,10 +1029,9 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                     f"시청자가 \"{msg}\"라고 했습니다. 이건 1~78 범위의 자연수 {spread_count}개로 인식되지 않습니다. "
                     f"왜 안 되는지 한 줄 설명한 뒤, 1~78 중 {spread_count}개만 골라달라고 재요청하는 문장을 한국어 존댓말로 한 문장만 출력하세요. JSON·마크다운 없이 그 문장만."
                 )
-                resp = self._client.chat.completions.create(
-                    model=self.model,
+                resp = self._create(
+                    "tarot_reask",
                     messages=[{"role": "system", "content": "한 문장만 출력하세요. JSON·설명 추가 없이."}, {"role": "user", "content": explain_prompt}],
-                    max_tokens=256,
                 )
                 fallback_text = _first_choice_content(resp, "process_tarot_selection.fallback_sentence").strip().strip("'\"")
                 # 사용자 말 그대로 돌려받거나 짧으면 기본 재요청 문구 사용
@@ -867,7 +1044,7 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                 logger.warning("타로 선택 설명 문장 생성 실패: %s", fallback_e)
             return out
         try:
-            data = json.loads(raw)
+            data = _load_json(raw, TAROT_SELECTION_SCHEMA, "process_tarot_selection")
             out["response"] = (data.get("response") or out["response"]).strip() or out["response"]
             tts_text = (data.get("tts_text") or "").strip()
             if tts_text:
@@ -896,7 +1073,7 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
             clean = clean[:spread_count]
             if has_duplicate:
                 out["tarot_numbers"] = None
-                out["response"] = f"중복된 번호가 있어요. 처음부터 다시 {spread_count}개 골라주세요."
+                out["response"] = TAROT_REASK_DUPLICATE.format(n=spread_count)
                 out["tts_text"] = out["response"]
                 logger.info("타로 번호 중복 감지 → 처음부터 재선택 요청")
             elif len(clean) >= spread_count:
@@ -911,18 +1088,17 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                         "예: 시청자 '34 35 56' → tarot_numbers: \"34;35;56\". 숫자 이어쓰지 말 것."
                     )
                     retry_user = f"요청 개수 N: {spread_count}\n시청자 말: {msg}\n\n이전 응답:\n{prev}\n\n위 이전 응답에 tarot_numbers를 \"숫자;숫자;...\" 형식(세미콜론 구분)으로 넣은 JSON 한 줄로 출력."
-                    retry_resp = self._client.chat.completions.create(
-                        model=self.model,
+                    retry_resp = self._create(
+                        "tarot_selection_fix",
                         messages=[
                             {"role": "system", "content": retry_system},
                             {"role": "user", "content": retry_user},
                         ],
-                        max_tokens=max_tok,
                         response_format={"type": "json_object"},
                     )
                     retry_raw = _first_choice_content(retry_resp, "process_tarot_selection.retry_fill_tarot_numbers").strip()
                     if retry_raw:
-                        retry_data = json.loads(retry_raw)
+                        retry_data = _load_json(retry_raw, TAROT_SELECTION_SCHEMA, "process_tarot_selection.retry")
                         nums = _parse_int_list(retry_data.get("tarot_numbers") or retry_data.get("tarotNumbers"))
                         retry_clean = [n for n in nums if 1 <= int(n) <= 78]
                         if len(retry_clean) >= spread_count:
@@ -931,18 +1107,17 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                         elif len(retry_clean) > 0:
                             # [3419]처럼 잘못 온 경우 → AI에게 그대로 보여주고 "N개 별도 번호로 다시" 한 번 더 요청
                             wrong_json = json.dumps(retry_data, ensure_ascii=False)
-                            fix_resp = self._client.chat.completions.create(
-                                model=self.model,
+                            fix_resp = self._create(
+                                "tarot_selection_fix",
                                 messages=[
                                     {"role": "system", "content": "tarot_numbers를 **세미콜론(;)으로 구분한 문자열**로 수정. 예: \"34;35;56\". 숫자 이어쓰지 말 것. 같은 JSON 한 줄로 출력."},
                                     {"role": "user", "content": f"요청 개수 N: {spread_count}\n시청자 말: {msg}\n\n잘못된 응답:\n{wrong_json}\n\ntarot_numbers만 \"숫자;숫자;숫자\" 형식(세미콜론 구분)으로 고친 JSON 한 줄로 출력."},
                                 ],
-                                max_tokens=max_tok,
                                 response_format={"type": "json_object"},
                             )
                             fix_raw = _first_choice_content(fix_resp, "process_tarot_selection.retry_fix_tarot_numbers").strip()
                             if fix_raw:
-                                fix_data = json.loads(fix_raw)
+                                fix_data = _load_json(fix_raw, TAROT_SELECTION_SCHEMA, "process_tarot_selection.fix")
                                 fix_nums = _parse_int_list(fix_data.get("tarot_numbers") or fix_data.get("tarotNumbers"))
                                 fix_clean = [n for n in fix_nums if 1 <= int(n) <= 78]
                                 if len(fix_clean) >= spread_count:
@@ -964,10 +1139,9 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                     f"시청자가 \"{msg}\"라고 했습니다. 이건 1~78 범위의 자연수 {spread_count}개로 인식되지 않습니다. "
                     f"왜 안 되는지 한 줄 설명한 뒤, 1~78 중 {spread_count}개만 골라달라고 재요청하는 문장을 한국어 존댓말로 한 문장만 출력하세요. JSON·마크다운 없이 그 문장만."
                 )
-                resp = self._client.chat.completions.create(
-                    model=self.model,
+                resp = self._create(
+                    "tarot_reask",
                     messages=[{"role": "system", "content": "한 문장만 출력하세요. JSON·설명 추가 없이."}, {"role": "user", "content": explain_prompt}],
-                    max_tokens=256,
                 )
                 fallback_text = _first_choice_content(resp, "process_tarot_selection.json_parse_fallback_sentence").strip().strip("'\"")
                 if fallback_text and len(fallback_text) > 20 and fallback_text.strip() != msg.strip():
@@ -980,28 +1154,8 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
             return out
 
     def _korean_numbers_to_digits(self, text: str) -> str:
-        """한글 숫자 표현을 아라비아 숫자로 치환 (하나 다섯 십삼 → 1 5 13)."""
-        if not text or not text.strip():
-            return text
-        # 긴 패턴 먼저 치환 (십삼 before 십/삼)
-        table = [
-            ("십삼", " 13 "), ("십이", " 12 "), ("십일", " 11 "), ("십구", " 19 "), ("십팔", " 18 "),
-            ("십칠", " 17 "), ("십육", " 16 "), ("십오", " 15 "), ("십사", " 14 "),
-            ("열셋", " 13 "), ("열둘", " 12 "), ("열하나", " 11 "), ("열한", " 11 "), ("열아홉", " 19 "), ("열여덟", " 18 "),
-            ("열일곱", " 17 "), ("열여섯", " 16 "), ("열다섯", " 15 "), ("열넷", " 14 "),
-            ("스무아홉", " 29 "), ("스무여덟", " 28 "), ("스무일곱", " 27 "), ("스무여섯", " 26 "),
-            ("스무다섯", " 25 "), ("스무넷", " 24 "), ("스무셋", " 23 "), ("스무둘", " 22 "), ("스무하나", " 21 "),
-            ("스물", " 20 "), ("스무", " 20 "), ("이십", " 20 "), ("삼십", " 30 "), ("사십", " 40 "),
-            ("오십", " 50 "), ("육십", " 60 "), ("칠십", " 70 "),
-            ("하나", " 1 "), ("둘", " 2 "), ("셋", " 3 "), ("넷", " 4 "), ("다섯", " 5 "),
-            ("여섯", " 6 "), ("일곱", " 7 "), ("여덟", " 8 "), ("아홉", " 9 "), ("열", " 10 "),
-            ("일", " 1 "), ("이", " 2 "), ("삼", " 3 "), ("사", " 4 "), ("오", " 5 "),
-            ("육", " 6 "), ("칠", " 7 "), ("팔", " 8 "), ("구", " 9 "), ("십", " 10 "),
-        ]
-        s = " " + (text or "") + " "
-        for k, v in table:
-            s = s.replace(k, v)
-        return s
+        """한글 숫자 표현을 아라비아 숫자로 치환 (하나 다섯 십삼 → 1 5 13). 트라이 한 번 훑기, 단어 경계 확인."""
+        return korean_numerals_to_digits(text)
 
     def _parse_tarot_numbers_fallback(
         self, text: str, spread_count: int, return_partial: bool = False
@@ -1068,26 +1222,27 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
             {"role": "user", "content": f"사용자 말: {safe_user_message}\n\n1~78 번호 {spread_count}개만 JSON으로."},
         ]
         try:
-            response = self._client.chat.completions.create(
-                model=self.model,
+            response = self._create(
+                "tarot_numbers",
                 messages=messages,
-                max_tokens=128,
                 response_format={"type": "json_object"},
             )
             raw = _first_choice_content(response, "parse_tarot_card_numbers").strip()
         except Exception as e:
             err_msg = str(e).lower()
-            if "400" in err_msg and "json_validate_failed" in err_msg:
+            repaired = _repair_failed_generation(e, TAROT_NUMBERS_SCHEMA, "parse_tarot_card_numbers")
+            if repaired is not None:
+                raw = json.dumps(repaired, ensure_ascii=False)
+            elif "400" in err_msg and "json_validate_failed" in err_msg:
                 failed_gen = _extract_failed_generation(e)
                 if failed_gen:
                     feedback = "[JSON 검증 실패] 아래 출력을 유효한 JSON 한 줄로만 다시 출력하세요.\n\n실패한 출력:\n" + (failed_gen[:1500] if len(failed_gen) > 1500 else failed_gen)
                 else:
                     feedback = "[JSON 검증 실패] 이전 응답이 JSON 검증에 실패했습니다. {\"numbers\": [1,2,3]} 형식만 한 줄로 출력하세요."
                 try:
-                    response = self._client.chat.completions.create(
-                        model=self.model,
+                    response = self._create(
+                        "tarot_numbers",
                         messages=messages + [{"role": "user", "content": feedback}],
-                        max_tokens=128,
                         response_format={"type": "json_object"},
                     )
                     raw = _first_choice_content(response, "parse_tarot_card_numbers.retry_json_validate_failed").strip()
@@ -1098,10 +1253,8 @@ JSON: {"response": "...", "tts_text": "...", "emotion": "감정키", "tarot_numb
                 logger.warning("타로 번호 추출 Groq 실패: %s", e)
                 return self._parse_tarot_numbers_fallback(safe_user_message, spread_count)
         try:
-            data = json.loads(raw)
-            nums = data.get("numbers")
-            if not isinstance(nums, list):
-                return self._parse_tarot_numbers_fallback(safe_user_message, spread_count)
+            data = _load_json(raw, TAROT_NUMBERS_SCHEMA, "parse_tarot_card_numbers")
+            nums = _parse_int_list(data.get("numbers"))
             out = []
             for x in nums[:spread_count]:
                 try:
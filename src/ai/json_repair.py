@@ -0,0 +1,205 @@
+"""
+LLM 출력에서 JSON 객체 꺼내기 (관대한 파서) + 메서드별 스키마 확인.
+
+GroqClient 메서드마다 코드펜스 제거, find("{")/rfind("}"), json.loads 를 따로 하고, 실패하면
+"[JSON 검증 실패]" 피드백으로 LLM을 한 번 더 불렀다. 흔한 깨짐은 로컬에서 고칠 수 있다:
+- 앞뒤 설명·코드펜스: 첫 '{'부터 짝이 맞는 '}'까지만 (문자열 안 괄호는 무시하며 한 번 훑음)
+- 문자열 안 날것의 줄바꿈·탭, 끝 쉼표(,} ,])
+- 작은따옴표·True/False/None (파이썬 dict 모양): ast.literal_eval
+- max_tokens에 잘린 객체: 열린 문자열·괄호를 닫고, 끝의 반쪽짜리 키/값은 버림
+고친 결과는 스키마(필수 키와 타입)로 확인해, 엉뚱한 객체를 성공으로 치지 않는다.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import json
+import re
+import tokenize
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from src.utils.metrics import metrics
+
+# 스키마: 필수 키 → 허용 타입. 값이 None인 키는 있기만 하면 됨
+Schema = Dict[str, Union[Type, Tuple[Type, ...], None]]
+
+REPLY_SCHEMA: Schema = {"response": str}
+REPLIES_SCHEMA: Schema = {"replies": list}
+TAROT_SELECTION_SCHEMA: Schema = {}  # response·tarot_numbers·tarot_cancel 모두 선택 (없으면 기본 재요청)
+TAROT_NUMBERS_SCHEMA: Schema = {"numbers": (list, str)}
+TAROT_FRAME_SCHEMA: Schema = {"visual_type": str}
+TAROT_INTERPRET_SCHEMA: Schema = {"interpretation": str}
+WAIT_REPLY_SCHEMA: Schema = {"response": str}
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+_PY_NAMES = {"true": "True", "false": "False", "null": "None"}  # 길이가 같아 자리 그대로 바꿈
+
+
+def _matches(data: Any, schema: Optional[Schema]) -> bool:
+    if not isinstance(data, dict):
+        return False
+    for key, typ in (schema or {}).items():
+        if key not in data:
+            return False
+        if typ is not None and not isinstance(data[key], typ):
+            return False
+    return True
+
+
+def _scan(text: str, start: int) -> Tuple[int, list, bool]:
+    """
+    text[start]('{')부터 훑어 짝 맞는 닫는 괄호 위치를 찾음.
+    반환: (끝 인덱스 또는 -1, 끝까지 닫히지 않은 괄호 스택, 문자열 안에서 끝났는지).
+    """
+    stack: list = []
+    in_str = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack and stack[-1] == ch:
+                stack.pop()
+                if not stack:
+                    return i, [], False
+    return -1, stack, in_str
+
+
+def _escape_control_in_strings(text: str) -> str:
+    """문자열 리터럴 안의 날것 줄바꿈·탭·CR을 이스케이프."""
+    out = []
+    in_str = False
+    escape = False
+    for ch in text:
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+            elif ch in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[ch])
+                continue
+        elif ch == '"':
+            in_str = True
+        out.append(ch)
+    return "".join(out)
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """문자열 밖의 끝 쉼표(,} ,])만 제거. 문자열 안 "a,]b"는 그대로."""
+    out = []
+    in_str = False
+    escape = False
+    n = len(text)
+    for i, ch in enumerate(text):
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def _python_literals(text: str) -> str:
+    """json의 true/false/null 이름 토큰만 파이썬 이름으로. 문자열 안 단어는 토크나이저가 STRING으로 묶어 건드리지 않음."""
+    lines = text.splitlines(keepends=True)
+    for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+        name = _PY_NAMES.get(tok.string) if tok.type == tokenize.NAME else None
+        if name:
+            row, col = tok.start
+            line = lines[row - 1]
+            lines[row - 1] = line[:col] + name + line[col + len(name):]
+    return "".join(lines)
+
+
+def _close_truncated(fragment: str, stack: list, in_str: bool) -> str:
+    """잘린 JSON 닫기: 열린 문자열을 닫고, 끝의 반쪽 키/쉼표/콜론을 정리한 뒤 괄호를 닫음."""
+    text = fragment + ('"' if in_str else "")
+    text = text.rstrip()
+    if not in_str:
+        # 잘린 숫자·리터럴("5"가 "56"의 앞부분일 수 있음)은 믿지 않고 버림
+        text = re.sub(r"(?<=[\[,:])\s*(?:-?[\d.]+|t|tr|tru|true|f|fa|fal|fals|false|n|nu|nul|null)$", "", text)
+    # "key": 까지만 왔거나 "key" 만 있는 꼬리, 끝 쉼표 제거
+    for _ in range(3):
+        before = text
+        text = re.sub(r',?\s*"[^"\\]*"\s*:\s*$', "", text)
+        text = re.sub(r",\s*$", "", text)
+        text = re.sub(r'([{,])\s*"[^"\\]*"\s*$', r"\1", text).rstrip()
+        text = re.sub(r",\s*$", "", text)
+        if text == before:
+            break
+    return text + "".join(reversed(stack))
+
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    escaped = _escape_control_in_strings(candidate)
+    try:
+        return json.loads(_strip_trailing_commas(escaped))
+    except ValueError:
+        pass
+    try:
+        # 작은따옴표 dict, True/False/None (json의 true/false/null은 파이썬 이름으로). 끝 쉼표는 파이썬이 허용
+        return ast.literal_eval(_python_literals(escaped))
+    except (ValueError, SyntaxError, MemoryError, RecursionError, tokenize.TokenError):
+        return None
+
+
+def extract_json(text: Optional[str], schema: Optional[Schema] = None, where: str = "") -> Optional[dict]:
+    """
+    LLM 출력 text에서 schema에 맞는 JSON 객체(dict)를 꺼냄. 못 꺼내면 None.
+    where: 메트릭 이름 (json_repair.repaired.<where> 등)
+    """
+    raw = (text or "").strip()
+    if not raw:
+        return None
+    tag = where or "unknown"
+    try:
+        data = json.loads(raw)
+        if _matches(data, schema):
+            return data
+    except ValueError:
+        pass
+    body = _FENCE.sub("", raw)
+    pos = body.find("{")
+    while pos != -1:
+        end, stack, in_str = _scan(body, pos)
+        if end != -1:
+            data = _loads(body[pos : end + 1])
+        else:
+            data = _loads(_close_truncated(body[pos:], stack, in_str))
+        if _matches(data, schema):
+            metrics.incr(f"json_repair.repaired.{tag}")
+            return data
+        # 앞쪽 '{'가 설명 속 괄호였을 수 있으니 다음 '{'부터 다시
+        pos = body.find("{", pos + 1)
+    metrics.incr(f"json_repair.failed.{tag}")
+    return None
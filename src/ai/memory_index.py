@@ -0,0 +1,200 @@
+"""
+요약 아카이브 검색 (RAG): 로컬 BM25 인덱스.
+
+ChatHistory가 요약할 때마다 새 요약 문단과, 윈도우에서 밀려난 대화 묶음을 문서로 넣어 두고,
+get_context_messages(query) 시점에 지금 배치 채팅과 관련 있는 기억 top-k만 프롬프트에 붙인다.
+요약 전체를 계속 프롬프트에 싣지 않아도 오래된 이야기를 다시 꺼낼 수 있다.
+
+토큰화: 한글은 형태소 분석기 없이 음절 바이그램("타로점" → 타로, 로점) + 두 글자 이하 단어 자체,
+영문·숫자는 소문자 단어. 인덱스 파일: history/memory_index.json (문서 + 단어 빈도).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 3
+DEFAULT_MIN_SCORE = 1.0
+DEFAULT_MAX_DOCS = 5000
+
+_K1 = 1.2
+_B = 0.75
+_WORD = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25용 토큰. 한글 단어는 음절 바이그램, 두 글자 이하면 단어 그대로."""
+    out: List[str] = []
+    for w in _WORD.findall((text or "").lower()):
+        if "가" <= w[0] <= "힣" and len(w) > 2:
+            out.extend(w[i:i + 2] for i in range(len(w) - 1))
+        elif len(w) > 1 or w.isdigit():
+            out.append(w)
+    return out
+
+
+@dataclass
+class MemoryHit:
+    text: str
+    kind: str  # "summary" | "exchange"
+    ts: float
+    score: float
+
+
+class MemoryIndex:
+    """문서 목록 + 역색인. 추가는 드물고(요약 때), 검색은 배치마다라 검색 쪽을 가볍게 유지."""
+
+    def __init__(self, index_path: Union[Path, str], max_docs: int = DEFAULT_MAX_DOCS):
+        self.path = Path(index_path)
+        self.max_docs = max_docs
+        self._docs: List[dict] = []  # {"text", "kind", "ts", "tf": {term: n}, "len": n}
+        self._seen: set = set()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_len = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            docs = data.get("docs") or []
+        except Exception as e:
+            logger.warning("기억 인덱스 로드 실패, 새로 만듦: %s", e)
+            return
+        for d in docs:
+            if isinstance(d, dict) and d.get("text"):
+                self._index_doc(d)
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        data = {"version": 1, "docs": self._docs}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning("기억 인덱스 저장 실패: %s", e)
+
+    def _index_doc(self, doc: dict) -> None:
+        if "tf" not in doc:
+            tf = Counter(tokenize(doc["text"]))
+            doc["tf"] = dict(tf)
+            doc["len"] = sum(tf.values())
+        idx = len(self._docs)
+        self._docs.append(doc)
+        self._seen.add(doc["text"])
+        self._total_len += doc["len"]
+        for term, n in doc["tf"].items():
+            self._postings.setdefault(term, {})[idx] = n
+
+    def _rebuild(self) -> None:
+        docs = self._docs
+        self._docs, self._seen, self._postings, self._total_len = [], set(), {}, 0
+        for d in docs:
+            self._index_doc(d)
+
+    def add(self, text: str, kind: str = "summary", ts: Optional[float] = None, save: bool = True) -> bool:
+        """문서 추가. 같은 텍스트가 이미 있거나 토큰이 없으면 False."""
+        text = (text or "").strip()
+        if not text or text in self._seen:
+            return False
+        tf = Counter(tokenize(text))
+        if not tf:
+            return False
+        doc = {"text": text, "kind": kind, "ts": ts if ts is not None else time.time(), "tf": dict(tf), "len": sum(tf.values())}
+        self._index_doc(doc)
+        if len(self._docs) > self.max_docs:
+            self._docs = self._docs[-self.max_docs:]
+            self._rebuild()
+        if save:
+            self.save()
+        return True
+
+    def add_many(self, texts: Iterable[str], kind: str, ts: Optional[float] = None) -> int:
+        added = sum(self.add(t, kind=kind, ts=ts, save=False) for t in texts)
+        if added:
+            self.save()
+        return added
+
+    def search(
+        self,
+        query: str,
+        top_k: int = DEFAULT_TOP_K,
+        min_score: float = DEFAULT_MIN_SCORE,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> List[MemoryHit]:
+        """BM25 상위 top_k. exclude 텍스트(이미 프롬프트에 있는 요약 줄 등)는 제외."""
+        terms = set(tokenize(query))
+        n_docs = len(self._docs)
+        if not terms or n_docs == 0:
+            return []
+        avg_len = self._total_len / n_docs or 1.0
+        scores: Dict[int, float] = {}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for idx, tf in posting.items():
+                dl = self._docs[idx]["len"]
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * dl / avg_len))
+        skip = set(exclude or ())
+        hits: List[MemoryHit] = []
+        for idx, score in sorted(scores.items(), key=lambda kv: kv[1], reverse=True):
+            if score < min_score:
+                break
+            doc = self._docs[idx]
+            if doc["text"] in skip:
+                continue
+            hits.append(MemoryHit(doc["text"], doc.get("kind", "summary"), float(doc.get("ts") or 0), score))
+            if len(hits) >= top_k:
+                break
+        return hits
+
+    def bootstrap_from_summaries(self, summaries_dir: Union[Path, str]) -> int:
+        """
+        기존 history/summaries/summary_*.json 백업을 인덱스에 넣음 (처음 한 번).
+        백업은 누적 요약이라 줄 단위로 나눠 중복 없이 넣는다.
+        """
+        added = 0
+        for path in sorted(Path(summaries_dir).glob("summary_*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            ts = path.stat().st_mtime
+            lines = [ln.strip() for ln in (data.get("summary") or "").splitlines()]
+            added += sum(self.add(ln, kind="summary", ts=ts, save=False) for ln in lines if ln)
+        if added:
+            self.save()
+            logger.info("요약 백업에서 기억 %d개 색인", added)
+        return added
+
+
+def chunk_exchanges(messages: List[dict], size: int = 6) -> List[str]:
+    """윈도우에서 밀려난 대화를 size개씩 묶어 검색용 문서 텍스트로 (역할 표시 포함)."""
+    out: List[str] = []
+    for i in range(0, len(messages), size):
+        lines = []
+        for m in messages[i:i + size]:
+            content = (m.get("content") or "").strip()
+            if not content:
+                continue
+            lines.append(content if m.get("role") == "user" else f"(나) {content}")
+        if lines:
+            out.append("\n".join(lines))
+    return out
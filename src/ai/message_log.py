@@ -0,0 +1,239 @@
+"""
+대화 메시지 추가 전용(append-only) 로그.
+
+ChatHistory.recent_messages 는 메모리에만 있어서 봇이 죽으면 최근 대화가 사라진다.
+메시지마다 JSONL 한 줄을 현재 세그먼트 끝에 붙이고(메시지당 O(1)), fsync는 N건 또는 T초마다 묶어서 한다
+(채팅이 끊겨도 마지막 묶음은 타이머가 T초 뒤 fsync).
+세그먼트가 커지면 새 파일로 넘기고 오래된 세그먼트는 개수 상한에서 지운다.
+재시작 시에는 최신 세그먼트부터 거꾸로 필요한 만큼(max_tokens)만 읽는다. 쓰다 끊긴 마지막 줄은 이어 쓰기 전에 잘라낸다.
+
+파일: history/log/seg_<첫 seq 12자리>.jsonl, 한 줄 = {"seq", "ts", "role", "content"}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, IO, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_BYTES = 1 << 20  # 1MB
+DEFAULT_MAX_SEGMENTS = 20
+DEFAULT_FSYNC_EVERY = 20
+DEFAULT_FSYNC_SEC = 1.0
+
+_SEGMENT_PREFIX = "seg_"
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+def _segment_first_seq(path: Path) -> int:
+    try:
+        return int(path.stem[len(_SEGMENT_PREFIX):])
+    except ValueError:
+        return -1
+
+
+def _read_records(path: Path) -> List[dict]:
+    """세그먼트 한 파일의 레코드. 쓰다 끊긴 마지막 줄 등 깨진 줄은 건너뜀."""
+    out: List[dict] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and isinstance(rec.get("seq"), int):
+                    out.append(rec)
+    except OSError as e:
+        logger.warning("메시지 로그 읽기 실패 %s: %s", path, e)
+    return out
+
+
+def _truncate_partial_tail(path: Path) -> None:
+    """파일이 줄바꿈으로 끝나지 않으면(쓰다 죽음) 마지막 완전한 줄까지 잘라냄. 안 그러면 다음 줄이 붙어 같이 깨짐."""
+    try:
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                idx = f.read(step).rfind(b"\n")
+                if idx != -1:
+                    pos += idx + 1
+                    break
+            f.truncate(pos)
+        logger.warning("메시지 로그 %s: 끊긴 마지막 줄 %d바이트 잘라냄", path.name, size - pos)
+    except OSError as e:
+        logger.warning("메시지 로그 끝 정리 실패 %s: %s", path, e)
+
+
+class MessageLog:
+    """세그먼트 회전 + fsync 묶음 처리 JSONL 로그."""
+
+    def __init__(
+        self,
+        log_dir: Union[Path, str],
+        segment_bytes: Optional[int] = None,
+        max_segments: Optional[int] = None,
+        fsync_every: Optional[int] = None,
+        fsync_sec: Optional[float] = None,
+    ):
+        """
+        log_dir: 세그먼트 저장 폴더.
+        나머지는 미지정 시 .env CHAT_LOG_SEGMENT_BYTES / CHAT_LOG_MAX_SEGMENTS / CHAT_LOG_FSYNC_EVERY / CHAT_LOG_FSYNC_SEC.
+        fsync_every=1 이면 매 메시지 fsync (가장 안전, 가장 느림).
+        """
+        env = os.environ
+        self.dir = Path(log_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(segment_bytes or env.get("CHAT_LOG_SEGMENT_BYTES") or DEFAULT_SEGMENT_BYTES)
+        self.max_segments = max(1, int(max_segments or env.get("CHAT_LOG_MAX_SEGMENTS") or DEFAULT_MAX_SEGMENTS))
+        self.fsync_every = max(1, int(fsync_every or env.get("CHAT_LOG_FSYNC_EVERY") or DEFAULT_FSYNC_EVERY))
+        self.fsync_sec = float(fsync_sec if fsync_sec is not None else (env.get("CHAT_LOG_FSYNC_SEC") or DEFAULT_FSYNC_SEC))
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._file_bytes = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self.next_seq = self._recover_next_seq()
+
+    def segments(self) -> List[Path]:
+        """세그먼트 파일 목록 (오래된 것부터)."""
+        files = [p for p in self.dir.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}") if _segment_first_seq(p) >= 0]
+        return sorted(files, key=_segment_first_seq)
+
+    def _recover_next_seq(self) -> int:
+        for path in reversed(self.segments()):
+            records = _read_records(path)
+            if records:
+                return records[-1]["seq"] + 1
+            first = _segment_first_seq(path)
+            if first >= 0:
+                return first
+        return 0
+
+    def _open_segment(self) -> None:
+        """최신 세그먼트가 상한 미만이면 이어 쓰고, 아니면 새 세그먼트."""
+        segs = self.segments()
+        if segs and segs[-1].stat().st_size < self.segment_bytes:
+            path = segs[-1]
+            _truncate_partial_tail(path)
+        else:
+            path = self.dir / f"{_SEGMENT_PREFIX}{self.next_seq:012d}{_SEGMENT_SUFFIX}"
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_bytes = path.stat().st_size if path.exists() else 0
+
+    def _rotate(self) -> None:
+        self._close_file()
+        path = self.dir / f"{_SEGMENT_PREFIX}{self.next_seq:012d}{_SEGMENT_SUFFIX}"
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_bytes = 0
+        segs = self.segments()
+        for old in segs[:-self.max_segments]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def append(self, role: str, content: str) -> int:
+        """메시지 한 건 추가. 부여한 seq 반환. 파일 끝에 한 줄 쓰기 + flush, fsync는 묶어서."""
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            elif self._file_bytes >= self.segment_bytes:
+                self._rotate()
+            seq = self.next_seq
+            line = json.dumps({"seq": seq, "ts": time.time(), "role": role, "content": content}, ensure_ascii=False) + "\n"
+            self._file.write(line)
+            self._file.flush()  # 프로세스가 죽어도 OS 버퍼에는 남음
+            self._file_bytes += len(line.encode("utf-8"))
+            self.next_seq = seq + 1
+            self._unsynced += 1
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_sec:
+                self._fsync(now)
+            elif self._sync_timer is None:
+                # 이후 채팅이 없어도 fsync_sec 안에 디스크에 닿도록
+                self._sync_timer = threading.Timer(self.fsync_sec, self._timed_sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            return seq
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            self._sync_timer = None
+            self._fsync()
+
+    def _fsync(self, now: Optional[float] = None) -> None:
+        if self._file is None or self._unsynced == 0:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.debug("메시지 로그 fsync 실패: %s", e)
+        self._unsynced = 0
+        self._last_sync = now if now is not None else time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._fsync()
+
+    def _close_file(self) -> None:
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+        if self._file is None:
+            return
+        self._fsync()
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
+
+    def tail(
+        self,
+        max_tokens: int,
+        min_seq: int = 0,
+        count_tokens: Callable[[str], int] = lambda s: max(1, len(s) // 4),
+    ) -> List[dict]:
+        """
+        seq >= min_seq 인 최근 메시지를 토큰 합이 max_tokens 이하가 되도록 뒤에서부터 모아 순서대로 반환.
+        최신 세그먼트부터 거꾸로 읽고, 필요한 만큼 모이면 더 오래된 세그먼트는 열지 않는다.
+        """
+        picked: List[dict] = []
+        acc = 0
+        for path in reversed(self.segments()):
+            records = _read_records(path)
+            for rec in reversed(records):
+                if rec["seq"] < min_seq:
+                    return list(reversed(picked))
+                t = count_tokens(rec.get("content") or "")
+                if picked and acc + t > max_tokens:
+                    return list(reversed(picked))
+                picked.append(rec)
+                acc += t
+            if _segment_first_seq(path) <= min_seq:
+                break
+        return list(reversed(picked))
@@ -0,0 +1,208 @@
+"""
+작업별 모델 라우팅 (큰 모델 / 빠른 작은 모델) + 실패 시 다른 모델로 넘기기.
+
+GroqClient는 모든 호출에 GROQ_MODEL 하나를 써서, "창 닫힐 때까지 기다려 주세요" 한 줄이나 번호 추출도
+120B 모델 대기열·분당 토큰(TPM)을 같이 썼다. 작업(task)마다 ModelProfile(모델, max_tokens, temperature, timeout)을 두고
+가벼운 작업은 GROQ_FAST_MODEL로 보낸다. 429·5xx·타임아웃·모델 없음이면 다음 후보 모델로 넘기고,
+429 받은 모델은 잠깐(retry-after 또는 COOLDOWN_SEC) 건너뛴다. OpenAI 클라이언트는 max_retries=0으로 만들어
+SDK가 429·5xx를 안에서 다시 보내며 기다리지 않게 한다 (재시도는 여기와 RequestExecutor만). 400 JSON 검증 실패처럼 요청 자체 문제는 그대로 올림.
+호출 한 번은 RequestExecutor(request_executor.py)가 timeout·hedge를 걸어 실행하고, 모델을 넘겨 가며 쓰는 전체 시간은
+작업별 budget_sec 안으로 제한한다.
+
+.env:
+  GROQ_MODEL (큰 모델), GROQ_FAST_MODEL (작은 모델), GROQ_FALLBACK_MODELS (쉼표 구분, 큰 모델 실패 시 순서대로)
+  GROQ_MODEL_<TASK> 로 작업별 모델 직접 지정 (예: GROQ_MODEL_SUMMARIZE=llama-3.3-70b-versatile)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+from src.utils.metrics import metrics
+from .request_executor import RequestExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAST_MODEL = "llama-3.1-8b-instant"
+DEFAULT_FALLBACK_MODELS = ("llama-3.3-70b-versatile",)
+COOLDOWN_SEC = 20.0
+
+TIER_MAIN = "main"
+TIER_FAST = "fast"
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """
+    작업 하나의 호출 설정. model은 라우터가 tier에 따라 채움 (GROQ_MODEL_<TASK>가 있으면 그것).
+    timeout_sec: 요청 한 번의 상한, budget_sec: 대체 모델까지 포함한 전체 상한, hedge: p95 넘으면 한 번 더 보낼지.
+    """
+    tier: str
+    max_tokens: int
+    temperature: Optional[float] = None
+    timeout_sec: float = 30.0
+    budget_sec: float = 45.0
+    hedge: bool = True
+    model: str = ""
+
+
+# task 이름 → 기본 프로필. 번호 추출처럼 정답이 있는 작업은 temperature 0.
+# 해석(2048토큰)은 중복 요청 비용이 커서 hedge 안 함. 요약은 백그라운드라 시청자를 기다리게 하지 않음
+TASK_PROFILES: Dict[str, ModelProfile] = {
+    "reply": ModelProfile(TIER_MAIN, 256, timeout_sec=10.0, budget_sec=15.0),
+    "reply_batch": ModelProfile(TIER_MAIN, 1024, timeout_sec=15.0, budget_sec=25.0),
+    # 스트리밍: create가 첫 응답 헤더에서 돌아옴. 진 쪽 스트림이 연결을 붙잡고 있게 되므로 hedge 안 함
+    "reply_batch_stream": ModelProfile(TIER_MAIN, 1024, timeout_sec=15.0, budget_sec=25.0, hedge=False),
+    "summarize": ModelProfile(TIER_FAST, 512, timeout_sec=20.0, budget_sec=40.0, hedge=False),
+    "tarot_wait": ModelProfile(TIER_FAST, 128, timeout_sec=5.0, budget_sec=8.0),
+    "tarot_numbers": ModelProfile(TIER_FAST, 128, temperature=0.0, timeout_sec=5.0, budget_sec=8.0),
+    "tarot_frame": ModelProfile(TIER_FAST, 256, timeout_sec=8.0, budget_sec=12.0),
+    "tarot_selection": ModelProfile(TIER_MAIN, 512, temperature=0.2, timeout_sec=10.0, budget_sec=15.0),
+    "tarot_selection_fix": ModelProfile(TIER_FAST, 512, temperature=0.0, timeout_sec=8.0, budget_sec=10.0),
+    "tarot_reask": ModelProfile(TIER_FAST, 256, timeout_sec=5.0, budget_sec=8.0),
+    "tarot_interpretation": ModelProfile(TIER_MAIN, 2048, timeout_sec=30.0, budget_sec=45.0, hedge=False),
+}
+
+# 다른 모델로 넘길 에러 (모델·서버 쪽 문제). 요청 형식 문제(400)는 어느 모델이든 같으니 넘기지 않음
+_RETRYABLE = re.compile(
+    r"\b(429|500|502|503|504)\b|rate_limit|over capacity|overloaded|timed? ?out|timeout|connection"
+    r"|model_not_found|model_decommissioned|does not exist|not supported",
+    re.IGNORECASE,
+)
+_RETRY_AFTER = re.compile(r"try again in (?:(\d+)m)?([\d.]+)s", re.IGNORECASE)
+
+
+def _env_models(name: str) -> List[str]:
+    return [m.strip() for m in (os.environ.get(name) or "").split(",") if m.strip()]
+
+
+def is_retryable(err: Exception) -> bool:
+    """다른 모델로 다시 보낼 만한 에러인지 (429·5xx·타임아웃·연결·모델 없음)."""
+    if isinstance(err, TimeoutError):
+        return True
+    status = getattr(err, "status_code", None)
+    if status == 429 or (isinstance(status, int) and status >= 500):
+        return True
+    if status == 400 and "model_" not in str(err):
+        # 요청 형식 문제 (예: 스트리밍 + response_format 거부)는 "not supported" 문구가 있어도 모델을 바꿔 봐야 같음
+        return False
+    return bool(_RETRYABLE.search(f"{type(err).__name__} {err}"))
+
+
+def _is_rate_limited(err: Exception) -> bool:
+    return getattr(err, "status_code", None) == 429 or "429" in str(err) or "rate_limit" in str(err).lower()
+
+
+def _retry_after_sec(err: Exception) -> float:
+    """429 응답의 retry-after 헤더 또는 메시지의 'try again in 1m2.5s' → 초. 없으면 COOLDOWN_SEC."""
+    headers = getattr(getattr(err, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+            if value is not None:
+                return min(300.0, max(0.0, float(value)))
+        except (TypeError, ValueError):
+            pass
+    m = _RETRY_AFTER.search(str(err))
+    if not m:
+        return COOLDOWN_SEC
+    return min(300.0, int(m.group(1) or 0) * 60 + float(m.group(2)))
+
+
+class ModelRouter:
+    """task → ModelProfile, 후보 모델을 순서대로 시도. GroqClient가 스레드(to_thread)에서 불러도 안전."""
+
+    def __init__(self, client: Any, main_model: str, fast_model: Optional[str] = None, fallback_models: Optional[List[str]] = None):
+        """
+        client: OpenAI 호환 클라이언트 (chat.completions.create).
+        fast_model / fallback_models 미지정 시 .env GROQ_FAST_MODEL / GROQ_FALLBACK_MODELS.
+        """
+        # 다른 곳에서 만든 클라이언트를 받아도 SDK 내부 재시도는 끔 (429가 여기까지 와야 쿨다운·대체 모델)
+        with_options = getattr(client, "with_options", None)
+        self._client = with_options(max_retries=0) if callable(with_options) else client
+        self.main_model = main_model
+        self.fast_model = (fast_model or os.environ.get("GROQ_FAST_MODEL") or "").strip() or DEFAULT_FAST_MODEL
+        if fallback_models is None:
+            fallback_models = _env_models("GROQ_FALLBACK_MODELS") or list(DEFAULT_FALLBACK_MODELS)
+        self.fallback_models = [m for m in fallback_models if m]
+        self._cooldown_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.executor = RequestExecutor()
+
+    def profile(self, task: str) -> ModelProfile:
+        base = TASK_PROFILES.get(task) or TASK_PROFILES["reply_batch"]
+        override = (os.environ.get(f"GROQ_MODEL_{task.upper()}") or "").strip()
+        model = override or (self.fast_model if base.tier == TIER_FAST else self.main_model)
+        return replace(base, model=model)
+
+    def candidates(self, task: str) -> List[str]:
+        """시도 순서: 작업 모델 → (작은 모델이면 큰 모델) → 대체 모델들. 쿨다운 중인 모델은 뒤로."""
+        prof = self.profile(task)
+        order: List[str] = [prof.model]
+        if prof.tier == TIER_FAST:
+            order.append(self.main_model)
+        order.extend(self.fallback_models)
+        unique: List[str] = []
+        for m in order:
+            if m not in unique:
+                unique.append(m)
+        now = time.monotonic()
+        with self._lock:
+            ready = [m for m in unique if self._cooldown_until.get(m, 0.0) <= now]
+        cooling = [m for m in unique if m not in ready]
+        return ready + cooling
+
+    def _cool_down(self, model: str, err: Exception) -> None:
+        sec = _retry_after_sec(err)
+        with self._lock:
+            self._cooldown_until[model] = time.monotonic() + sec
+        logger.info("모델 %s 한도(429) → %.0f초 동안 다른 모델 우선", model, sec)
+
+    def create(self, task: str, messages: List[dict], max_tokens: Optional[int] = None, **kwargs: Any) -> Any:
+        """
+        task 프로필로 chat.completions.create. 넘길 만한 에러면 다음 후보 모델로, 모두 실패하면 마지막 에러를 올림.
+        max_tokens를 주면 프로필 값 대신 사용. 나머지 kwargs(response_format, tools 등)는 그대로 전달.
+        전체 시간이 budget_sec를 넘으면 남은 후보는 건너뛰고 TimeoutError.
+        """
+        prof = self.profile(task)
+        params: Dict[str, Any] = {"max_tokens": max_tokens or prof.max_tokens}
+        if prof.temperature is not None:
+            params["temperature"] = prof.temperature
+        params.update(kwargs)
+        deadline = time.monotonic() + prof.budget_sec
+        last_err: Optional[Exception] = None
+        for i, model in enumerate(self.candidates(task)):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.5:
+                last_err = last_err or TimeoutError(f"{task}: 예산 {prof.budget_sec:.0f}초 소진")
+                break
+
+            def call(timeout: float, model: str = model) -> Any:
+                return self._client.chat.completions.create(model=model, messages=messages, timeout=timeout, **params)
+
+            start = time.perf_counter()
+            try:
+                response = self.executor.run(task, call, min(prof.timeout_sec, remaining), hedge=prof.hedge)
+            except Exception as e:
+                last_err = e
+                metrics.incr(f"llm.errors.{task}")
+                if not is_retryable(e):
+                    raise
+                if _is_rate_limited(e):
+                    self._cool_down(model, e)
+                logger.warning("%s: 모델 %s 실패, 다음 모델 시도: %s", task, model, str(e)[:200])
+                continue
+            metrics.observe(f"llm.latency_sec.{task}", time.perf_counter() - start)
+            metrics.incr(f"llm.calls.{model}")
+            if i > 0:
+                metrics.incr(f"llm.fallback.{task}")
+                logger.info("%s: 대체 모델 %s 로 응답", task, model)
+            return response
+        assert last_err is not None
+        raise last_err
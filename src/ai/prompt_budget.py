@@ -0,0 +1,163 @@
+"""
+reply_batch 입력 토큰 예산 맞추기.
+
+채팅이 몰리면 배치 하나에 줄이 수십 개(줄당 최대 500자)가 들어가고, 그 앞에 캐릭터 system과
+최근 대화(최대 3000토큰)·요약·관련 기억이 붙어 프롬프트 크기와 첫 토큰까지 시간이 들쭉날쭉했다.
+구역별 토큰을 count_tokens로 재서 CHAT_PROMPT_MAX_TOKENS 안에 맞춘다. 줄이는 순서 (덜 중요한 것부터):
+1. 채팅 줄이 예산의 CHAT_PROMPT_CHAT_SHARE 몫을 넘으면 뒤쪽 줄부터 뺌 (배치는 이미 후원 > 스트리머 > 역할 > 일반 순)
+2. 오래된 최근 대화 (마지막 min_recent개는 남김)
+3. 관련 기억 블록
+4. 채팅 줄 더 (최소 1줄)
+5. 요약 블록, 남은 최근 대화
+뺀 채팅 줄은 "(그 밖에 채팅 N개 생략: 닉네임…)" 한 줄로 알려 모델이 몰린 상황을 알게 한다.
+system 프롬프트와 타로 단계·시각 같은 지시문(extra)은 줄이지 않는다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.utils.metrics import metrics
+from .chat_history import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 6000
+DEFAULT_CHAT_SHARE = 0.4
+DEFAULT_MIN_RECENT = 4
+MESSAGE_OVERHEAD = 4  # 메시지 하나당 role·구분자 토큰 (대략)
+OMITTED_NAMES = 5  # 생략 줄에 적는 닉네임 수
+
+
+@dataclass
+class BudgetResult:
+    """예산에 맞춘 결과. context/lines는 그대로 messages·채팅 목록에 쓰면 됨."""
+    context: List[dict]
+    lines: List[str]
+    omitted_note: str = ""
+    tokens: int = 0
+    dropped_lines: int = 0
+    dropped_context: List[dict] = field(default_factory=list)
+
+
+def _message_cost(content: str) -> int:
+    return count_tokens(content or "") + MESSAGE_OVERHEAD
+
+
+def _line_cost(line: str) -> int:
+    return count_tokens(line) + 1  # 줄바꿈
+
+
+def omitted_note(dropped: List[str]) -> str:
+    """뺀 채팅 줄 요약 한 줄. 닉네임은 앞에서부터 중복 없이 OMITTED_NAMES개."""
+    if not dropped:
+        return ""
+    names: List[str] = []
+    for line in dropped:
+        name = line.split(":", 1)[0].strip() if ":" in line else ""
+        if name and name not in names:
+            names.append(name)
+    shown = ", ".join(names[:OMITTED_NAMES]) + (" 등" if len(names) > OMITTED_NAMES else "")
+    return f"(그 밖에 채팅 {len(dropped)}개 생략" + (f": {shown}" if shown else "") + ")"
+
+
+class PromptBudget:
+    """reply_batch용 입력 토큰 예산. GroqClient 하나당 하나."""
+
+    def __init__(self, max_tokens: Optional[int] = None, chat_share: Optional[float] = None, min_recent: int = DEFAULT_MIN_RECENT):
+        """미지정 시 .env CHAT_PROMPT_MAX_TOKENS / CHAT_PROMPT_CHAT_SHARE. max_tokens 0 이하면 자르지 않음(측정만)."""
+        env = os.environ
+        self.max_tokens = int(max_tokens if max_tokens is not None else (env.get("CHAT_PROMPT_MAX_TOKENS") or DEFAULT_MAX_TOKENS))
+        share = float(chat_share if chat_share is not None else (env.get("CHAT_PROMPT_CHAT_SHARE") or DEFAULT_CHAT_SHARE))
+        self.chat_share = min(1.0, max(0.05, share))
+        self.min_recent = max(0, min_recent)
+
+    def fit(
+        self,
+        system: str,
+        context: List[dict],
+        lines: List[str],
+        header: str = "",
+        extra: str = "",
+        system_tokens: Optional[int] = None,
+    ) -> BudgetResult:
+        """
+        system: system 프롬프트 전체, context: get_context_messages 결과 (앞 system=요약, 뒤 system=관련 기억),
+        lines: 우선순위 순 채팅 줄, header/extra: 마지막 user 메시지의 채팅 목록 앞·뒤 고정 문구.
+        system_tokens: 미리 잰 system 토큰 수 (SystemPrompts). 없으면 여기서 잼.
+        """
+        context = list(context or [])
+        lines = list(lines)
+        system_cost = (system_tokens + MESSAGE_OVERHEAD) if system_tokens is not None else _message_cost(system)
+        fixed = system_cost + _message_cost(header + extra)
+        # context 구역 나누기: 앞쪽 system(요약) / 대화 / 뒤쪽 system(관련 기억)
+        lead = 0
+        while lead < len(context) and context[lead].get("role") == "system":
+            lead += 1
+        tail = len(context)
+        while tail > lead and context[tail - 1].get("role") == "system":
+            tail -= 1
+        summary, convo, memory = context[:lead], context[lead:tail], context[tail:]
+        ctx_cost = {id(m): _message_cost(m.get("content") if isinstance(m.get("content"), str) else "") for m in context}
+        costs = [_line_cost(ln) for ln in lines]
+        dropped_lines: List[str] = []
+        dropped_ctx: List[dict] = []
+
+        def total() -> int:
+            note = omitted_note(dropped_lines)
+            return (
+                fixed
+                + sum(ctx_cost[id(m)] for m in summary + convo + memory)
+                + sum(costs[: len(lines)])
+                + (_line_cost(note) if note else 0)
+            )
+
+        def drop_line() -> bool:
+            if len(lines) <= 1:
+                return False
+            dropped_lines.insert(0, lines.pop())
+            return True
+
+        before = total()
+        if self.max_tokens > 0 and before > self.max_tokens:
+            # 1. 채팅 줄 몫
+            chat_cap = int(self.max_tokens * self.chat_share)
+            while len(lines) > 1 and sum(costs[: len(lines)]) > chat_cap:
+                drop_line()
+            # 2. 오래된 대화
+            while total() > self.max_tokens and len(convo) > self.min_recent:
+                dropped_ctx.append(convo.pop(0))
+            # 3. 관련 기억
+            while total() > self.max_tokens and memory:
+                dropped_ctx.append(memory.pop())
+            # 4. 채팅 줄 더
+            while total() > self.max_tokens and drop_line():
+                pass
+            # 5. 요약, 남은 대화
+            while total() > self.max_tokens and summary:
+                dropped_ctx.append(summary.pop())
+            while total() > self.max_tokens and convo:
+                dropped_ctx.append(convo.pop(0))
+        result = BudgetResult(
+            context=summary + convo + memory,
+            lines=lines,
+            omitted_note=omitted_note(dropped_lines),
+            tokens=total(),
+            dropped_lines=len(dropped_lines),
+            dropped_context=dropped_ctx,
+        )
+        metrics.observe("prompt.input_tokens.reply_batch", result.tokens)
+        if result.tokens < before:
+            metrics.incr("prompt.budget.trimmed")
+            metrics.incr("prompt.budget.dropped_lines", result.dropped_lines)
+            metrics.incr("prompt.budget.dropped_context", len(dropped_ctx))
+            logger.info(
+                "프롬프트 예산 %d토큰: %d → %d (채팅 %d줄·컨텍스트 %d개 뺌)",
+                self.max_tokens, before, result.tokens, result.dropped_lines, len(dropped_ctx),
+            )
+        if result.tokens > self.max_tokens > 0:
+            metrics.incr("prompt.budget.over")
+        return result
@@ -0,0 +1,73 @@
+"""
+프롬프트 앞부분(prefix) 재사용 측정.
+
+제공자 쪽 프롬프트 캐시는 앞에서부터 같은 토큰이 이어질 때만 맞는다. 그래서 메시지는
+[고정 system] → [가끔 바뀌는 요약] → [뒤에만 붙는 최근 대화] → [매번 바뀌는 마지막 user] 순으로 쌓고,
+요청마다 직전 요청과 앞에서부터 몇 글자가 같은지 재서 metrics에 남긴다 (/api/metrics).
+응답 usage에 캐시 토큰 수(prompt_tokens_details.cached_tokens)가 있으면 그것도 기록.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+from src.utils.metrics import metrics
+
+
+def _message_key(m: dict) -> Tuple[str, str]:
+    content = m.get("content")
+    if not isinstance(content, str):
+        content = repr(content)
+    return (str(m.get("role") or ""), content)
+
+
+class PrefixTracker:
+    """작업(task)별 직전 메시지 목록을 기억해 공통 앞부분 길이를 잰다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last: Dict[str, List[Tuple[str, str, str]]] = {}  # task → [(role, digest, content)]
+
+    def observe(self, task: str, messages: List[dict]) -> float:
+        """직전 같은 task 요청과 앞부분이 겹치는 글자 비율(0~1)을 기록하고 반환."""
+        current = []
+        for m in messages:
+            role, content = _message_key(m)
+            current.append((role, hashlib.sha1(content.encode("utf-8")).hexdigest(), content))
+        total = sum(len(c) for _, _, c in current) or 1
+        with self._lock:
+            prev = self._last.get(task) or []
+            self._last[task] = current
+        shared = 0
+        shared_msgs = 0
+        for (role, digest, content), (p_role, p_digest, p_content) in zip(current, prev):
+            if role == p_role and digest == p_digest:
+                shared += len(content)
+                shared_msgs += 1
+                continue
+            if role == p_role:
+                shared += len(os.path.commonprefix([content, p_content]))
+            break
+        ratio = shared / total
+        metrics.observe(f"prompt.prefix_reuse.{task}", ratio)
+        metrics.observe(f"prompt.prefix_messages.{task}", shared_msgs)
+        metrics.incr(f"prompt.prefix_chars_shared.{task}", shared)
+        metrics.incr(f"prompt.prefix_chars_total.{task}", total)
+        return ratio
+
+
+def record_usage(response: Any, task: str) -> None:
+    """응답 usage의 프롬프트 토큰·캐시 적중 토큰 수를 기록 (필드가 없으면 무시)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if isinstance(prompt_tokens, int):
+        metrics.incr(f"groq.prompt_tokens.{task}", prompt_tokens)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if isinstance(cached, int):
+        metrics.incr(f"groq.cached_prompt_tokens.{task}", cached)
@@ -0,0 +1,148 @@
+"""
+LLM 호출 마감 시간(deadline) + 지연 꼬리 자르기(hedged request).
+
+ModelRouter가 후보 모델마다 부르는 한 번의 호출을 여기서 실행한다.
+- 호출마다 timeout(남은 예산 안에서)을 걸어, 느린 응답이 시청자를 무한정 기다리게 하지 않음
+- 작업(task)별 최근 지연의 p95를 재 두고, 그 시간이 지나도 응답이 없으면 같은 요청을 한 번 더 보냄(hedge).
+  먼저 끝난 쪽을 쓰고 나머지는 버린다. 보통 응답(중앙값)은 그대로, 드문 느린 응답만 잘린다.
+  동기 OpenAI 클라이언트는 진행 중인 요청을 끊을 수 없어서, 진 쪽은 결과만 버리고 자기 timeout에서 끝난다.
+
+진 쪽·마감을 넘긴 호출은 자기 timeout까지 워커 하나를 붙잡는다 (SDK 재시도는 꺼 둬서 timeout 한 번이 상한).
+그래서 지금 돌고 있는 호출 수를 세어 게이지(llm.executor.active)로 내보내고, 남는 워커가 없으면 hedge를 보내지 않는다
+(hedge가 새 요청 자리를 빼앗아 대기열 뒤에서 마감을 넘기지 않도록). 큐에서 기다린 시간은 llm.executor.queue_sec.
+
+.env: GROQ_HEDGE=0 이면 hedge 끔. GROQ_HEDGE_MIN_SAMPLES(기본 20) 만큼 지연 기록이 쌓인 작업만 hedge.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_WORKERS = 8
+HEDGE_MIN_DELAY_SEC = 0.3
+_WINDOW = 200
+
+
+class RequestExecutor:
+    """task별 지연 기록 + 스레드 풀에서 호출 실행. GroqClient 하나당 하나."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, hedge: Optional[bool] = None, min_samples: Optional[int] = None):
+        """hedge / min_samples 미지정 시 .env GROQ_HEDGE / GROQ_HEDGE_MIN_SAMPLES."""
+        env = os.environ
+        if hedge is None:
+            hedge = (env.get("GROQ_HEDGE") or "1").strip().lower() in ("1", "true", "yes", "on")
+        self.hedge_enabled = hedge
+        self.min_samples = max(1, int(min_samples or env.get("GROQ_HEDGE_MIN_SAMPLES") or DEFAULT_MIN_SAMPLES))
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._latency: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._active = 0  # 워커에서 실제로 돌고 있는 호출 수 (버려진 호출 포함)
+
+    def record(self, task: str, seconds: float) -> None:
+        with self._lock:
+            self._latency.setdefault(task, deque(maxlen=_WINDOW)).append(seconds)
+
+    def p95(self, task: str) -> Optional[float]:
+        """최근 지연의 p95. 기록이 min_samples 미만이면 None."""
+        with self._lock:
+            samples = sorted(self._latency.get(task) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
+
+    def saturated(self) -> bool:
+        """남는 워커가 없음 (새 호출은 앞 호출이 끝날 때까지 큐에서 기다림)."""
+        return self.active >= self.max_workers
+
+    def _submit(self, call: Callable[[float], Any], timeout: float) -> Future:
+        """call(timeout)을 풀에 넣음. 시작·종료 때 active를 세고, 큐에서 기다린 시간을 기록."""
+        submitted = time.monotonic()
+
+        def run() -> Any:
+            with self._lock:
+                self._active += 1
+                metrics.set_gauge("llm.executor.active", self._active)
+            metrics.observe("llm.executor.queue_sec", time.monotonic() - submitted)
+            try:
+                # 큐에서 기다린 만큼 요청 timeout을 줄여 마감을 지킴
+                return call(max(0.5, timeout - (time.monotonic() - submitted)))
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    metrics.set_gauge("llm.executor.active", self._active)
+
+        if self.saturated():
+            metrics.incr("llm.executor.saturated")
+        return self._pool.submit(run)
+
+    def hedge_delay(self, task: str) -> Optional[float]:
+        """이 시간 안에 응답이 없으면 한 번 더 보냄. hedge 안 할 작업이면 None."""
+        if not self.hedge_enabled:
+            return None
+        p95 = self.p95(task)
+        return None if p95 is None else max(HEDGE_MIN_DELAY_SEC, p95)
+
+    def run(self, task: str, call: Callable[[float], Any], timeout_sec: float, hedge: bool = True) -> Any:
+        """
+        call(timeout) 을 실행해 결과 반환. timeout_sec 안에 아무 결과도 없으면 TimeoutError.
+        hedge=True면 p95가 지나도 응답이 없을 때 같은 call을 하나 더 띄우고 먼저 끝난 쪽을 반환.
+        둘 다 실패하면 마지막 에러를 올림 (ModelRouter가 다음 모델로 넘길지 판단).
+        """
+        start = time.monotonic()
+        primary = self._submit(call, timeout_sec)
+        pending = {primary}
+        delay = self.hedge_delay(task) if hedge else None
+        if delay is not None and delay < timeout_sec:
+            done, _ = wait(pending, timeout=delay)
+            if not done and self.saturated():
+                metrics.incr(f"llm.hedge.skipped_busy.{task}")
+            elif not done:
+                metrics.incr(f"llm.hedge.fired.{task}")
+                logger.debug("%s: %.2f초(p95) 넘어 hedge 요청", task, delay)
+                pending.add(self._submit(call, timeout_sec - delay))
+        last_err: Optional[Exception] = None
+        while pending:
+            left = start + timeout_sec - time.monotonic()
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    last_err = e
+                    continue
+                self._abandon(pending)
+                self.record(task, time.monotonic() - start)
+                if fut is not primary:
+                    metrics.incr(f"llm.hedge.won.{task}")
+                return result
+        self._abandon(pending)
+        if last_err is not None and not pending:
+            raise last_err
+        metrics.incr(f"llm.deadline_exceeded.{task}")
+        raise TimeoutError(f"{task}: {timeout_sec:.1f}초 안에 응답 없음")
+
+    @staticmethod
+    def _abandon(futures: "set[Future]") -> None:
+        """시작 전이면 취소, 이미 도는 중이면 결과만 버림 (각자 timeout에서 끝남)."""
+        for fut in futures:
+            if not fut.cancel():
+                metrics.incr("llm.executor.abandoned")
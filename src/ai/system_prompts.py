@@ -0,0 +1,118 @@
+"""
+캐릭터 설정(config/character.txt) + 작업별 system 프롬프트를 미리 합쳐 두기.
+
+예전엔 character.txt를 시작할 때 한 번 읽고, 호출마다 "캐릭터\n\n기본 프롬프트"를 새로 이어 붙였다
+(reply_batch에서는 검색 안내까지). 합친 문자열과 토큰 수를 이름별로 한 번만 만들어 두고,
+파일 수정 시각·크기가 바뀌었을 때만 다시 읽는다 (확인은 RELOAD_CHECK_SEC마다 stat 한 번).
+방송 중 character.txt를 고치면 재시작 없이 다음 요청부터 반영된다.
+토큰 수는 PromptBudget에 그대로 넘기고 metrics 게이지(prompt.system_tokens.<이름>)로도 남긴다.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.utils.metrics import metrics
+from .chat_history import count_tokens
+
+logger = logging.getLogger(__name__)
+
+CHARACTER_MAX_CHARS = 12000  # character 프롬프트 과도 확장을 막기 위한 상한
+RELOAD_CHECK_SEC = 2.0
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parent.parent.parent
+
+
+def default_character_path() -> Path:
+    return _project_root() / "config" / "character.txt"
+
+
+def load_character_prompt(character_path: Optional[Path] = None) -> str:
+    """config/character.txt 내용 로드. 없으면 빈 문자열."""
+    p = character_path or default_character_path()
+    if not p.exists():
+        return ""
+    try:
+        text = p.read_text(encoding="utf-8").replace("\0", "").strip()
+        if len(text) > CHARACTER_MAX_CHARS:
+            logger.warning("캐릭터 프롬프트가 너무 깁니다(%d자). %d자로 잘라서 사용합니다.", len(text), CHARACTER_MAX_CHARS)
+            text = text[:CHARACTER_MAX_CHARS]
+        return text
+    except Exception as e:
+        logger.warning("캐릭터 파일 로드 실패 %s: %s", p, e)
+        return ""
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """캐릭터 설정까지 합친 system 프롬프트와 그 토큰 수."""
+    text: str
+    tokens: int
+
+
+class SystemPrompts:
+    """이름 → CompiledPrompt. character.txt가 바뀌면 전부 다시 합침. 여러 스레드에서 불러도 안전."""
+
+    def __init__(self, bases: Dict[str, str], character_path: Optional[Path] = None):
+        """bases: 이름 → 캐릭터 뒤에 붙일 기본 프롬프트 (예: {"batch": BATCH_SYSTEM_PROMPT, ...})."""
+        self._bases = dict(bases)
+        self._path = character_path or default_character_path()
+        self._lock = threading.Lock()
+        self._compiled: Dict[str, CompiledPrompt] = {}
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._checked_at = 0.0
+        self.character = ""
+        self._reload(self._file_stamp())
+
+    def _file_stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = self._path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def _reload(self, stamp: Optional[Tuple[float, int]]) -> None:
+        """character.txt를 읽고 모든 프롬프트를 다시 합침 (lock 안에서 또는 생성자에서)."""
+        character = load_character_prompt(self._path) if stamp is not None else ""
+        compiled: Dict[str, CompiledPrompt] = {}
+        for name, base in self._bases.items():
+            text = f"{character}\n\n{base}" if character else base
+            compiled[name] = CompiledPrompt(text, count_tokens(text))
+            metrics.set_gauge(f"prompt.system_tokens.{name}", compiled[name].tokens)
+        self.character = character
+        self._compiled = compiled
+        self._stamp = stamp
+        self._checked_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SEC:
+            return
+        with self._lock:
+            if now - self._checked_at < RELOAD_CHECK_SEC:
+                return
+            stamp = self._file_stamp()
+            self._checked_at = now
+            if stamp == self._stamp:
+                return
+            self._reload(stamp)
+        metrics.incr("prompt.character_reloads")
+        logger.info("캐릭터 설정 변경 감지 → system 프롬프트 다시 합침 (%d자)", len(self.character))
+
+    def get(self, name: str) -> CompiledPrompt:
+        """이름의 합친 프롬프트. 등록 안 된 이름이면 KeyError."""
+        self._maybe_reload()
+        return self._compiled[name]
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def tokens(self, name: str) -> int:
+        return self.get(name).tokens
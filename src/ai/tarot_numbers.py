@@ -0,0 +1,126 @@
+"""
+타로 번호 선택 단계의 로컬 번호 파서.
+
+시청자가 "3 17 45", "34번, 35번, 56번", "일 십삼 오십", "스물하나랑 서른둘" 처럼
+번호만 말했으면 LLM 없이 바로 확정한다. 메시지 전체가 번호·구분자·허용 단어로만 이뤄졌을 때만
+결정하고, 모르는 단어가 하나라도 섞이면(애매함) None → 기존 Groq process_tarot_selection 경로.
+
+문법 (덩어리 = 공백·구두점으로 나눈 조각, '번' 뒤에서도 나눔):
+  덩어리 := 수 조사*  |  허용 단어
+  수     := 아라비아 숫자 | 한자어 일~구십구(일, 십삼, 칠십팔) | 고유어 하나~아흔아홉(다섯, 스물하나, 열한)
+            (한글 수사는 src/utils/korean_numerals 트라이 사전)
+  조사   := 번 이요 요 이랑 랑 하고 과 와 으로 로 이고 이에요 예요 입니다
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from src.utils.korean_numerals import NUMERAL_SUFFIXES, SINO_DIGITS, prefix_matches
+
+TAROT_NUMBER_MIN = 1
+TAROT_NUMBER_MAX = 78
+
+_SUFFIXES = "(?:" + "|".join(NUMERAL_SUFFIXES) + ")*"
+_DIGIT_CHUNK = re.compile(rf"^(\d+){_SUFFIXES}$")
+_SUFFIX_CHAIN = re.compile(rf"^{_SUFFIXES}$")
+_SPLIT = re.compile(r"[\s,，、/;·.!?~]+|(?<=번)(?!호|째)")
+# 번호와 함께 와도 뜻이 바뀌지 않는 말
+_FILLER_WORDS = frozenset({
+    "번", "그리고", "이랑", "랑", "하고", "및", "과", "와", "요", "이요",
+    "저는", "전", "난", "나는", "저", "음", "어", "흠", "ㅇㅇ", "네", "넵", "예",
+    "선택", "선택할게요", "선택이요", "할게요", "할래요", "골라요", "고를게요", "갈게요", "주세요", "으로", "로",
+})
+_CANCEL = re.compile(
+    r"^(?:타로\s*)?(?:그만|취소|안\s*볼래|안\s*볼게|안\s*할래|안\s*할게|됐어|괜찮아)"
+    r"(?:요|할게요|할래요|해요|해\s*주세요)?[\s.!~ㅠㅜ]*$"
+)
+
+TAROT_REASK_DEFAULT = "1번부터 78번까지 번호 {n}개만 골라주세요."
+TAROT_REASK_DUPLICATE = "중복된 번호가 있어요. 처음부터 다시 {n}개 골라주세요."
+CONFIRM_TEMPLATE = "{numbers}번 선택하셨네요."
+CANCEL_RESPONSE = "네, 이번 타로는 여기서 마칠게요."
+
+
+def _match_korean_chunk(chunk: str) -> Optional[Tuple[int, str, str]]:
+    """덩어리 = 한글 수사 + 조사*. 가장 긴 수사부터 시도 ('삼십이요' → 32 + 요). (값, 수사, 조사) 또는 None."""
+    for end, value in reversed(prefix_matches(chunk)):
+        if _SUFFIX_CHAIN.match(chunk[end:]):
+            return value, chunk[:end], chunk[end:]
+    return None
+
+
+@dataclass
+class TarotNumberParse:
+    """parse_tarot_numbers 결과. numbers는 말한 순서 그대로 (범위 밖·중복 포함)."""
+    numbers: List[int] = field(default_factory=list)
+    complete: bool = True  # 메시지 전체가 문법으로 설명되면 True (모르는 단어 없음)
+    cancel: bool = False
+    bare_syllables: int = 0  # '번' 없이 한 글자 한자어(이, 오 등)로만 읽은 수. 감탄사·지시어와 헷갈릴 수 있음
+
+    @property
+    def valid(self) -> List[int]:
+        return [n for n in self.numbers if TAROT_NUMBER_MIN <= n <= TAROT_NUMBER_MAX]
+
+    @property
+    def has_duplicate(self) -> bool:
+        return len(set(self.numbers)) != len(self.numbers)
+
+
+def parse_tarot_numbers(text: str) -> TarotNumberParse:
+    """메시지를 덩어리로 나눠 번호를 읽음. 문법에 안 맞는 덩어리가 있으면 complete=False."""
+    s = (text or "").strip()
+    if _CANCEL.match(s):
+        return TarotNumberParse(cancel=True)
+    result = TarotNumberParse()
+    for chunk in _SPLIT.split(s):
+        if not chunk or chunk in _FILLER_WORDS:
+            continue
+        m = _DIGIT_CHUNK.match(chunk)
+        if m:
+            digits = m.group(1)
+            # 0으로 시작하는 '07'은 7, 세 자리 이상(343556 등)은 이어쓰기일 수 있어 애매
+            if len(digits) > 2:
+                result.complete = False
+                continue
+            result.numbers.append(int(digits))
+            continue
+        km = _match_korean_chunk(chunk)
+        if km is not None:
+            value, word, suffix = km
+            result.numbers.append(value)
+            if len(word) == 1 and word in SINO_DIGITS and not suffix.startswith("번"):
+                result.bare_syllables += 1
+            continue
+        result.complete = False
+    return result
+
+
+def resolve_tarot_selection(text: str, spread_count: int) -> Optional[dict]:
+    """
+    로컬에서 확정 가능한 경우만 process_tarot_selection과 같은 형식의 dict 반환, 애매하면 None.
+    - 정확히 spread_count개, 모두 1~78, 중복 없음 → tarot_numbers 확정
+    - spread_count개를 말했는데 중복 → 중복 재요청 (기존 LLM 경로와 같은 문구)
+    - 취소 표현만 → tarot_cancel
+    """
+    parsed = parse_tarot_numbers(text)
+    if parsed.cancel:
+        return {"response": CANCEL_RESPONSE, "emotion": "neutral", "tarot_numbers": None, "tarot_cancel": True}
+    if not parsed.complete or len(parsed.numbers) != spread_count:
+        return None
+    if spread_count == 1 and parsed.bare_syllables:
+        return None  # "오", "이" 한 글자만으로는 번호인지 말버릇인지 모름
+    if len(parsed.valid) != spread_count:
+        return None  # 범위 밖 번호: 이유를 설명하는 재요청은 LLM이 더 자연스러움
+    if parsed.has_duplicate:
+        reask = TAROT_REASK_DUPLICATE.format(n=spread_count)
+        return {"response": reask, "tts_text": reask, "emotion": "neutral", "tarot_numbers": None, "tarot_cancel": False}
+    numbers = list(parsed.numbers)
+    return {
+        "response": CONFIRM_TEMPLATE.format(numbers=", ".join(str(n) for n in numbers)),
+        "emotion": "neutral",
+        "tarot_numbers": numbers,
+        "tarot_cancel": False,
+    }
@@ -0,0 +1,232 @@
+"""
+시청자별 기억 (다시 온 시청자 알아보기).
+
+user_id(치지직 senderChannelId)별 프로필: 처음/마지막 방문, 메시지 수, 닉네임, 본인이 말한 사실 몇 개,
+최근 타로 기록, 후원 합계. 최근 쓴 프로필만 메모리 LRU에 두고, 나머지는 history/viewers/<id>.json.
+reply_batch에는 이번 배치에 있는 시청자의 짧은 메모만 넘겨 프롬프트를 작게 유지한다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from src.overlay.tarot_knowledge import get_card_info
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOT_SIZE = 200
+MAX_FACTS = 5
+MAX_TAROT = 3
+# 이 시간보다 오래 안 보였으면 메모에 "오랜만" 표시
+RETURN_GAP_SEC = 6 * 3600
+
+_SAFE_ID = re.compile(r"[^0-9A-Za-z_-]")
+_DONATION = re.compile(r"^\s*([\d,]+)\s*원\s*후원")
+# 자기 이야기로 보는 문장: 1인칭으로 시작, 질문 아님
+_SELF_FACT = re.compile(r"^(?:저는|전|저|제가|나는|난|나|내가|저희|우리)\s+\S")
+_FACT_MIN_LEN = 8
+_FACT_MAX_LEN = 60
+
+
+@dataclass
+class ViewerProfile:
+    user_id: str
+    nickname: str = ""
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    message_count: int = 0
+    facts: List[str] = field(default_factory=list)
+    tarot_readings: List[Dict[str, Any]] = field(default_factory=list)  # {"ts", "question", "cards": [id, ...]}
+    donation_total: int = 0
+    donation_count: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ViewerProfile":
+        known = {k: data[k] for k in cls.__dataclass_fields__ if k in data}
+        return cls(**known)
+
+
+def _extract_fact(message: str) -> Optional[str]:
+    text = (message or "").strip()
+    if not (_FACT_MIN_LEN <= len(text) <= 200) or "?" in text:
+        return None
+    if not _SELF_FACT.match(text):
+        return None
+    return text[:_FACT_MAX_LEN]
+
+
+def _ago(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{max(1, int(seconds // 60))}분 전"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}시간 전"
+    return f"{int(seconds // 86400)}일 전"
+
+
+class ViewerMemory:
+    """메모리 LRU(hot) + 시청자당 JSON 파일(cold). reply_worker 한 곳에서 쓰지만 저장은 스레드 안전하게."""
+
+    def __init__(self, store_dir: Optional[Union[Path, str]] = None, hot_size: Optional[int] = None):
+        """
+        store_dir: 미지정 시 프로젝트/history/viewers.
+        hot_size: 메모리에 둘 프로필 수. 미지정 시 .env VIEWER_MEMORY_HOT_SIZE 또는 200.
+        """
+        if store_dir is None:
+            store_dir = Path(__file__).resolve().parent.parent.parent / "history" / "viewers"
+        self.dir = Path(store_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.hot_size = max(1, int(hot_size or os.environ.get("VIEWER_MEMORY_HOT_SIZE") or DEFAULT_HOT_SIZE))
+        self._hot: "OrderedDict[str, ViewerProfile]" = OrderedDict()
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+
+    def _path(self, user_id: str) -> Path:
+        return self.dir / f"{_SAFE_ID.sub('_', user_id)}.json"
+
+    def get(self, user_id: str) -> Optional[ViewerProfile]:
+        """프로필 (hot에 없으면 디스크에서 올림). 처음 보는 시청자면 None."""
+        if not user_id:
+            return None
+        with self._lock:
+            prof = self._hot.get(user_id)
+            if prof is not None:
+                self._hot.move_to_end(user_id)
+                return prof
+        path = self._path(user_id)
+        if not path.exists():
+            return None
+        try:
+            prof = ViewerProfile.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except Exception as e:
+            logger.warning("시청자 프로필 읽기 실패 %s: %s", path, e)
+            return None
+        self._put_hot(prof)
+        return prof
+
+    def _get_or_create(self, user_id: str, nickname: str, now: float) -> ViewerProfile:
+        prof = self.get(user_id)
+        if prof is None:
+            prof = ViewerProfile(user_id=user_id, nickname=nickname, first_seen=now)
+            self._put_hot(prof)
+        return prof
+
+    def _put_hot(self, prof: ViewerProfile) -> None:
+        evicted: List[ViewerProfile] = []
+        with self._lock:
+            self._hot[prof.user_id] = prof
+            self._hot.move_to_end(prof.user_id)
+            while len(self._hot) > self.hot_size:
+                _, old = self._hot.popitem(last=False)
+                if old.user_id in self._dirty:
+                    self._dirty.discard(old.user_id)
+                    evicted.append(old)
+        for old in evicted:
+            self._write(old)
+
+    def _write(self, prof: ViewerProfile) -> None:
+        path = self._path(prof.user_id)
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(asdict(prof), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("시청자 프로필 저장 실패 %s: %s", path, e)
+
+    def _mark(self, prof: ViewerProfile) -> None:
+        with self._lock:
+            self._dirty.add(prof.user_id)
+
+    def observe(self, msg: Any, now: Optional[float] = None) -> None:
+        """채팅 한 건 반영: 방문 시각·닉네임·메시지 수·후원·자기 이야기."""
+        user_id = str(getattr(msg, "user_id", None) or "").strip()
+        if not user_id:
+            return
+        now = now if now is not None else time.time()
+        nickname = str(getattr(msg, "user", None) or "").strip()
+        prof = self._get_or_create(user_id, nickname, now)
+        if nickname:
+            prof.nickname = nickname
+        prof.last_seen = now
+        prof.message_count += 1
+        text = str(getattr(msg, "message", None) or "")
+        if getattr(msg, "user_badge", None) == "donation":
+            m = _DONATION.match(text)
+            if m:
+                prof.donation_total += int(m.group(1).replace(",", "") or 0)
+                prof.donation_count += 1
+        else:
+            fact = _extract_fact(text)
+            if fact and fact not in prof.facts:
+                prof.facts = (prof.facts + [fact])[-MAX_FACTS:]
+        self._mark(prof)
+
+    def observe_many(self, messages: Iterable[Any]) -> None:
+        now = time.time()
+        for m in messages:
+            self.observe(m, now)
+
+    def record_tarot(self, user_id: str, question: str, cards: List[dict]) -> None:
+        """타로 해석이 끝났을 때 요청자 프로필에 질문·카드 기록."""
+        prof = self.get(str(user_id or "").strip())
+        if prof is None:
+            return
+        entry = {"ts": time.time(), "question": (question or "")[:60], "cards": [c.get("id", "") for c in cards]}
+        prof.tarot_readings = (prof.tarot_readings + [entry])[-MAX_TAROT:]
+        self._mark(prof)
+
+    def notes_for(self, messages: Iterable[Any], now: Optional[float] = None) -> str:
+        """
+        이번 배치 시청자 중 예전 기록이 있는 사람만 한 줄씩 메모. observe_many 전에 불러야
+        마지막 방문이 '이번 메시지'가 아닌 이전 방문으로 나온다.
+        """
+        now = now if now is not None else time.time()
+        lines: List[str] = []
+        seen: set = set()
+        for m in messages:
+            user_id = str(getattr(m, "user_id", None) or "").strip()
+            if not user_id or user_id in seen:
+                continue
+            seen.add(user_id)
+            prof = self.get(user_id)
+            if prof is None or prof.message_count == 0:
+                continue
+            line = self._format(prof, now)
+            if line:
+                lines.append(line)
+        return "\n".join(lines)
+
+    def _format(self, prof: ViewerProfile, now: float) -> str:
+        parts: List[str] = []
+        gap = now - prof.last_seen if prof.last_seen else 0
+        if gap >= RETURN_GAP_SEC:
+            parts.append(f"마지막 방문 {_ago(gap)}(오랜만)")
+        parts.append(f"채팅 {prof.message_count}회")
+        if prof.donation_total:
+            parts.append(f"후원 총 {prof.donation_total:,}원")
+        if prof.tarot_readings:
+            last = prof.tarot_readings[-1]
+            names = [getattr(get_card_info(cid), "name", cid) for cid in last.get("cards") or []]
+            parts.append(f"지난 타로: {last.get('question') or '?'}({', '.join(names)})")
+        if prof.facts:
+            parts.append("말했던 것: " + " / ".join(prof.facts[-2:]))
+        if len(parts) == 1 and prof.message_count < 3:
+            return ""  # 정보가 거의 없으면 생략
+        return f"- {prof.nickname or '?'}: " + ", ".join(parts)
+
+    def flush(self) -> int:
+        """바뀐 프로필을 디스크에 저장. 저장한 개수."""
+        with self._lock:
+            dirty = [self._hot[uid] for uid in self._dirty if uid in self._hot]
+            self._dirty.clear()
+        for prof in dirty:
+            self._write(prof)
+        return len(dirty)
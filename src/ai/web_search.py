@@ -1,43 +1,57 @@
 """
 웹 검색 (DuckDuckGo). 모델이 search_web 도구를 호출할 때 사용.
 결과는 상위 N개·짧은 스니펫으로 제한해 토큰 절약.
+
+"오늘 날씨", "환율"처럼 자주 반복되는 질문이 매번 네트워크를 타지 않도록:
+- (정규화한 검색어, region) 키로 TTL 캐시 (WEB_SEARCH_CACHE_TTL_SEC, 기본 600초)
+- 같은 검색이 동시에 들어오면 한 번만 실제 검색하고 결과 공유 (single-flight)
+- 검색 전용 스레드마다 DDGS 세션 하나를 계속 재사용 (매 호출 세션 생성·연결 수립 없음)
+- 모델이 한 턴에 검색을 여러 개 부르면 search_many로 동시에 (전체 시간 = 가장 느린 검색, 상한 하나 공유)
+- 전체 상한 WEB_SEARCH_TIMEOUT_SEC(기본 5초). 만료된 결과가 있으면 WEB_SEARCH_STALE_WAIT_SEC(기본 1.5초)만
+  기다리고 옛 결과를 먼저 돌려줌 (새 검색은 뒤에서 끝나면 캐시 갱신)
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 MAX_RESULTS = 6
 SNIPPET_LEN = 100
+REGION = "kr-kr"
 
+DEFAULT_TTL_SEC = 600.0
+DEFAULT_STALE_SEC = 6 * 3600.0  # 만료 후에도 이 시간까지는 느릴 때 대신 돌려줄 수 있음
+DEFAULT_TIMEOUT_SEC = 5.0
+DEFAULT_STALE_WAIT_SEC = 1.5
+CACHE_MAX_ITEMS = 256
+SEARCH_WORKERS = 4  # 동시에 도는 실제 검색 상한 (한 턴 여러 검색 + 다른 배치)
 
-def run_web_search(query: str) -> str:
-    """
-    DuckDuckGo로 검색해 상위 결과를 한 줄씩 포맷한 문자열 반환.
-    실패 시 빈 문자열 또는 에러 메시지 반환.
-    """
-    query = (query or "").strip()
-    if not query:
-        return "검색어가 비어 있습니다."
-    try:
-        from ddgs import DDGS
-    except ImportError:
-        logger.warning("ddgs 패키지 없음: pip install ddgs")
-        return "검색 기능을 사용하려면 ddgs 패키지가 필요합니다."
-    try:
-        # ddgs 9.x: text() returns list[dict] with title, href, body. region kr-kr for Korean.
-        with DDGS() as ddgs:
-            results = ddgs.text(query, region="kr-kr", max_results=MAX_RESULTS)
-        if not isinstance(results, list):
-            results = list(results) if results else []
-    except Exception as e:
-        logger.warning("DuckDuckGo 검색 실패: %s", e)
-        return f"검색 중 오류가 났어요: {str(e)[:80]}"
-    if not results:
-        return "검색 결과가 없습니다."
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.~,]+$")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용: NFKC, 소문자, 공백 하나로, 끝 물음표·마침표 제거."""
+    q = unicodedata.normalize("NFKC", query or "").lower()
+    return _TRAILING.sub("", _SPACES.sub(" ", q).strip())
+
+
+def _format_results(results: Any) -> str:
+    if not isinstance(results, list):
+        results = list(results) if results else []
     lines = []
     for i, r in enumerate(results[:MAX_RESULTS], 1):
         if not isinstance(r, dict):
@@ -48,4 +62,150 @@ def run_web_search(query: str) -> str:
             body = body[: SNIPPET_LEN - 1].rstrip() + "…"
         if title or body:
             lines.append(f"{i}. {title}: {body}")
-    return "\n".join(lines) if lines else "검색 결과가 없습니다."
+    return "\n".join(lines)
+
+
+class WebSearcher:
+    """TTL 캐시 + single-flight + 세션 재사용 검색기. 모듈 전역 하나(run_web_search)를 여러 스레드가 같이 씀."""
+
+    def __init__(
+        self,
+        ttl_sec: Optional[float] = None,
+        timeout_sec: Optional[float] = None,
+        stale_wait_sec: Optional[float] = None,
+    ):
+        """미지정 값은 .env WEB_SEARCH_CACHE_TTL_SEC / WEB_SEARCH_TIMEOUT_SEC / WEB_SEARCH_STALE_WAIT_SEC."""
+        env = os.environ
+        self.ttl_sec = float(ttl_sec if ttl_sec is not None else (env.get("WEB_SEARCH_CACHE_TTL_SEC") or DEFAULT_TTL_SEC))
+        self.timeout_sec = float(timeout_sec if timeout_sec is not None else (env.get("WEB_SEARCH_TIMEOUT_SEC") or DEFAULT_TIMEOUT_SEC))
+        self.stale_wait_sec = float(
+            stale_wait_sec if stale_wait_sec is not None else (env.get("WEB_SEARCH_STALE_WAIT_SEC") or DEFAULT_STALE_WAIT_SEC)
+        )
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()  # key → (저장 시각, 결과)
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="web-search")
+        self._local = threading.local()
+
+    def _session(self) -> Any:
+        """검색 스레드별 DDGS 세션 (스레드 안에서 계속 재사용)."""
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            from ddgs import DDGS
+
+            ddgs = DDGS(timeout=max(1, int(self.timeout_sec)))
+            self._local.ddgs = ddgs
+        return ddgs
+
+    def _fetch(self, query: str, region: str) -> str:
+        """실제 검색 (검색 스레드에서). 성공하면 캐시에 넣음. 실패는 예외로 올려 캐시하지 않음."""
+        start = time.perf_counter()
+        try:
+            # ddgs 9.x: text() returns list[dict] with title, href, body. region kr-kr for Korean.
+            results = self._session().text(query, region=region, max_results=MAX_RESULTS)
+        except Exception:
+            self._local.ddgs = None  # 세션이 깨졌을 수 있으니 다음엔 새로
+            raise
+        metrics.observe("web_search.fetch_sec", time.perf_counter() - start)
+        text = _format_results(results) or "검색 결과가 없습니다."
+        with self._lock:
+            self._cache[(normalize_query(query), region)] = (time.monotonic(), text)
+            self._cache.move_to_end((normalize_query(query), region))
+            while len(self._cache) > CACHE_MAX_ITEMS:
+                self._cache.popitem(last=False)
+        return text
+
+    def _done(self, key: Tuple[str, str], fut: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def _start(self, query: str, region: str) -> Tuple[Optional[str], Optional[Future], Optional[str]]:
+        """캐시 확인 후 필요하면 검색 시작. (신선한 캐시 결과, 기다릴 Future, 만료된 옛 결과)."""
+        key = (normalize_query(query), region)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] <= self.ttl_sec:
+                self._cache.move_to_end(key)
+                metrics.incr("web_search.cache_hit")
+                return cached[1], None, None
+            stale = cached[1] if cached is not None and now - cached[0] <= DEFAULT_STALE_SEC else None
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._pool.submit(self._fetch, query, region)
+                self._inflight[key] = fut
+                fut.add_done_callback(lambda f, key=key: self._done(key, f))
+                metrics.incr("web_search.cache_miss")
+            else:
+                metrics.incr("web_search.coalesced")
+        return None, fut, stale
+
+    def _resolve(self, query: str, fut: Future, stale: Optional[str], wait_sec: float) -> str:
+        """검색 결과를 wait_sec까지 기다림. 늦거나 실패하면 옛 결과 또는 안내 문장."""
+        try:
+            return fut.result(timeout=max(0.0, wait_sec))
+        except FutureTimeout:
+            if stale is not None:
+                metrics.incr("web_search.stale_served")
+                logger.info("웹 검색 지연 → 이전 결과 사용: query=%r", query)
+                return stale
+            metrics.incr("web_search.timeout")
+            logger.warning("웹 검색 %.1f초 초과: query=%r", self.timeout_sec, query)
+            return "검색이 너무 오래 걸려서 결과를 받지 못했어요."
+        except ImportError:
+            logger.warning("ddgs 패키지 없음: pip install ddgs")
+            return "검색 기능을 사용하려면 ddgs 패키지가 필요합니다."
+        except Exception as e:
+            logger.warning("DuckDuckGo 검색 실패: %s", e)
+            if stale is not None:
+                return stale
+            return f"검색 중 오류가 났어요: {str(e)[:80]}"
+
+    def search(self, query: str, region: str = REGION) -> str:
+        """상위 결과를 한 줄씩 포맷한 문자열. 실패·시간 초과 시 안내 문장 (예외 없음)."""
+        return self.search_many([query], region)[0]
+
+    def search_many(self, queries: List[str], region: str = REGION) -> List[str]:
+        """
+        여러 검색을 동시에 시작하고 같은 순서로 결과 반환. 전체가 timeout_sec 하나를 공유
+        (만료된 옛 결과가 있는 검색은 stale_wait_sec까지만 기다림).
+        """
+        start = time.monotonic()
+        started = []
+        for query in queries:
+            query = (query or "").strip()
+            started.append((query, *self._start(query, region)) if query else (query, "검색어가 비어 있습니다.", None, None))
+        out: List[str] = []
+        for query, hit, fut, stale in started:
+            if hit is not None:
+                out.append(hit)
+                continue
+            limit = self.stale_wait_sec if stale is not None else self.timeout_sec
+            out.append(self._resolve(query, fut, stale, start + limit - time.monotonic()))
+        return out
+
+
+_searcher: Optional[WebSearcher] = None
+_searcher_lock = threading.Lock()
+
+
+def get_web_searcher() -> WebSearcher:
+    global _searcher
+    with _searcher_lock:
+        if _searcher is None:
+            _searcher = WebSearcher()
+        return _searcher
+
+
+def run_web_search(query: str) -> str:
+    """
+    DuckDuckGo로 검색해 상위 결과를 한 줄씩 포맷한 문자열 반환 (캐시·중복 합치기·시간 상한 적용).
+    실패 시 빈 문자열 또는 에러 메시지 반환.
+    """
+    return get_web_searcher().search(query)
+
+
+def run_web_searches(queries: List[str]) -> List[str]:
+    """run_web_search 여러 개를 동시에. 결과는 queries 순서."""
+    return get_web_searcher().search_many(queries)
@@ -7,6 +7,10 @@ from .base_client import ChatClient, ChatMessage
 from .chzzk_client import ChzzkSocketIOClient
 from .chat_parser import ChatParser, FilterConfig
 from .client_factory import ChatClientFactory
+from .priority_queue import PriorityChatQueue, classify_priority
+from .batching import BatchPolicy
+from .shedding import SheddingPolicy, get_shedding_policy
+from .prefilter import ChatPrefilter, PrefilterConfig, PrefilterResult
 
 __all__ = [
     "ChatClient",
@@ -15,4 +19,12 @@ __all__ = [
     "ChatParser",
     "FilterConfig",
     "ChatClientFactory",
+    "PriorityChatQueue",
+    "classify_priority",
+    "BatchPolicy",
+    "SheddingPolicy",
+    "get_shedding_policy",
+    "ChatPrefilter",
+    "PrefilterConfig",
+    "PrefilterResult",
 ]
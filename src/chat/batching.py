@@ -0,0 +1,121 @@
+"""
+reply_worker 배치 정책: 첫 메시지가 온 뒤 얼마나 더 모았다가 LLM을 부를지.
+
+기존에는 큐에 그 순간 쌓인 만큼만 꺼내서, 조용하다가 처음 온 채팅은 혼자 LLM 호출 1회를 썼다.
+BatchPolicy는 채팅 속도(도착 간격 EWMA)를 보고 곧 더 올 것 같으면 짧게 기다리고,
+배치 토큰 예산이나 목표 개수에 닿으면 바로 보낸다. 대기는 max_wait(TTS 재생 중이면 busy_max_wait)로 상한.
+- 이미 오래 기다린 메시지(TTS 재생 중 쌓임)가 있으면 기다리지 않음
+- 채팅이 뜸하면(간격 > max_wait) min_wait만 (연달아 치는 두세 줄 정도만 묶음)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, List, Optional
+
+from src.utils.metrics import metrics
+
+DEFAULT_MIN_WAIT_SEC = 0.3
+DEFAULT_MAX_WAIT_SEC = 1.5
+DEFAULT_BUSY_MAX_WAIT_SEC = 8.0
+DEFAULT_TARGET_SIZE = 8
+DEFAULT_TOKEN_BUDGET = 1500
+
+
+def estimate_tokens(item: Any) -> int:
+    """배치 항목 (ChatMessage, overlay_id) 의 대략적인 프롬프트 토큰 (한글 2자 ≈ 1토큰 + 줄 오버헤드)."""
+    msg = item[0] if isinstance(item, tuple) else item
+    text = f"{getattr(msg, 'user', '') or ''}: {getattr(msg, 'message', '') or ''}"
+    return len(text) // 2 + 3
+
+
+class BatchPolicy:
+    """첫 메시지 이후 모을 시간을 정하고, 토큰 예산 안에서 우선순위 순으로 꺼냄."""
+
+    def __init__(
+        self,
+        min_wait_sec: Optional[float] = None,
+        max_wait_sec: Optional[float] = None,
+        busy_max_wait_sec: Optional[float] = None,
+        target_size: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ):
+        """미지정 값은 .env CHAT_BATCH_MIN_WAIT_SEC / MAX_WAIT_SEC / BUSY_MAX_WAIT_SEC / TARGET_SIZE / TOKEN_BUDGET."""
+        env = os.environ
+        self.min_wait_sec = float(min_wait_sec if min_wait_sec is not None else (env.get("CHAT_BATCH_MIN_WAIT_SEC") or DEFAULT_MIN_WAIT_SEC))
+        self.max_wait_sec = float(max_wait_sec if max_wait_sec is not None else (env.get("CHAT_BATCH_MAX_WAIT_SEC") or DEFAULT_MAX_WAIT_SEC))
+        self.busy_max_wait_sec = float(
+            busy_max_wait_sec if busy_max_wait_sec is not None else (env.get("CHAT_BATCH_BUSY_MAX_WAIT_SEC") or DEFAULT_BUSY_MAX_WAIT_SEC)
+        )
+        self.target_size = max(1, int(target_size or env.get("CHAT_BATCH_TARGET_SIZE") or DEFAULT_TARGET_SIZE))
+        self.token_budget = max(1, int(token_budget or env.get("CHAT_BATCH_TOKEN_BUDGET") or DEFAULT_TOKEN_BUDGET))
+
+    def wait_window(self, queued: int, mean_gap_sec: Optional[float], oldest_age_sec: float) -> float:
+        """첫 메시지 이후 더 기다릴 시간(초). queued: 지금 대기 수, mean_gap_sec: 도착 간격 평균."""
+        if queued >= self.target_size or oldest_age_sec >= self.max_wait_sec:
+            return 0.0
+        if mean_gap_sec is None or mean_gap_sec > self.max_wait_sec:
+            window = self.min_wait_sec
+        else:
+            window = max(self.min_wait_sec, mean_gap_sec * (self.target_size - queued))
+        return max(0.0, min(self.max_wait_sec, window) - oldest_age_sec)
+
+    def _queued_tokens(self, queue: Any) -> int:
+        return sum(estimate_tokens(item) for item in queue.peek_all())
+
+    async def collect(
+        self,
+        queue: Any,
+        max_batch: int,
+        is_busy: Optional[Callable[[], bool]] = None,
+    ) -> List[Any]:
+        """queue(PriorityChatQueue)에서 한 배치를 모아 꺼냄 (wait_ready 후 take_now)."""
+        await self.wait_ready(queue, max_batch, is_busy)
+        return self.take_now(queue, max_batch)
+
+    async def wait_ready(
+        self,
+        queue: Any,
+        max_batch: int,
+        is_busy: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        첫 메시지가 온 뒤 배치를 보낼 때까지 기다림 (꺼내지는 않음).
+        is_busy: 지금 TTS 재생 중인지. 재생 중에 모으는 쪽(미리 답하기)이 넘기면, 재생이 끝나거나
+        목표 개수·토큰 예산에 닿을 때까지 busy_max_wait 안에서 더 모음.
+        """
+        await queue.wait_not_empty()
+        start = time.monotonic()
+        deadline = start + self.wait_window(queue.qsize(), queue.mean_gap_sec(), queue.oldest_age_sec())
+        target = min(self.target_size, max_batch)
+        while True:
+            now = time.monotonic()
+            if queue.qsize() >= target or self._queued_tokens(queue) >= self.token_budget:
+                break
+            if is_busy is not None and is_busy():
+                # 재생 중에는 어차피 말을 못 하니 조금 더 모음 (상한 busy_max_wait)
+                deadline = max(deadline, min(start + self.busy_max_wait_sec, now + 0.2))
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+            await queue.wait_arrival(remaining)
+        metrics.observe("chat_batch.wait_sec", time.monotonic() - start)
+
+    def take_now(self, queue: Any, max_batch: int) -> List[Any]:
+        """기다리지 않고 지금 쌓인 것 중 우선순위 순으로 max_batch개·토큰 예산까지 꺼냄."""
+        batch: List[Any] = []
+        tokens = 0
+        while len(batch) < max_batch:
+            item = queue.peek_nowait()
+            if item is None:
+                break
+            t = estimate_tokens(item)
+            if batch and tokens + t > self.token_budget:
+                break
+            batch.append(queue.get_nowait())
+            tokens += t
+        if batch:
+            metrics.observe("chat_batch.size", len(batch))
+            metrics.observe("chat_batch.tokens", tokens)
+        return batch
@@ -0,0 +1,210 @@
+"""
+on_message → 큐 사이의 로컬 사전 필터.
+
+LLM 프롬프트에 맡기던 도배·중복 제거를 먼저 로컬에서 처리해 reply_batch 프롬프트(=Groq 토큰)를 줄인다.
+- 봇/스팸/차단 키워드: 기존 ChatParser.filter 재사용
+- 같은 글자 반복 축약 (ㅋㅋㅋㅋㅋㅋ → ㅋㅋㅋ). 숫자는 그대로, 후원·방장 메시지는 원문 그대로
+- 시간 창 안의 완전 중복(정규화 해시) / 유사 중복(MinHash) 접기
+- 자모만 있는 채팅(ㅋㅋ, ㅠㅠ 등) 폭주 제한, 사용자별 속도 제한
+후원·방장 메시지는 항상 통과. 진행 중인 타로 요청자(exempt_user_id)는 스팸 검사만 하고 중복·도배·속도 검사는
+건너뜀 ("3", "그만"처럼 짧은 답이 다른 시청자 채팅과 겹쳐도 선택 흐름에 닿도록).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+from .base_client import ChatMessage
+from .chat_parser import ChatParser, FilterConfig
+from .priority_queue import PRIORITY_STREAMER, classify_priority
+
+logger = logging.getLogger(__name__)
+
+_RUN_PATTERN = re.compile(r"([^\d])\1{3,}")  # 같은 글자 4번 이상 → 3번으로 (숫자 제외: 10000원)
+_NORMALIZE_STRIP = re.compile(r"[\s\W_]+", re.UNICODE)
+_JAMO_ONLY = re.compile(r"^[\sㄱ-ㅎㅏ-ㅣ!?.~^]+$")
+
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_PERMS: List[Tuple[int, int]] = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MINHASH_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MINHASH_PRIME,
+    )
+    for i in range(32)
+]
+
+
+@dataclass
+class PrefilterConfig:
+    """사전 필터 설정 (.env로 덮어쓸 수 있음)"""
+    dedupe_window_sec: float = 20.0  # 이 시간 안의 중복을 접음
+    near_duplicate_threshold: float = 0.8  # MinHash Jaccard 추정치가 이 이상이면 유사 중복
+    near_duplicate_min_len: int = 6  # 정규화 후 이보다 짧으면 유사 중복 검사 생략(완전 중복만)
+    max_recent: int = 200  # 중복 비교용 최근 메시지 수 상한
+    jamo_window_sec: float = 5.0  # 자모만 있는 채팅은 이 창에서
+    jamo_max_per_window: int = 2  # 최대 N개까지만 통과
+    user_rate_capacity: int = 3  # 사용자별 버킷 크기 (연속 허용 개수)
+    user_rate_per_sec: float = 0.3  # 버킷 충전 속도 (초당)
+
+    @classmethod
+    def from_env(cls) -> "PrefilterConfig":
+        cfg = cls()
+        env = os.environ
+        cfg.dedupe_window_sec = float(env.get("CHAT_DEDUPE_WINDOW_SEC") or cfg.dedupe_window_sec)
+        cfg.near_duplicate_threshold = float(env.get("CHAT_NEAR_DUP_THRESHOLD") or cfg.near_duplicate_threshold)
+        cfg.user_rate_capacity = int(env.get("CHAT_USER_RATE_CAPACITY") or cfg.user_rate_capacity)
+        cfg.user_rate_per_sec = float(env.get("CHAT_USER_RATE_PER_SEC") or cfg.user_rate_per_sec)
+        return cfg
+
+
+@dataclass
+class PrefilterResult:
+    accepted: bool
+    reason: str  # "ok" | "blocked" | "duplicate" | "near_duplicate" | "jamo_flood" | "rate_limited"
+    message: ChatMessage  # 반복 축약이 적용된 메시지 (후원·방장은 원문)
+
+    @property
+    def is_spam(self) -> bool:
+        """봇/스팸/차단 키워드 → 오버레이에도 표시하지 않음."""
+        return self.reason == "blocked"
+
+
+def collapse_runs(text: str) -> str:
+    """같은 글자 4번 이상 반복을 3번으로 축약. 숫자는 금액일 수 있어 건드리지 않음."""
+    return _RUN_PATTERN.sub(lambda m: m.group(1) * 3, text or "")
+
+
+def normalize_for_dedupe(text: str) -> str:
+    """공백·구두점 제거, 소문자, 반복 축약(2회). 중복 판정용 키."""
+    s = _NORMALIZE_STRIP.sub("", (text or "").lower())
+    return re.sub(r"(.)\1{2,}", r"\1\1", s)
+
+
+def minhash_signature(text: str, k: int = 2) -> Tuple[int, ...]:
+    """문자 k-gram MinHash 서명 (32개)."""
+    if len(text) <= k:
+        shingles = {text}
+    else:
+        shingles = {text[i : i + k] for i in range(len(text) - k + 1)}
+    bases = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min((a * b + c) % _MINHASH_PRIME for b in bases) for a, c in _MINHASH_PERMS)
+
+
+def _similarity(sig1: Tuple[int, ...], sig2: Tuple[int, ...]) -> float:
+    same = sum(1 for x, y in zip(sig1, sig2) if x == y)
+    return same / max(1, len(sig1))
+
+
+class ChatPrefilter:
+    """로컬 필터·중복 제거. check()는 동기·저비용이라 on_message에서 바로 호출."""
+
+    def __init__(
+        self,
+        channel_id: Optional[str] = None,
+        config: Optional[PrefilterConfig] = None,
+        filter_config: Optional[FilterConfig] = None,
+    ):
+        self.channel_id = channel_id
+        self.config = config or PrefilterConfig.from_env()
+        if filter_config is None:
+            blocked = [k.strip() for k in (os.environ.get("CHAT_BLOCKED_KEYWORDS") or "").split(",") if k.strip()]
+            # reply_batch가 500자로 자르므로 긴 채팅은 차단하지 않고 통과
+            filter_config = FilterConfig(max_length=2000, blocked_keywords=blocked)
+        self.parser = ChatParser(filter_config)
+        # (ts, normalized, signature)
+        self._recent: Deque[Tuple[float, str, Optional[Tuple[int, ...]]]] = deque()
+        self._jamo_ts: Deque[float] = deque()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # user → (tokens, last_ts)
+
+    def _expire(self, now: float) -> None:
+        window = self.config.dedupe_window_sec
+        while self._recent and (now - self._recent[0][0] > window or len(self._recent) > self.config.max_recent):
+            self._recent.popleft()
+        while self._jamo_ts and now - self._jamo_ts[0] > self.config.jamo_window_sec:
+            self._jamo_ts.popleft()
+
+    def _rate_ok(self, user_key: str, now: float) -> bool:
+        cap = float(self.config.user_rate_capacity)
+        if cap <= 0 or not user_key:
+            return True
+        tokens, last = self._buckets.get(user_key, (cap, now))
+        tokens = min(cap, tokens + (now - last) * self.config.user_rate_per_sec)
+        if tokens < 1.0:
+            self._buckets[user_key] = (tokens, now)
+            return False
+        self._buckets[user_key] = (tokens - 1.0, now)
+        if len(self._buckets) > 5000:
+            # 오래 조용한 사용자 버킷 정리 (가득 찬 버킷은 기본값과 같음)
+            stale = [u for u, (_, ts) in self._buckets.items() if now - ts > cap / max(self.config.user_rate_per_sec, 1e-6)]
+            for u in stale:
+                del self._buckets[u]
+        return True
+
+    def check(self, msg: ChatMessage, now: Optional[float] = None, exempt_user_id: Optional[str] = None) -> PrefilterResult:
+        """
+        exempt_user_id: 이 사용자의 채팅은 스팸 검사만 하고 중복·자모 도배·속도 제한을 건너뜀
+        (타로 asking_question/selecting 단계의 요청자).
+        """
+        now = time.monotonic() if now is None else now
+        prio = classify_priority(msg, self.channel_id)
+        # 스팸 규칙(같은 문자 10번 이상 등)은 반복 축약 전 원문에 적용해야 걸림
+        if prio > PRIORITY_STREAMER and not self.parser.filter(msg):
+            return self._reject(msg, "blocked")
+
+        if prio <= PRIORITY_STREAMER:
+            return self._accept(msg)
+        collapsed = collapse_runs(msg.message or "")
+        if collapsed != msg.message:
+            msg = dataclasses.replace(msg, message=collapsed)
+        if exempt_user_id and str(getattr(msg, "user_id", None) or "") == str(exempt_user_id):
+            return self._accept(msg)
+
+        self._expire(now)
+        text = msg.message or ""
+        if _JAMO_ONLY.match(text):
+            if len(self._jamo_ts) >= self.config.jamo_max_per_window:
+                return self._reject(msg, "jamo_flood")
+            self._jamo_ts.append(now)
+
+        norm = normalize_for_dedupe(text)
+        if norm:
+            for _, prev_norm, _ in self._recent:
+                if prev_norm == norm:
+                    return self._reject(msg, "duplicate")
+            if len(norm) >= self.config.near_duplicate_min_len:
+                sig = minhash_signature(norm)
+                for _, _, prev_sig in self._recent:
+                    if prev_sig is not None and _similarity(sig, prev_sig) >= self.config.near_duplicate_threshold:
+                        return self._reject(msg, "near_duplicate")
+            else:
+                sig = None
+        else:
+            sig = None
+
+        user_key = str(getattr(msg, "user_id", None) or getattr(msg, "user", None) or "")
+        if not self._rate_ok(user_key, now):
+            return self._reject(msg, "rate_limited")
+
+        self._recent.append((now, norm, sig))
+        return self._accept(msg)
+
+    def _accept(self, msg: ChatMessage) -> PrefilterResult:
+        metrics.incr("chat_prefilter.accepted")
+        return PrefilterResult(True, "ok", msg)
+
+    def _reject(self, msg: ChatMessage, reason: str) -> PrefilterResult:
+        metrics.incr(f"chat_prefilter.{reason}")
+        logger.debug("사전 필터 차단(%s): user=%s msg=%r", reason, msg.user, (msg.message or "")[:50])
+        return PrefilterResult(False, reason, msg)
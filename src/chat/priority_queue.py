@@ -0,0 +1,278 @@
+"""
+채팅 수신(on_message) → reply_worker 사이의 우선순위 큐.
+
+후원 > 방장 > 역할(매니저 등) > 일반 순으로 꺼내며, 클래스별 상한·에이징·배치 상한을 둔다.
+부하가 몰려도 LLM은 중요한 메시지부터 보고, 한 번에 넘기는 배치 크기는 제한된다.
+전체 상한(max_size)을 넘으면 shedding 정책으로 낮은 우선순위부터 버리고, 깊이·버림·대기 시간을 메트릭으로 남긴다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+from .shedding import SheddingPolicy, get_shedding_policy
+
+if TYPE_CHECKING:
+    from .batching import BatchPolicy
+
+logger = logging.getLogger(__name__)
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_DONATION = 0
+PRIORITY_STREAMER = 1
+PRIORITY_ROLE = 2
+PRIORITY_REGULAR = 3
+PRIORITY_NAMES = ("donation", "streamer", "role", "regular")
+
+# 클래스별 최대 대기 개수 (넘치면 해당 클래스에 shedding 정책 적용)
+DEFAULT_CLASS_CAPACITY: Dict[int, int] = {
+    PRIORITY_DONATION: 100,
+    PRIORITY_STREAMER: 50,
+    PRIORITY_ROLE: 100,
+    PRIORITY_REGULAR: 200,
+}
+DEFAULT_AGING_SEC = 15.0  # 이 시간만큼 기다릴 때마다 한 단계 승격 (일반 채팅 기아 방지)
+DEFAULT_MAX_BATCH = 20  # reply_batch 한 번에 넘길 최대 메시지 수
+DEFAULT_MAX_SIZE = 300  # 전체 대기 상한 (TTS 재생이 길어져도 메모리·프롬프트 크기 유한)
+_GAP_EWMA_ALPHA = 0.2  # 도착 간격 이동 평균 가중치 (배치 정책이 채팅 속도 추정에 사용)
+
+# 치지직 userRoleCode 중 일반 시청자 (역할 없음)
+_COMMON_ROLE_CODES = frozenset({"", "common_user", "none"})
+
+
+def classify_priority(msg: Any, channel_id: Optional[str] = None) -> int:
+    """ChatMessage → 우선순위 클래스. 후원은 user_badge='donation' (chzzk_client._on_donation_message)."""
+    badge = str(getattr(msg, "user_badge", None) or "").strip().lower()
+    if badge == "donation":
+        return PRIORITY_DONATION
+    uid = str(getattr(msg, "user_id", None) or "")
+    if badge == "streamer" or (uid and channel_id and uid == str(channel_id)):
+        return PRIORITY_STREAMER
+    if badge not in _COMMON_ROLE_CODES:
+        return PRIORITY_ROLE
+    return PRIORITY_REGULAR
+
+
+class PriorityChatQueue:
+    """
+    asyncio.Queue 대신 쓰는 우선순위 큐. 항목은 기존과 같은 (ChatMessage, overlay_id) 튜플.
+
+    - 클래스별 FIFO. 꺼낼 때는 (유효 우선순위, 도착 순)으로 가장 앞선 항목.
+    - 유효 우선순위 = 클래스 - (대기 시간 // aging_sec), 0 미만 없음.
+    - get_batch()는 첫 항목을 기다린 뒤 max_batch까지 우선순위 순으로 꺼냄.
+      BatchPolicy(src/chat/batching.py)를 넘기면 채팅 속도에 맞춰 잠깐 더 모은 뒤 토큰 예산 안에서 꺼냄.
+    - 클래스 상한 또는 전체 상한(max_size) 초과 시 shedding 정책(drop_oldest | sample | keep_last_per_user) 적용.
+      전체 상한은 가장 낮은 우선순위 클래스부터 버림. 더 높은 클래스만 차 있으면 새 메시지를 거부.
+    """
+
+    def __init__(
+        self,
+        channel_id: Optional[str] = None,
+        capacities: Optional[Dict[int, int]] = None,
+        aging_sec: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_size: Optional[int] = None,
+        shedding: Optional[SheddingPolicy] = None,
+    ):
+        self.channel_id = channel_id
+        self.capacities = dict(DEFAULT_CLASS_CAPACITY)
+        if capacities:
+            self.capacities.update(capacities)
+        self.aging_sec = float(aging_sec or os.environ.get("CHAT_QUEUE_AGING_SEC") or DEFAULT_AGING_SEC)
+        self.max_batch = int(max_batch or os.environ.get("CHAT_QUEUE_MAX_BATCH") or DEFAULT_MAX_BATCH)
+        self.max_size = int(max_size or os.environ.get("CHAT_QUEUE_MAX_SIZE") or DEFAULT_MAX_SIZE)
+        self.shedding = shedding or get_shedding_policy(os.environ.get("CHAT_QUEUE_SHED_POLICY"))
+        # 클래스별 deque of (enqueue_ts, seq, item)
+        self._queues: Dict[int, Deque[Tuple[float, int, Any]]] = {
+            p: deque() for p in range(len(PRIORITY_NAMES))
+        }
+        self._seq = 0
+        self._not_empty = asyncio.Event()
+        self._arrived = asyncio.Event()
+        self._last_arrival: Optional[float] = None
+        self._gap_ewma: Optional[float] = None
+        self.dropped: Dict[int, int] = {p: 0 for p in range(len(PRIORITY_NAMES))}
+
+    def qsize(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put_nowait(self, item: Tuple[Any, int]) -> None:
+        """(ChatMessage, overlay_id) 적재. 상한 초과 시 shedding 정책으로 하나를 버리거나 새 항목을 거부."""
+        msg = item[0] if isinstance(item, tuple) else item
+        prio = classify_priority(msg, self.channel_id)
+        self._seq += 1
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            self._gap_ewma = gap if self._gap_ewma is None else (1 - _GAP_EWMA_ALPHA) * self._gap_ewma + _GAP_EWMA_ALPHA * gap
+        self._last_arrival = now
+        entry = (now, self._seq, item)
+        q = self._queues[prio]
+        cap = self.capacities.get(prio, 0)
+        admit = True
+        if cap > 0 and len(q) >= cap:
+            admit = self._shed(prio, entry)
+        elif self.max_size > 0 and self.qsize() >= self.max_size:
+            admit = self._shed_global(prio, entry)
+        if admit:
+            q.append(entry)
+            self._not_empty.set()
+            self._arrived.set()
+        else:
+            self._record_drop(prio)
+        self._update_depth()
+
+    def _record_drop(self, prio: int) -> None:
+        self.dropped[prio] += 1
+        metrics.incr(f"chat_queue.dropped.{PRIORITY_NAMES[prio]}")
+        total = sum(self.dropped.values())
+        if total == 1 or total % 100 == 0:
+            logger.warning(
+                "채팅 큐 부하 차단(%s): 누적 버림 %d, 현재 %d개 대기 %s",
+                self.shedding.name,
+                total,
+                self.qsize(),
+                self.depth_by_class(),
+            )
+
+    def _shed(self, victim_prio: int, entry: Tuple[float, int, Any]) -> bool:
+        """victim_prio 클래스에 정책 적용. 버린 게 있으면 기록하고 새 항목 수용 여부 반환."""
+        q = self._queues[victim_prio]
+        before = len(q)
+        admit = self.shedding.shed(q, entry)
+        if len(q) < before:
+            self._record_drop(victim_prio)
+        return admit
+
+    def _shed_global(self, prio: int, entry: Tuple[float, int, Any]) -> bool:
+        for victim in range(len(PRIORITY_NAMES) - 1, prio - 1, -1):
+            vq = self._queues[victim]
+            if not vq:
+                continue
+            if victim == prio:
+                return self._shed(victim, entry)
+            # 더 낮은 클래스에서 버릴 때는 새 (더 중요한) 항목을 거부하지 않음
+            if not self._shed(victim, entry) and len(vq) > 0:
+                vq.popleft()
+                self._record_drop(victim)
+            return True
+        return False
+
+    def _update_depth(self) -> None:
+        metrics.set_gauge("chat_queue.depth", self.qsize())
+        for name, n in self.depth_by_class().items():
+            metrics.set_gauge(f"chat_queue.depth.{name}", n)
+
+    def _effective_priority(self, prio: int, enqueued: float, now: float) -> int:
+        if self.aging_sec <= 0:
+            return prio
+        return max(0, prio - int((now - enqueued) // self.aging_sec))
+
+    def _best_prio(self, now: float) -> Optional[int]:
+        best_key = None
+        best_prio = None
+        for prio, q in self._queues.items():
+            if not q:
+                continue
+            enqueued, seq, _ = q[0]
+            key = (self._effective_priority(prio, enqueued, now), prio, seq)
+            if best_key is None or key < best_key:
+                best_key, best_prio = key, prio
+        return best_prio
+
+    def _pop_best(self) -> Any:
+        now = time.monotonic()
+        best_prio = self._best_prio(now)
+        if best_prio is None:
+            raise asyncio.QueueEmpty
+        enqueued, _, item = self._queues[best_prio].popleft()
+        metrics.observe("chat_queue.age_sec", now - enqueued)
+        if self.empty():
+            self._not_empty.clear()
+        self._update_depth()
+        return item
+
+    def peek_nowait(self) -> Any:
+        """다음에 꺼낼 항목 (꺼내지 않음). 비어 있으면 None."""
+        best_prio = self._best_prio(time.monotonic())
+        return None if best_prio is None else self._queues[best_prio][0][2]
+
+    def peek_all(self) -> List[Any]:
+        """대기 중인 모든 항목 (순서 무관, 꺼내지 않음)."""
+        return [entry[2] for q in self._queues.values() for entry in q]
+
+    def mean_gap_sec(self) -> Optional[float]:
+        """최근 도착 간격 이동 평균(초). 도착이 두 번 미만이면 None."""
+        return self._gap_ewma
+
+    async def wait_not_empty(self) -> None:
+        while self.empty():
+            await self._not_empty.wait()
+
+    async def wait_arrival(self, timeout: float) -> bool:
+        """새 항목이 들어오거나 timeout이 지날 때까지 대기. 들어왔으면 True."""
+        self._arrived.clear()
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_nowait(self) -> Any:
+        """가장 우선순위 높은 항목. 비어 있으면 asyncio.QueueEmpty."""
+        return self._pop_best()
+
+    async def get(self) -> Any:
+        """항목이 들어올 때까지 대기 후 가장 우선순위 높은 항목 반환."""
+        while self.empty():
+            await self._not_empty.wait()
+        return self._pop_best()
+
+    async def get_batch(
+        self,
+        max_batch: Optional[int] = None,
+        policy: Optional["BatchPolicy"] = None,
+        is_busy: Optional[Callable[[], bool]] = None,
+    ) -> List[Any]:
+        """
+        첫 항목을 기다린 뒤, 우선순위 순으로 최대 max_batch개까지 꺼냄. 나머지는 다음 배치로.
+        policy가 있으면 그 정책대로 잠깐 더 모으고 토큰 예산 안에서 꺼냄 (is_busy: TTS 재생 중 여부).
+        """
+        limit = max(1, int(max_batch or self.max_batch))
+        if policy is not None:
+            return await policy.collect(self, limit, is_busy)
+        batch = [await self.get()]
+        while len(batch) < limit:
+            try:
+                batch.append(self._pop_best())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    def depth_by_class(self) -> Dict[str, int]:
+        return {PRIORITY_NAMES[p]: len(q) for p, q in self._queues.items()}
+
+    def oldest_age_sec(self) -> float:
+        """지금 대기 중인 메시지 중 가장 오래 기다린 시간(초)."""
+        heads = [q[0][0] for q in self._queues.values() if q]
+        return (time.monotonic() - min(heads)) if heads else 0.0
+
+    def stats(self) -> dict:
+        """큐 상태 요약 (로그·오버레이 메트릭용)."""
+        return {
+            "depth": self.qsize(),
+            "depth_by_class": self.depth_by_class(),
+            "dropped": {PRIORITY_NAMES[p]: n for p, n in self.dropped.items()},
+            "oldest_age_sec": round(self.oldest_age_sec(), 3),
+            "max_size": self.max_size,
+            "policy": self.shedding.name,
+        }
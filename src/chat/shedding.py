@@ -0,0 +1,91 @@
+"""
+채팅 큐가 가득 찼을 때 무엇을 버릴지 정하는 정책 (load shedding).
+
+각 정책은 shed(q, incoming)에서 q(클래스별 deque)의 항목 하나를 버리거나 incoming을 거부한다.
+deque 항목은 (enqueue_ts, seq, (ChatMessage, overlay_id)) 형식 (priority_queue.PriorityChatQueue).
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+from typing import Any, Deque, Optional, Tuple
+
+Entry = Tuple[float, int, Any]
+
+
+def _entry_user(entry: Entry) -> str:
+    item = entry[2]
+    msg = item[0] if isinstance(item, tuple) else item
+    return str(getattr(msg, "user_id", None) or getattr(msg, "user", None) or "")
+
+
+class SheddingPolicy:
+    """기본 인터페이스. incoming을 받아들이면 True (그 경우 q에서 하나를 이미 버린 상태)."""
+
+    name = "base"
+
+    def shed(self, q: Deque[Entry], incoming: Entry) -> bool:
+        raise NotImplementedError
+
+
+class DropOldestPolicy(SheddingPolicy):
+    """가장 오래된 메시지를 버리고 새 메시지를 받음 (기본)."""
+
+    name = "drop_oldest"
+
+    def shed(self, q: Deque[Entry], incoming: Entry) -> bool:
+        if q:
+            q.popleft()
+        return True
+
+
+class SamplePolicy(SheddingPolicy):
+    """저수지 표본: 기존 항목 + 새 항목 중 무작위 하나를 버려 도배 구간을 고르게 샘플링."""
+
+    name = "sample"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def shed(self, q: Deque[Entry], incoming: Entry) -> bool:
+        idx = self._rng.randrange(len(q) + 1)
+        if idx == len(q):
+            return False
+        del q[idx]
+        return True
+
+
+class KeepLastPerUserPolicy(SheddingPolicy):
+    """같은 사람이 여러 개 쌓였으면 그 사람의 가장 오래된 것부터 버림. 중복이 없으면 가장 오래된 것."""
+
+    name = "keep_last_per_user"
+
+    def shed(self, q: Deque[Entry], incoming: Entry) -> bool:
+        if not q:
+            return True
+        new_user = _entry_user(incoming)
+        counts = Counter(_entry_user(e) for e in q)
+        if new_user:
+            counts[new_user] += 1
+        user, n = counts.most_common(1)[0] if counts else ("", 0)
+        if n > 1 and user:
+            for i, e in enumerate(q):
+                if _entry_user(e) == user:
+                    del q[i]
+                    return True
+        q.popleft()
+        return True
+
+
+SHEDDING_POLICIES = {
+    DropOldestPolicy.name: DropOldestPolicy,
+    SamplePolicy.name: SamplePolicy,
+    KeepLastPerUserPolicy.name: KeepLastPerUserPolicy,
+}
+
+
+def get_shedding_policy(name: Optional[str]) -> SheddingPolicy:
+    """이름(.env CHAT_QUEUE_SHED_POLICY)으로 정책 생성. 모르는 이름이면 drop_oldest."""
+    cls = SHEDDING_POLICIES.get((name or "").strip().lower(), DropOldestPolicy)
+    return cls()
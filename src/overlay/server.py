@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import logging
+import re
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
@@ -14,6 +15,9 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from src.overlay.state import overlay_state
+from src.overlay.tarot_atlas import load_atlas_index
+from src.overlay.tarot_deck import TAROT_CARD_IDS
+from src.utils.metrics import metrics
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 _TAROT_ASSETS = _PROJECT_ROOT / "assets" / "tarot"
@@ -21,8 +25,29 @@ _TAROT_ASSETS = _PROJECT_ROOT / "assets" / "tarot"
 logger = logging.getLogger(__name__)
 app = FastAPI(title="AIsChoco Overlay", docs_url=None, redoc_url=None)
 
+# 파일명에 내용 해시가 있는 파일(아틀라스 시트)은 내용이 절대 안 바뀜
+_HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.[a-z0-9]+$")
+
+
+class _CachedStaticFiles(StaticFiles):
+    """타로 이미지용 StaticFiles. OBS 브라우저가 카드 이미지를 매번 다시 받지 않게 캐시 헤더를 붙임."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            name = path.replace("\\", "/").rsplit("/", 1)[-1]
+            if _HASHED_ASSET.search(name):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            elif name.endswith(".json"):
+                response.headers["Cache-Control"] = "no-cache"
+            else:
+                # 카드별 PNG는 URL에 버전이 없어 교체될 수 있음 → 하루
+                response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
+
 if _TAROT_ASSETS.is_dir():
-    app.mount("/tarot-assets", StaticFiles(directory=str(_TAROT_ASSETS)), name="tarot_assets")
+    app.mount("/tarot-assets", _CachedStaticFiles(directory=str(_TAROT_ASSETS)), name="tarot_assets")
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +71,14 @@ def get_state():
     })
 
 
+@app.get("/api/metrics")
+def get_metrics():
+    """채팅 큐 깊이·버림·대기 시간 등 런타임 메트릭."""
+    snap = metrics.snapshot()
+    snap["chat_queue"] = overlay_state.get("chat_queue_stats")
+    return JSONResponse(snap)
+
+
 @app.post("/api/toggle_streamer_chat")
 def toggle_streamer_chat():
     cur = bool(overlay_state.get("ignore_streamer_chat"))
@@ -61,6 +94,15 @@ def clear_chat():
     return JSONResponse({"ok": True})
 
 
+@app.get("/api/tarot/assets")
+def get_tarot_assets():
+    """오버레이 프리로드용: 빌드된 아틀라스 인덱스(없으면 null)와 카드 id 목록."""
+    return JSONResponse(
+        {"atlas": load_atlas_index(_TAROT_ASSETS), "cards": TAROT_CARD_IDS},
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @app.post("/api/tarot/clear")
 def clear_tarot():
     overlay_state["tarot"] = None
@@ -0,0 +1,136 @@
+"""
+타로 카드 이미지 스프라이트 아틀라스 (WebP) 빌드 + 인덱스 읽기.
+
+카드 앞면 156장(정방 78 + 역방 78)과 뒷면을 축소해 WebP 시트 몇 장에 모으고,
+assets/tarot/atlas/atlas.json 에 id → (시트, x, y) 인덱스를 저장한다.
+/tarot 오버레이는 페이지 로드 때 시트를 미리 받아 디코드해 두고, 공개 애니메이션에서는
+background-position 만 바꿔서 카드를 그린다 (공개 순간 디스크 읽기·PNG 디코드 없음).
+
+시트 파일명에는 내용 해시가 들어가므로 서버는 immutable 캐시 헤더를 보낸다.
+빌드: python examples/build_tarot_atlas.py  (Pillow 필요)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.overlay.tarot_deck import TAROT_CARD_IDS
+
+logger = logging.getLogger(__name__)
+
+TAROT_ASSETS_DIR = Path(__file__).resolve().parent.parent.parent / "assets" / "tarot"
+ATLAS_DIRNAME = "atlas"
+ATLAS_INDEX_NAME = "atlas.json"
+ATLAS_SHEET_PREFIX = "tarot_atlas_"
+
+DEFAULT_CARD_SIZE = (256, 384)  # 원본 512x768의 절반. 오버레이 카드(140x230)를 HiDPI에서도 선명하게
+DEFAULT_COLUMNS = 8
+DEFAULT_ROWS = 5  # 시트당 40장 → 2048x1920
+DEFAULT_QUALITY = 85
+
+BACK_FRAME = "back"
+
+
+def frame_sources(assets_dir: Union[Path, str] = TAROT_ASSETS_DIR) -> List[Tuple[str, Path]]:
+    """아틀라스에 넣을 (프레임 이름, 원본 경로). 프레임 이름: <id>, <id>_r(역방), back."""
+    assets_dir = Path(assets_dir)
+    out = [(BACK_FRAME, assets_dir / "tarot_back.png")]
+    for cid in TAROT_CARD_IDS:
+        out.append((cid, assets_dir / f"tarot_{cid}.png"))
+        out.append((f"{cid}_r", assets_dir / "reverse" / f"tarot_{cid}_r.png"))
+    return out
+
+
+def build_atlas(
+    assets_dir: Union[Path, str] = TAROT_ASSETS_DIR,
+    out_dir: Optional[Union[Path, str]] = None,
+    card_size: Tuple[int, int] = DEFAULT_CARD_SIZE,
+    columns: int = DEFAULT_COLUMNS,
+    rows: int = DEFAULT_ROWS,
+    quality: int = DEFAULT_QUALITY,
+) -> Dict:
+    """
+    카드 이미지를 WebP 시트로 묶고 atlas.json 을 쓴다. 반환값은 인덱스 dict.
+    원본이 없는 프레임은 건너뛰고(오버레이가 개별 PNG로 대체) 경고만 남긴다.
+    이전 빌드의 시트 파일은 새 시트를 쓴 뒤 지운다.
+    """
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise RuntimeError("아틀라스 빌드에는 Pillow가 필요합니다: pip install Pillow") from e
+
+    assets_dir = Path(assets_dir)
+    out_dir = Path(out_dir) if out_dir else assets_dir / ATLAS_DIRNAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cw, ch = card_size
+    per_sheet = columns * rows
+
+    sources = []
+    for name, path in frame_sources(assets_dir):
+        if path.is_file():
+            sources.append((name, path))
+        else:
+            logger.warning("아틀라스: 원본 없음, 건너뜀 %s", path)
+
+    frames: Dict[str, List[int]] = {}
+    sheets: List[Dict] = []
+    for sheet_idx, start in enumerate(range(0, len(sources), per_sheet)):
+        chunk = sources[start:start + per_sheet]
+        used_rows = (len(chunk) + columns - 1) // columns
+        sheet_w, sheet_h = cw * min(columns, len(chunk)), ch * used_rows
+        sheet = Image.new("RGBA", (sheet_w, sheet_h), (0, 0, 0, 0))
+        for i, (name, path) in enumerate(chunk):
+            x, y = (i % columns) * cw, (i // columns) * ch
+            with Image.open(path) as img:
+                sheet.paste(img.convert("RGBA").resize((cw, ch), Image.LANCZOS), (x, y))
+            frames[name] = [sheet_idx, x, y]
+        buf = io.BytesIO()
+        sheet.save(buf, format="WEBP", quality=quality, method=6)
+        data = buf.getvalue()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        filename = f"{ATLAS_SHEET_PREFIX}{sheet_idx}.{digest}.webp"
+        (out_dir / filename).write_bytes(data)
+        sheets.append({"file": filename, "w": sheet_w, "h": sheet_h, "bytes": len(data)})
+
+    index = {"version": 1, "card": {"w": cw, "h": ch}, "sheets": sheets, "frames": frames}
+    tmp = out_dir / (ATLAS_INDEX_NAME + ".tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(out_dir / ATLAS_INDEX_NAME)
+
+    keep = {s["file"] for s in sheets}
+    for old in out_dir.glob(f"{ATLAS_SHEET_PREFIX}*.webp"):
+        if old.name not in keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return index
+
+
+_index_cache: Tuple[float, Optional[Dict]] = (-1.0, None)
+
+
+def load_atlas_index(assets_dir: Union[Path, str] = TAROT_ASSETS_DIR) -> Optional[Dict]:
+    """빌드된 atlas.json (없거나 깨졌으면 None). 파일 mtime이 같으면 다시 읽지 않음."""
+    global _index_cache
+    path = Path(assets_dir) / ATLAS_DIRNAME / ATLAS_INDEX_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    if _index_cache[0] == mtime:
+        return _index_cache[1]
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(index, dict) or "frames" not in index or "sheets" not in index:
+            index = None
+    except (OSError, ValueError) as e:
+        logger.warning("아틀라스 인덱스 읽기 실패 %s: %s", path, e)
+        index = None
+    _index_cache = (mtime, index)
+    return index
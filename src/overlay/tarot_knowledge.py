@@ -0,0 +1,167 @@
+"""
+78장 타로 카드 의미 요약 (정/역방향, 키워드, 수트·원소).
+
+키는 tarot_deck.TAROT_CARD_IDS 와 같음. 해석 프롬프트에 뽑힌 카드 줄만 넣어
+LLM이 카드 의미를 처음부터 풀어 쓰지 않고 질문에 맞춘 종합 해석만 하게 한다.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.overlay.tarot_deck import TAROT_CARD_IDS
+
+
+@dataclass(frozen=True)
+class TarotCardInfo:
+    id: str
+    name: str  # 한국어 카드 이름
+    arcana: str  # "major" | "minor"
+    suit: str  # minor: cups/pentacles/swords/wands, major: ""
+    element: str  # 물/흙/공기/불, major는 ""
+    keywords: Tuple[str, ...]
+    upright: str
+    reversed: str
+
+
+# id → (이름, 키워드, 정방향, 역방향)
+_MAJOR: Dict[str, Tuple[str, Tuple[str, ...], str, str]] = {
+    "fool": ("바보", ("시작", "자유", "모험"), "새로운 출발, 순수한 도전", "무모함, 준비 부족"),
+    "magician": ("마법사", ("의지", "능력", "실행"), "가진 재능으로 일을 현실로 만듦", "재능 낭비, 속임수"),
+    "high_priestess": ("여사제", ("직관", "비밀", "내면"), "직관을 믿고 드러나지 않은 것을 살핌", "숨은 의도, 직관을 무시함"),
+    "empress": ("여황제", ("풍요", "돌봄", "창조"), "풍성한 결실과 안정된 애정", "과잉보호, 정체"),
+    "emperor": ("황제", ("권위", "질서", "책임"), "체계와 리더십으로 안정을 만듦", "독단, 통제욕"),
+    "hierophant": ("교황", ("전통", "가르침", "신뢰"), "조언자와 규칙을 따르면 좋음", "고정관념, 형식에 얽매임"),
+    "lovers": ("연인", ("사랑", "선택", "조화"), "마음이 맞는 관계, 중요한 선택", "불화, 가치관 충돌"),
+    "chariot": ("전차", ("전진", "승리", "추진력"), "의지로 밀고 나가 승리함", "방향 상실, 조급함"),
+    "strength": ("힘", ("용기", "인내", "부드러운 힘"), "침착함으로 어려움을 다스림", "자신감 부족, 감정 폭발"),
+    "hermit": ("은둔자", ("성찰", "탐구", "고독"), "혼자 돌아보며 답을 찾음", "고립, 외로움"),
+    "wheel_of_fortune": ("운명의 수레바퀴", ("전환점", "기회", "흐름"), "흐름이 바뀌며 기회가 옴", "불운, 타이밍 어긋남"),
+    "justice": ("정의", ("공정", "균형", "판단"), "합당한 결과, 공정한 결정", "불공정, 책임 회피"),
+    "hanged_man": ("매달린 사람", ("멈춤", "관점 전환", "희생"), "잠시 멈추고 다르게 바라봄", "지연, 헛된 희생"),
+    "death": ("죽음", ("끝", "변화", "재시작"), "한 단계를 마무리하고 새로 시작", "변화 거부, 미련"),
+    "temperance": ("절제", ("균형", "조화", "회복"), "서두르지 않고 조율함", "불균형, 과함"),
+    "devil": ("악마", ("집착", "유혹", "속박"), "끊기 어려운 욕망이나 관계", "속박에서 벗어남"),
+    "tower": ("탑", ("붕괴", "충격", "각성"), "갑작스러운 변화로 낡은 틀이 무너짐", "위기 모면, 변화 지연"),
+    "star": ("별", ("희망", "치유", "영감"), "회복과 밝은 전망", "실망, 자신감 저하"),
+    "moon": ("달", ("불안", "혼란", "무의식"), "불확실함 속에서 직감을 따름", "오해가 풀림, 진실이 드러남"),
+    "sun": ("태양", ("성공", "기쁨", "활력"), "밝은 성취와 긍정", "일시적 침체, 과신"),
+    "judgement": ("심판", ("부활", "결단", "소명"), "과거를 정리하고 새로 깨어남", "자기 의심, 결정을 미룸"),
+    "world": ("세계", ("완성", "성취", "통합"), "목표 달성과 마무리", "미완성, 마지막 한 걸음 부족"),
+}
+
+# 수트 → (이름, 원소, 영역)
+_SUITS: Dict[str, Tuple[str, str, str]] = {
+    "cups": ("컵", "물", "감정·관계"),
+    "pentacles": ("펜타클", "흙", "돈·일·현실"),
+    "swords": ("소드", "공기", "생각·갈등"),
+    "wands": ("완드", "불", "열정·행동"),
+}
+_RANK_NAMES = {"1": "에이스", "page": "페이지", "knight": "기사", "queen": "여왕", "king": "왕"}
+
+# 수트별 순위(1~10, page, knight, queen, king) → (정방향, 역방향). 정방향 앞부분을 키워드로 씀
+_MINOR: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "cups": (
+        ("새 감정, 사랑의 시작", "감정이 막힘"),
+        ("마음이 통하는 관계, 파트너십", "오해, 관계 불균형"),
+        ("축하, 우정, 모임", "과한 유흥, 삼각관계"),
+        ("권태, 무관심", "새로운 관심, 다시 눈뜸"),
+        ("상실, 후회", "회복, 받아들임"),
+        ("추억, 옛 인연", "과거에 머묾"),
+        ("환상, 많은 선택지", "현실 직시, 선택 정리"),
+        ("떠남, 더 나은 것 찾기", "미련, 떠날지 망설임"),
+        ("소원 성취, 만족", "욕심, 허영"),
+        ("가정의 행복, 정서적 완성", "가족 불화, 기대와 다른 현실"),
+        ("감성적인 소식, 설렘", "감정 미숙, 변덕"),
+        ("로맨틱한 제안, 이상 추구", "비현실적 기대, 변심"),
+        ("공감, 따뜻한 배려", "감정 과잉, 의존"),
+        ("감정 조절, 너그러움", "감정 억압, 조종"),
+    ),
+    "pentacles": (
+        ("새 수입, 물질적 기회", "기회를 놓침, 계획 부실"),
+        ("균형 잡기, 유연한 대처", "과부하, 우선순위 혼란"),
+        ("협업, 실력 인정", "팀워크 부족, 대충함"),
+        ("절약, 지키기", "인색함, 집착"),
+        ("궁핍, 소외", "회복 시작, 도움을 받음"),
+        ("나눔, 도움을 주고받음", "불공정한 거래, 빚"),
+        ("인내, 중간 점검", "조급함, 성과 부진"),
+        ("숙련, 성실한 노력", "반복에 지침, 완벽주의"),
+        ("자립, 여유, 풍요", "과소비, 겉치레"),
+        ("재산, 장기적 안정", "재정 분쟁, 기반이 흔들림"),
+        ("배움, 성실한 새 계획", "게으름, 실천 부족"),
+        ("꾸준함, 책임감", "정체, 지나친 신중"),
+        ("실속, 현실적인 돌봄", "일과 생활의 불균형"),
+        ("부, 안정된 성공", "물질 집착, 고집"),
+    ),
+    "swords": (
+        ("명확한 판단, 돌파", "혼란, 잘못된 판단"),
+        ("결정 보류, 교착", "결단, 정보 과부하"),
+        ("상처, 이별의 아픔", "회복, 아픔을 놓아줌"),
+        ("휴식, 재정비", "번아웃, 쉬지 못함"),
+        ("갈등, 이기적인 승리", "화해, 갈등을 끝냄"),
+        ("이동, 힘든 시기를 벗어남", "벗어나지 못함, 미해결"),
+        ("전략, 몰래 함", "들통남, 양심의 가책"),
+        ("제약, 스스로 묶임", "해방, 새 관점"),
+        ("불안, 걱정, 불면", "걱정이 걷힘"),
+        ("바닥, 끝남", "회복 시작, 최악은 지남"),
+        ("호기심, 정보 수집", "험담, 성급한 말"),
+        ("빠른 행동, 직진", "무모함, 충돌"),
+        ("냉철함, 독립", "냉담, 날카로운 말"),
+        ("논리, 공정한 판단", "독선, 권력 남용"),
+    ),
+    "wands": (
+        ("열정의 시작, 영감", "의욕 저하, 지연"),
+        ("계획, 미래 구상", "망설임, 계획 부족"),
+        ("확장, 기회를 기다림", "지연, 기대가 어긋남"),
+        ("축하, 안정된 기반", "불안정, 갈등 있는 축하"),
+        ("경쟁, 의견 충돌", "갈등 회피, 합의"),
+        ("승리, 인정받음", "자만, 인정 부족"),
+        ("방어, 입장 지키기", "지침, 포기"),
+        ("빠른 진행, 좋은 소식", "지연, 엇갈림"),
+        ("끈기, 경계", "지침, 방어적 태도"),
+        ("과중한 짐, 책임", "짐 내려놓기, 과로"),
+        ("새 소식, 열정적 탐색", "조급함, 산만함"),
+        ("모험, 추진력", "충동, 성급함"),
+        ("자신감, 카리스마", "질투, 고집"),
+        ("비전, 리더십", "독단, 과한 기대"),
+    ),
+}
+_MINOR_RANKS = [str(i) for i in range(1, 11)] + ["page", "knight", "queen", "king"]
+
+
+def _build_index() -> Dict[str, TarotCardInfo]:
+    index: Dict[str, TarotCardInfo] = {}
+    for cid, (name, keywords, up, rev) in _MAJOR.items():
+        index[cid] = TarotCardInfo(cid, name, "major", "", "", keywords, up, rev)
+    for suit, meanings in _MINOR.items():
+        suit_name, element, domain = _SUITS[suit]
+        for rank, (up, rev) in zip(_MINOR_RANKS, meanings):
+            cid = f"{suit}_{rank}"
+            name = f"{suit_name} {_RANK_NAMES.get(rank, rank)}"
+            keywords = tuple(k.strip() for k in up.split(",")[:2]) + (domain,)
+            index[cid] = TarotCardInfo(cid, name, "minor", suit, element, keywords, up, rev)
+    return index
+
+
+TAROT_KNOWLEDGE: Dict[str, TarotCardInfo] = _build_index()
+assert set(TAROT_KNOWLEDGE) == set(TAROT_CARD_IDS), "타로 지식 항목이 덱 id와 다름"
+
+
+def get_card_info(card_id: str) -> Optional[TarotCardInfo]:
+    return TAROT_KNOWLEDGE.get(card_id)
+
+
+def describe_cards(cards: List[dict]) -> str:
+    """뽑힌 카드들(build_deck 항목)을 프롬프트용 한 줄씩 요약. 뽑힌 방향의 의미만 넣음."""
+    lines = []
+    for pos, card in enumerate(cards, 1):
+        info = get_card_info(card.get("id", ""))
+        if info is None:
+            continue
+        rev = bool(card.get("reversed"))
+        meaning = info.reversed if rev else info.upright
+        element = f", {info.element}" if info.element else ""
+        lines.append(
+            f"{pos}. {info.name} [{info.id}]({'역방향' if rev else '정방향'}{element}) "
+            f"키워드: {', '.join(info.keywords)} / 의미: {meaning}"
+        )
+    return "\n".join(lines)
@@ -6,6 +6,8 @@ from .tts_service import (
     TTS_BASE_MODELS,
     text_for_tts_numbers,
 )
+from .text_normalizer import normalize_for_tts
+from .audio_cache import AudioCache
 
 __all__ = [
     "TTSService",
@@ -13,4 +15,6 @@ __all__ = [
     "EMOTION_TO_INSTRUCT",
     "TTS_BASE_MODELS",
     "text_for_tts_numbers",
+    "normalize_for_tts",
+    "AudioCache",
 ]
@@ -0,0 +1,198 @@
+"""
+TTS 결과 음성 캐시 (내용 주소 기반).
+
+타로 종료 안내·대기 멘트·번호 재요청처럼 매번 똑같이 읽는 문장은 한 번 합성한 음성을 재사용한다.
+키 = (정규화한 텍스트, 감정, 참조 음성 해시, 모델 id 또는 원격 URL) 의 SHA-256.
+- 메모리: 최근 사용 순 LRU (numpy 배열 그대로)
+- 디스크: cache/tts_audio/<키>.wav. 재시작 후에도 유지되며 시작 시 prewarm으로 미리 채울 수 있음
+  읽을 때마다 mtime을 갱신해 삭제는 "오래 안 쓴 것부터". 상한을 TRIM_SLACK만큼 넘었을 때만 한 번에 정리.
+무엇을 저장할지는 TTSService가 정함 (고정 멘트만, 매번 다른 LLM 답변은 저장하지 않음).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ITEMS = 32
+DEFAULT_DISK_ITEMS = 500
+TRIM_SLACK = 0.1  # 상한의 10%를 넘겨야 정리 (put마다 디렉터리 전체를 훑지 않도록)
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_cache_text(text: str) -> str:
+    """캐시 키용 텍스트: 앞뒤 공백 제거, 연속 공백 하나로."""
+    return _SPACES.sub(" ", text or "").strip()
+
+
+def make_cache_key(text: str, emotion: str, ref_hash: str, model_id: str) -> str:
+    raw = "\x1f".join((normalize_cache_text(text), (emotion or "neutral").strip().lower(), ref_hash, model_id))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: Union[Path, str]) -> str:
+    """파일 내용 해시 (참조 음성용). 없으면 빈 문자열."""
+    path = Path(path)
+    if not path.exists():
+        return ""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AudioCache:
+    """메모리 LRU + 디스크 wav 저장소. 스레드 안전 (TTS는 asyncio.to_thread에서 호출됨)."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[Path, str]] = None,
+        max_memory_items: Optional[int] = None,
+        max_disk_items: Optional[int] = None,
+    ):
+        """
+        cache_dir: 디스크 저장 위치. 미지정 시 .env TTS_AUDIO_CACHE_DIR 또는 프로젝트/cache/tts_audio.
+        max_memory_items / max_disk_items: .env TTS_AUDIO_CACHE_MEMORY_ITEMS / TTS_AUDIO_CACHE_DISK_ITEMS. 0이면 해당 계층 끔.
+        """
+        env = os.environ
+        _env_dir = (env.get("TTS_AUDIO_CACHE_DIR") or "").strip() or None
+        if cache_dir is None:
+            cache_dir = _env_dir or Path(__file__).resolve().parent.parent.parent / "cache" / "tts_audio"
+        self.cache_dir = Path(cache_dir)
+        if max_memory_items is None:
+            max_memory_items = int(env.get("TTS_AUDIO_CACHE_MEMORY_ITEMS") or DEFAULT_MEMORY_ITEMS)
+        if max_disk_items is None:
+            max_disk_items = int(env.get("TTS_AUDIO_CACHE_DISK_ITEMS") or DEFAULT_DISK_ITEMS)
+        self.max_memory_items = max(0, max_memory_items)
+        self.max_disk_items = max(0, max_disk_items)
+        self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_count: Optional[int] = None  # 처음 저장할 때 한 번 세고 이후엔 직접 셈
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, key: str) -> Optional[Tuple[Any, int]]:
+        """(wav 배열, sample_rate) 또는 None. 디스크에서 찾으면 메모리로 올림."""
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+        if hit is not None:
+            self._touch(key)
+            return hit
+        if self.max_disk_items > 0:
+            path = self._disk_path(key)
+            if path.exists():
+                try:
+                    import soundfile as sf
+                    data, sr = sf.read(str(path), dtype="float32")
+                    entry = (data, int(sr))
+                    self._touch(key)
+                    self._remember(key, entry)
+                    with self._lock:
+                        self.hits += 1
+                    return entry
+                except Exception as e:
+                    logger.debug("음성 캐시 읽기 실패 %s: %s", path, e)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, wav: Any, sr: int) -> None:
+        if wav is None or len(wav) == 0:
+            return
+        entry = (wav, int(sr))
+        self._remember(key, entry)
+        if self.max_disk_items > 0:
+            try:
+                import soundfile as sf
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                path = self._disk_path(key)
+                is_new = not path.exists()
+                tmp = path.with_suffix(".tmp.wav")
+                sf.write(str(tmp), wav, int(sr))
+                os.replace(tmp, path)
+                if is_new:
+                    self._count_new_file()
+            except Exception as e:
+                logger.debug("음성 캐시 저장 실패: %s", e)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.max_disk_items > 0 and self._disk_path(key).exists()
+
+    def _remember(self, key: str, entry: Tuple[Any, int]) -> None:
+        if self.max_memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _touch(self, key: str) -> None:
+        """디스크 파일 mtime을 지금으로 (자주 쓰는 멘트가 정리 때 먼저 지워지지 않도록)."""
+        if self.max_disk_items <= 0:
+            return
+        try:
+            os.utime(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _disk_files(self) -> List[Path]:
+        try:
+            return [p for p in self.cache_dir.glob("*.wav") if not p.name.endswith(".tmp.wav")]
+        except OSError:
+            return []
+
+    def _count_new_file(self) -> None:
+        with self._lock:
+            if self._disk_count is None:
+                self._disk_count = len(self._disk_files())
+            else:
+                self._disk_count += 1
+            over = self._disk_count > self.max_disk_items + max(1, int(self.max_disk_items * TRIM_SLACK))
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """디스크 항목을 상한까지 줄임. 오래 안 쓴(mtime) 것부터 삭제."""
+        files = self._disk_files()
+        excess = len(files) - self.max_disk_items
+        removed = 0
+        if excess > 0:
+            def _mtime(p: Path) -> float:
+                try:
+                    return p.stat().st_mtime
+                except OSError:
+                    return 0.0
+
+            files.sort(key=_mtime)
+            for p in files[:excess]:
+                try:
+                    p.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_count = len(files) - removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._memory)}
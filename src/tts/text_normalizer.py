@@ -0,0 +1,185 @@
+"""
+TTS용 한국어 텍스트 정규화.
+
+미리 컴파일한 패턴 하나로 한 번만 훑으며(단일 패스) 토큰별로 읽기 표를 적용한다.
+- 채팅용 자모(ㅋㅎㄷㄷㅠㅜㅡ) 제거
+- N번(1~78) → "일 번"~"칠십팔 번", N개(1~10) → "한 개"~"열 개" (기존 text_for_tts_numbers와 동일 출력)
+- 확장: 그 밖의 숫자(한자어 읽기), 날짜, 전화번호, 금액("1000원 후원" → "천 원 후원"), 퍼센트,
+  고유어 단위(시·명·장·살 등), 영어 약어(AI → 에이아이)
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict
+
+from src.utils.korean_numerals import DIGIT_NAMES as _DIGIT_NAMES, read_digits, read_native_counter, read_sino
+
+# ----- 읽기 표 (수사 읽기는 src/utils/korean_numerals 공용) -----
+_MONTHS = ("", "일월", "이월", "삼월", "사월", "오월", "유월", "칠월", "팔월", "구월", "시월", "십일월", "십이월")
+
+_LETTER_NAMES: Dict[str, str] = {
+    "A": "에이", "B": "비", "C": "씨", "D": "디", "E": "이", "F": "에프", "G": "지",
+    "H": "에이치", "I": "아이", "J": "제이", "K": "케이", "L": "엘", "M": "엠", "N": "엔",
+    "O": "오", "P": "피", "Q": "큐", "R": "알", "S": "에스", "T": "티", "U": "유",
+    "V": "브이", "W": "더블유", "X": "엑스", "Y": "와이", "Z": "지",
+}
+# 글자 단위가 아니라 단어로 읽는 약어
+_ACRONYM_WORDS: Dict[str, str] = {
+    "OK": "오케이",
+    "NASA": "나사",
+    "UNESCO": "유네스코",
+    "ASAP": "에이셉",
+}
+
+
+def read_month(n: int) -> str:
+    return _MONTHS[n] if 1 <= n <= 12 else read_sino(n) + "월"
+
+
+def _to_int(s: str) -> int:
+    return int(s.replace(",", ""))
+
+
+def _read_number_token(s: str) -> str:
+    """일반 정수 토큰: 0으로 시작하는 여러 자리·아주 긴 수는 자리별, 나머지는 한자어."""
+    raw = s.replace(",", "")
+    if (len(raw) > 1 and raw.startswith("0")) or len(raw) > 20:
+        return read_digits(raw)
+    return read_sino(int(raw))
+
+
+# ----- 자모 제거 (기존 순서 유지: ㅋ, ㅎ → ㄷㄷ → ㅠ, ㅜ, ㅡ) -----
+_DROP_KH = str.maketrans("", "", "ㅋㅎ")
+_DROP_VOWELS = str.maketrans("", "", "ㅠㅜㅡ")
+_DD = re.compile("ㄷㄷ")
+_SPACES = re.compile(r"\s+")
+
+# ----- 단일 패스 토크나이저 -----
+_NUM = r"\d{1,3}(?:,\d{3})+|\d+"
+_TOKEN = re.compile(
+    r"(?P<phone>(?<!\d)0\d{1,2}-\d{3,4}-\d{4}(?!\d))"
+    r"|(?P<date>(?<!\d)(?P<y>\d{4})\s*[-./년]\s*(?P<m>\d{1,2})\s*[-./월]\s*(?P<d>\d{1,2})(?!\d)일?)"
+    r"|(?P<md>(?<!\d)(?P<m2>\d{1,2})\s*월\s*(?P<d2>\d{1,2})\s*일)"
+    r"|(?P<beon>(?<!\d)(?P<bn>\d+)\s*번)"
+    r"|(?P<gae>(?<!\d)(?P<gn>\d+)\s*개)"
+    rf"|(?P<won>(?<!\d)(?P<wn>{_NUM})\s*(?P<wu>만|억)?\s*원)"
+    r"|(?P<month>(?<!\d)(?P<mn>\d{1,2})\s*월)"
+    r"|(?P<native>(?<!\d)(?P<nn>\d{1,2})\s*(?P<nu>시간|시(?![즌작])|명|마리|살|잔|장|권|벌|그릇))"
+    r"|(?P<pct>(?<![\d.])(?P<pn>\d+(?:\.\d+)?)\s*%)"
+    r"|(?P<dec>(?<![\d.])(?P<di>\d+)\.(?P<df>\d+)(?![\d.])(?!\s*[번개]))"
+    rf"|(?P<num>(?<!\d)(?:{_NUM})(?!\d))"
+    r"|(?P<acr>(?<![A-Za-z])[A-Z]{2,6}(?![A-Za-z]))"
+)
+
+
+def _read_decimal(int_part: str, frac_part: str) -> str:
+    return f"{read_sino(int(int_part))} 점 {''.join(_DIGIT_NAMES[int(c)] for c in frac_part)}"
+
+
+def _sub_phone(m: re.Match) -> str:
+    return " ".join(read_digits(part) for part in m.group("phone").split("-"))
+
+
+def _sub_date(m: re.Match) -> str:
+    y, mo, d = int(m.group("y")), int(m.group("m")), int(m.group("d"))
+    return f"{read_sino(y)} 년 {read_month(mo)} {read_sino(d)} 일"
+
+
+def _sub_md(m: re.Match) -> str:
+    return f"{read_month(int(m.group('m2')))} {read_sino(int(m.group('d2')))} 일"
+
+
+def _sub_beon(m: re.Match) -> str:
+    n = int(m.group("bn"))
+    if len(m.group("bn")) > 1 and m.group("bn").startswith("0"):
+        return f"{read_digits(m.group('bn'))} 번"
+    return f"{read_sino(n)} 번"
+
+
+def _sub_gae(m: re.Match) -> str:
+    digits = m.group("gn")
+    n = int(digits)
+    kor = read_native_counter(n) if not digits.startswith("0") else None
+    return f"{kor or _read_number_token(digits)} 개"
+
+
+def _sub_won(m: re.Match) -> str:
+    n = _to_int(m.group("wn"))
+    unit = m.group("wu") or ""
+    if unit and n == 1:
+        return f"{unit} 원"
+    return f"{read_sino(n)}{unit} 원"
+
+
+def _sub_month(m: re.Match) -> str:
+    return read_month(int(m.group("mn")))
+
+
+def _sub_native(m: re.Match) -> str:
+    n = int(m.group("nn"))
+    unit = m.group("nu")
+    kor = read_native_counter(n) if not m.group("nn").startswith("0") else None
+    return f"{kor or read_sino(n)} {unit}"
+
+
+def _sub_pct(m: re.Match) -> str:
+    s = m.group("pn")
+    if "." in s:
+        i, f = s.split(".", 1)
+        return f"{_read_decimal(i, f)} 퍼센트"
+    return f"{read_sino(int(s))} 퍼센트"
+
+
+def _sub_dec(m: re.Match) -> str:
+    return _read_decimal(m.group("di"), m.group("df"))
+
+
+def _sub_num(m: re.Match) -> str:
+    return _read_number_token(m.group("num"))
+
+
+def _sub_acr(m: re.Match) -> str:
+    word = m.group("acr")
+    if word in _ACRONYM_WORDS:
+        return _ACRONYM_WORDS[word]
+    return "".join(_LETTER_NAMES[c] for c in word)
+
+
+_HANDLERS: Dict[str, Callable[[re.Match], str]] = {
+    "phone": _sub_phone,
+    "date": _sub_date,
+    "md": _sub_md,
+    "beon": _sub_beon,
+    "gae": _sub_gae,
+    "won": _sub_won,
+    "month": _sub_month,
+    "native": _sub_native,
+    "pct": _sub_pct,
+    "dec": _sub_dec,
+    "num": _sub_num,
+    "acr": _sub_acr,
+}
+
+
+def _dispatch(m: re.Match) -> str:
+    return _HANDLERS[m.lastgroup](m)
+
+
+def strip_chat_jamo(text: str) -> str:
+    """채팅용 자모 제거 + 공백 정리. 기존 re.sub 6회와 같은 결과."""
+    s = text.translate(_DROP_KH)
+    if "ㄷ" in s:
+        s = _DD.sub("", s)
+    s = s.translate(_DROP_VOWELS)
+    return _SPACES.sub(" ", s).strip()
+
+
+def normalize_for_tts(text: str) -> str:
+    """TTS 입력 정규화. 전부 채팅용 자모였으면 '.' 반환 (TTS에 넘기지 않는 대체)."""
+    if not text or not text.strip():
+        return text
+    s = strip_chat_jamo(text)
+    if not s:
+        return "."
+    return _TOKEN.sub(_dispatch, s)
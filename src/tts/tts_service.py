@@ -3,6 +3,8 @@ Qwen3-TTS Base 클로닝 래퍼. ref.wav(및 감정별 ref_emotion.wav)로 목
 
 감정에 따라 ref_happy.wav, ref_sad.wav 등이 있으면 해당 참조 사용, 없으면 ref.wav 사용.
 동일 emotion은 VTube 포즈 등 다른 모듈에서도 사용 가능.
+같은 문장·감정·참조 음성·모델 조합은 AudioCache(메모리 LRU + 디스크)에서 바로 꺼내 재생 (GPU·원격 호출 없음).
+캐시에 저장하는 건 고정 멘트(prewarm으로 등록했거나 cacheable=True)만. 매번 다른 LLM 답변은 찾아보기만 함.
 """
 
 from __future__ import annotations
@@ -10,10 +12,14 @@ from __future__ import annotations
 import io
 import os
 import logging
+import threading
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Iterable, Optional, Tuple, Union
 
 from src.ai.models import VALID_EMOTIONS
+from src.utils.metrics import metrics
+from .audio_cache import AudioCache, file_digest, make_cache_key, normalize_cache_text
+from .text_normalizer import normalize_for_tts
 
 logger = logging.getLogger(__name__)
 
@@ -33,47 +39,10 @@ def emotion_to_instruct(emotion: str) -> str:
     return EMOTION_TO_INSTRUCT.get(emotion.strip().lower(), "")
 
 
-# 1~78 한글 읽기 (TTS에서 1번→일 번, 78번→칠십팔 번으로 읽히도록)
-_NUM_KOR = (
-    "", "일", "이", "삼", "사", "오", "육", "칠", "팔", "구",
-    "십", "십일", "십이", "십삼", "십사", "십오", "십육", "십칠", "십팔", "십구",
-    "이십", "이십일", "이십이", "이십삼", "이십사", "이십오", "이십육", "이십칠", "이십팔", "이십구",
-    "삼십", "삼십일", "삼십이", "삼십삼", "삼십사", "삼십오", "삼십육", "삼십칠", "삼십팔", "삼십구",
-    "사십", "사십일", "사십이", "사십삼", "사십사", "사십오", "사십육", "사십칠", "사십팔", "사십구",
-    "오십", "오십일", "오십이", "오십삼", "오십사", "오십오", "오십육", "오십칠", "오십팔", "오십구",
-    "육십", "육십일", "육십이", "육십삼", "육십사", "육십오", "육십육", "육십칠", "육십팔", "육십구",
-    "칠십", "칠십일", "칠십이", "칠십삼", "칠십사", "칠십오", "칠십육", "칠십칠", "칠십팔",
-)
-_NUM_KOR_CNT = ("", "한", "두", "세", "네", "다섯", "여섯", "일곱", "여덟", "아홉", "열")
-
-
 def text_for_tts_numbers(text: str) -> str:
-    """TTS용: 채팅용 자모(ㅋㅎㄷㄷㅠㅜㅡ) 제거 후 '1번'→'일 번', '78번'→'칠십팔 번' 등 변환. TTS에만 이 결과를 넘기면 됨."""
-    if not text or not text.strip():
-        return text
-    import re
-    s = text
-    # TTS에서 이상하게 읽히는 채팅 용어 제거 (1개든 여러 개든 전부)
-    s = re.sub(r"ㅋ+", "", s)
-    s = re.sub(r"ㅎ+", "", s)
-    s = re.sub(r"ㄷㄷ", "", s)
-    s = re.sub(r"ㅠ+", "", s)
-    s = re.sub(r"ㅜ+", "", s)
-    s = re.sub(r"ㅡ+", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    if not s:
-        return "."  # 전부 채팅용 자모면 TTS에 넘기지 않고 짧은 대체
-    # N번 (1~78) → 한글 번 (긴 숫자부터 치환해 7번이 7번으로만 매칭되게)
-    for n in range(78, 0, -1):
-        if n < len(_NUM_KOR):
-            kor = _NUM_KOR[n]
-            s = re.sub(rf"(?<!\d){n}(?!\d)\s*번", f"{kor} 번", s)
-    # N개 (1~10) → 한/두/세 개
-    for n in range(10, 0, -1):
-        if n < len(_NUM_KOR_CNT):
-            kor = _NUM_KOR_CNT[n]
-            s = re.sub(rf"(?<!\d){n}(?!\d)\s*개", f"{kor} 개", s)
-    return s
+    """TTS용: 채팅용 자모(ㅋㅎㄷㄷㅠㅜㅡ) 제거 후 '1번'→'일 번', '78번'→'칠십팔 번', 금액·날짜·약어 등 읽기 변환.
+    TTS에만 이 결과를 넘기면 됨. 구현은 text_normalizer.normalize_for_tts (단일 패스)."""
+    return normalize_for_tts(text)
 
 
 def _default_ref_dir() -> Path:
@@ -104,6 +73,7 @@ class TTSService:
         hf_home: Optional[Union[Path, str]] = None,
         play_device: Optional[Union[int, str]] = None,
         tts_remote_url: Optional[str] = None,
+        audio_cache: Optional[AudioCache] = None,
     ):
         """
         model_size: "0.6B"(경량, VRAM 약 2GB) 또는 "1.7B"(품질·끝발음 개선, VRAM 약 4GB).
@@ -113,6 +83,7 @@ class TTSService:
         play_device: TTS 재생 출력 장치. VB-Cable 등으로 지정하면 VTS 립싱크 가능.
                      정수(장치 인덱스) 또는 문자열(장치 이름). .env TTS_OUTPUT_DEVICE 사용 가능.
         tts_remote_url: Colab 등 원격 TTS API URL. 지정 시 로컬 모델 대신 원격 호출. .env TTS_REMOTE_URL 사용 가능.
+        audio_cache: 합성 결과 캐시. 미지정 시 기본 AudioCache 생성, .env TTS_AUDIO_CACHE=0 이면 끔.
         """
         _env_url = (os.environ.get("TTS_REMOTE_URL") or "").strip() or None
         self.tts_remote_url = (tts_remote_url or _env_url or "").rstrip("/") or None
@@ -129,6 +100,12 @@ class TTSService:
             self.model_id = TTS_BASE_MODELS.get(model_size, TTS_BASE_MODELS["0.6B"])
         self.language = language
         self._model = None
+        self._model_lock = threading.Lock()  # prewarm 스레드와 응답 합성이 동시에 로드하지 않도록
+        if audio_cache is None and (os.environ.get("TTS_AUDIO_CACHE") or "1").strip() != "0":
+            audio_cache = AudioCache()
+        self.audio_cache = audio_cache
+        self._ref_digests: dict = {}  # ref 경로 → ((mtime, size), 해시)
+        self._cacheable_texts: set = set()  # prewarm으로 등록한 고정 멘트 (normalize_cache_text)
 
         if ref_text is not None and ref_text.strip():
             self.ref_text = ref_text.strip()
@@ -170,9 +147,59 @@ class TTSService:
         default_ref = self.ref_audio_dir / "ref.wav"
         return default_ref
 
+    def prepare_voice(self, emotion: str) -> Optional[Path]:
+        """
+        답변 문장보다 emotion이 먼저 정해졌을 때 부름 (스트리밍 답변). 참조 음성 고르기·캐시 키용 해시,
+        로컬 모델 로드를 답변 생성과 겹쳐 두어 synthesize가 바로 합성부터 하게 함.
+        원격 TTS거나 참조 음성이 없으면 None.
+        """
+        if self.tts_remote_url:
+            return None
+        ref_path = self._resolve_ref_audio(emotion)
+        if not ref_path.exists():
+            return None
+        if self.audio_cache is not None:
+            self._ref_digest(ref_path)
+        self._get_model()
+        return ref_path
+
+    def _ref_digest(self, ref_path: Path) -> str:
+        """참조 음성 + ref_text 해시. 파일이 바뀌면(mtime·크기) 다시 계산."""
+        try:
+            st = ref_path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return ""
+        cached = self._ref_digests.get(ref_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = file_digest(ref_path) + ":" + self.ref_text
+        self._ref_digests[ref_path] = (stamp, digest)
+        return digest
+
+    def _cache_lookup(self, key: Optional[str]) -> Optional[Tuple[list, int]]:
+        if self.audio_cache is None or key is None:
+            return None
+        hit = self.audio_cache.get(key)
+        if hit is None:
+            metrics.incr("tts.audio_cache.miss")
+            return None
+        metrics.incr("tts.audio_cache.hit")
+        return [hit[0]], hit[1]
+
+    def _cache_store(self, key: Optional[str], wavs: list, sr: int) -> None:
+        if self.audio_cache is not None and key is not None and wavs:
+            self.audio_cache.put(key, wavs[0], sr)
+
     def _get_model(self):
         if self._model is not None:
             return self._model
+        with self._model_lock:
+            if self._model is None:
+                self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
         import torch
         from qwen_tts import Qwen3TTSModel
 
@@ -186,8 +213,7 @@ class TTSService:
             load_kwargs["attn_implementation"] = "flash_attention_2"
         except ImportError:
             pass
-        self._model = Qwen3TTSModel.from_pretrained(self.model_id, **load_kwargs)
-        return self._model
+        return Qwen3TTSModel.from_pretrained(self.model_id, **load_kwargs)
 
     def _synthesize_remote(
         self,
@@ -225,9 +251,11 @@ class TTSService:
         text: str,
         emotion: str = "neutral",
         language: Optional[str] = None,
+        cacheable: bool = False,
     ) -> Tuple[list, int]:
         """
         텍스트를 클론 목소리로 변환. tts_remote_url 있으면 원격 API 호출, 없으면 로컬 모델 사용.
+        cacheable: 결과를 음성 캐시에 저장 (prewarm으로 등록한 멘트는 지정 안 해도 저장).
         Returns:
             (wavs, sample_rate): wavs[0]이 numpy 배열, sample_rate는 int.
         """
@@ -235,10 +263,19 @@ class TTSService:
             import numpy as np
             return [np.array([], dtype=np.float32)], 24000
 
+        text = text.strip()
+        lang = language or self.language
+        store = cacheable or normalize_cache_text(text) in self._cacheable_texts
         if self.tts_remote_url:
-            lang = language or self.language
-            wavs, sr = self._synthesize_remote(text.strip(), emotion, language=lang)
+            # 원격 서버가 참조 음성을 고르므로 URL을 모델 id 대신 키에 사용
+            remote_key = make_cache_key(text, emotion, "remote", f"{self.tts_remote_url}|{lang}")
+            cached = self._cache_lookup(remote_key)
+            if cached is not None:
+                return cached
+            wavs, sr = self._synthesize_remote(text, emotion, language=lang)
             if wavs and len(wavs[0]) > 0:
+                if store:
+                    self._cache_store(remote_key, wavs, sr)
                 return wavs, sr
             logger.warning("원격 TTS 실패, 로컬로 전환합니다.")
             # 세션 끊김 등으로 실패 시 로컬 폴백
@@ -253,16 +290,53 @@ class TTSService:
                 "ref_text가 비어 있습니다. ref_text.txt 에 참조 음성 원문을 적어주세요."
             )
 
+        key = None
+        if self.audio_cache is not None:
+            key = make_cache_key(text, emotion, self._ref_digest(ref_path), f"{self.model_id}|{lang}")
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                return cached
+
         model = self._get_model()
-        lang = language or self.language
         wavs, sr = model.generate_voice_clone(
-            text=text.strip(),
+            text=text,
             language=lang,
             ref_audio=str(ref_path),
             ref_text=self.ref_text,
         )
+        if store:
+            self._cache_store(key, wavs, sr)
         return wavs, sr
 
+    def prewarm(
+        self,
+        phrases: Iterable[str],
+        emotion: str = "neutral",
+        language: Optional[str] = None,
+    ) -> int:
+        """
+        자주 쓰는 고정 멘트를 미리 합성해 캐시에 넣음 (시작 시 백그라운드에서 호출).
+        phrases는 화면용 원문. 파이프라인과 같게 text_for_tts_numbers를 거쳐 합성. 새로 합성한 개수 반환.
+        등록한 멘트는 이후 synthesize에서도 캐시에 저장됨 (prewarm이 실패했어도 처음 읽을 때 채워짐).
+        """
+        if self.audio_cache is None:
+            return 0
+        done = 0
+        for phrase in phrases:
+            text = text_for_tts_numbers(phrase or "")
+            if not text.strip():
+                continue
+            self._cacheable_texts.add(normalize_cache_text(text))
+            try:
+                before = self.audio_cache.misses
+                self.synthesize(text, emotion=emotion, language=language, cacheable=True)
+                if self.audio_cache.misses > before:
+                    done += 1
+            except Exception as e:
+                logger.warning("TTS 캐시 미리 합성 실패 %r: %s", phrase[:30], e)
+        logger.info("TTS 캐시 미리 합성: %d개 새로 생성 %s", done, self.audio_cache.stats())
+        return done
+
     def _resolve_vb_cable_device(self):
         """출력 장치 목록에서 CABLE / VB-Audio 포함된 장치를 찾아 캐시. 립싱크용."""
         if self._resolved_play_device is not None:
@@ -1,5 +1,6 @@
 """유틸리티 모듈"""
 from .chzzk_auth import ChzzkAuth, ChzzkToken
 from .logging_config import setup_logging
+from .metrics import MetricsRegistry, metrics
 
-__all__ = ["ChzzkAuth", "ChzzkToken", "setup_logging"]
+__all__ = ["ChzzkAuth", "ChzzkToken", "setup_logging", "MetricsRegistry", "metrics"]
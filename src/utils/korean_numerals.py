@@ -0,0 +1,244 @@
+"""
+한국어 수사 ↔ 아라비아 숫자 공용 모듈.
+
+- 읽기 (숫자 → 한글): read_sino, read_native_counter, read_digits. TTS 정규화(src/tts/text_normalizer)가 사용.
+- 찾기 (한글 → 숫자): 트라이(trie)로 가장 긴 수사를 한 번에 찾고, 단어 경계를 확인해
+  "사랑", "오늘", "이제" 같은 일반 단어 속 글자는 숫자로 바꾸지 않는다. 타로 번호 파서가 사용.
+
+수사 사전은 1~99의 한자어(일~구십구)와 고유어(하나~아흔아홉, 열한·스물두 같은 관형형, 스무하나 같은 구어형).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# ----- 읽기 표 -----
+SINO_DIGITS = ("", "일", "이", "삼", "사", "오", "육", "칠", "팔", "구")
+_SINO_SMALL_UNITS = ("", "십", "백", "천")
+_SINO_BIG_UNITS = ("", "만", "억", "조", "경")
+DIGIT_NAMES = ("공", "일", "이", "삼", "사", "오", "육", "칠", "팔", "구")
+NATIVE_TENS = ("", "열", "스물", "서른", "마흔", "쉰", "예순", "일흔", "여든", "아흔")
+NATIVE_ONES = ("", "하나", "둘", "셋", "넷", "다섯", "여섯", "일곱", "여덟", "아홉")
+NATIVE_ONES_COUNTER = ("", "한", "두", "세", "네", "다섯", "여섯", "일곱", "여덟", "아홉")
+
+# 수사 바로 뒤에 붙어도 숫자로 보는 말 (번호·조사)
+NUMERAL_SUFFIXES = ("번", "이요", "요", "이랑", "랑", "하고", "과", "와", "으로", "로", "이고", "이에요", "예요", "입니다")
+# 수사로 시작하지만 숫자가 아닌 흔한 말 ("이번에", "이번 주")
+_NOT_NUMERAL_PREFIXES = ("이번에", "이번엔", "이번은", "이번주", "이번 주", "이번달", "이번 달", "이번도", "이번만")
+
+
+def read_sino(n: int) -> str:
+    """한자어 수 읽기. 0→영, 10→십, 11→십일, 10000→만, 1000→천."""
+    if n == 0:
+        return "영"
+    if n < 0:
+        return "마이너스 " + read_sino(-n)
+    parts = []
+    group_idx = 0
+    while n > 0:
+        n, group = divmod(n, 10000)
+        if group:
+            if group_idx >= len(_SINO_BIG_UNITS):
+                return read_digits(str(n * 10000 + group))
+            s = ""
+            for pos in range(3, -1, -1):
+                d = (group // (10 ** pos)) % 10
+                if d == 0:
+                    continue
+                if d == 1 and pos > 0:
+                    s += _SINO_SMALL_UNITS[pos]
+                else:
+                    s += SINO_DIGITS[d] + _SINO_SMALL_UNITS[pos]
+            big = _SINO_BIG_UNITS[group_idx]
+            if group == 1 and big == "만":
+                s = ""
+            parts.append(s + big)
+        group_idx += 1
+    return "".join(reversed(parts))
+
+
+def read_native_counter(n: int) -> Optional[str]:
+    """고유어 관형 수사 (단위 앞): 1→한, 2→두, 20→스무, 21→스물한. 1~99만, 범위 밖이면 None."""
+    if not 1 <= n <= 99:
+        return None
+    tens, ones = divmod(n, 10)
+    if tens == 2 and ones == 0:
+        return "스무"
+    return NATIVE_TENS[tens] + NATIVE_ONES_COUNTER[ones]
+
+
+def read_digits(digits: str) -> str:
+    """숫자를 한 자리씩 (전화번호·0으로 시작하는 수): 010 → 공일공."""
+    return "".join(DIGIT_NAMES[int(c)] for c in digits if c.isdigit())
+
+
+# ----- 수사 사전 + 트라이 -----
+@dataclass(frozen=True)
+class NumeralMatch:
+    start: int
+    end: int
+    value: int
+    word: str
+
+    @property
+    def bare_syllable(self) -> bool:
+        """한 글자 한자어(일, 이, 오 …). 지시어·감탄사와 헷갈리기 쉬움."""
+        return len(self.word) == 1 and self.word in _SINO_SET
+
+
+_SINO_SET = frozenset(SINO_DIGITS[1:])
+
+
+def _build_lexicon() -> Dict[str, int]:
+    lex: Dict[str, int] = {}
+    for n in range(1, 100):
+        lex[read_sino(n)] = n
+        tens, ones = divmod(n, 10)
+        if ones == 0:
+            lex[NATIVE_TENS[tens]] = n
+            continue
+        for tens_word in ((NATIVE_TENS[tens], "스무") if tens == 2 else (NATIVE_TENS[tens],)):
+            lex[tens_word + NATIVE_ONES[ones]] = n
+            if tens:
+                lex[tens_word + NATIVE_ONES_COUNTER[ones]] = n  # 열한, 스물두
+    lex["스무"] = 20
+    # 관형형 단독(한, 두, 세, 네)은 "한 번 더" 같은 뜻이라 넣지 않음
+    return lex
+
+
+LEXICON: Dict[str, int] = _build_lexicon()
+
+_END = ""  # 트라이 노드에서 값 저장용 키 (한 글자 키와 겹치지 않음)
+
+
+def _build_trie(lexicon: Dict[str, int]) -> dict:
+    root: dict = {}
+    for word, value in lexicon.items():
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[_END] = value
+    return root
+
+
+_TRIE = _build_trie(LEXICON)
+
+
+def prefix_matches(text: str, start: int = 0) -> List[Tuple[int, int]]:
+    """text[start:]의 앞부분과 일치하는 모든 수사 (끝 위치, 값). 짧은 것부터."""
+    out: List[Tuple[int, int]] = []
+    node = _TRIE
+    i = start
+    n = len(text)
+    while i < n:
+        node = node.get(text[i])
+        if node is None:
+            break
+        i += 1
+        if _END in node:
+            out.append((i, node[_END]))
+    return out
+
+
+def longest_match(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """가장 긴 수사 (끝 위치, 값) 또는 None."""
+    matches = prefix_matches(text, start)
+    return matches[-1] if matches else None
+
+
+# 단어 시작(앞이 한글 음절이 아님)이면서 수사 첫 글자인 위치만 트라이로 확인
+_CANDIDATE_START = re.compile("(?<![가-힣])[" + "".join(sorted(_TRIE)) + "]")
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+def _suffix_at(text: str, pos: int) -> bool:
+    return any(text.startswith(s, pos) for s in NUMERAL_SUFFIXES)
+
+
+_SEPARATORS = " \t\n,./~!?;·"
+
+
+def _has_neighbor(s: str, m: NumeralMatch, accepted: List[NumeralMatch], idx: int) -> bool:
+    """구분자만 사이에 두고 옆에 다른 수(아라비아 숫자 포함)가 있는지."""
+    left = s[:m.start].rstrip(_SEPARATORS)
+    if left and (left[-1].isdigit() or (idx > 0 and accepted[idx - 1].end == len(left))):
+        return True
+    right_pos = len(s) - len(s[m.end:].lstrip(_SEPARATORS))
+    if right_pos < len(s) and (s[right_pos].isdigit() or (idx + 1 < len(accepted) and accepted[idx + 1].start == right_pos)):
+        return True
+    return False
+
+
+def find_numerals(text: str) -> List[NumeralMatch]:
+    """
+    문장 속 한글 수사를 한 번 훑어 찾음 (가장 긴 일치 우선).
+
+    연달아 붙은 수사(일이삼, 하나다섯)는 한 묶음으로 보고, 묶음 앞은 단어 시작이어야 하며
+    묶음 뒤는 단어 끝이거나 번·요·랑 같은 조사여야 한다. 한 글자 한자어 하나만 있는 묶음은
+    뒤가 '번'이거나, 단어 끝이면서 옆에 다른 수가 있을 때만 인정 ("사랑", "오늘", "오 좋아요" 제외).
+    """
+    s = text or ""
+    out: List[NumeralMatch] = []
+    lone: List[bool] = []  # 옆 수 확인이 필요한 한 글자 묶음
+    n = len(s)
+    pos = 0
+    for start_m in _CANDIDATE_START.finditer(s):
+        i = start_m.start()
+        if i < pos or s.startswith(_NOT_NUMERAL_PREFIXES, i):
+            continue
+        chain: List[NumeralMatch] = []
+        j = i
+        while j < n:
+            m = longest_match(s, j)
+            if m is None:
+                break
+            chain.append(NumeralMatch(j, m[0], m[1], s[j:m[0]]))
+            j = m[0]
+        if not chain:
+            continue
+        at_end = j >= n or not _is_hangul(s[j])
+        if len(chain) == 1 and chain[0].bare_syllable:
+            if s.startswith("번", j):
+                out.append(chain[0])
+                lone.append(False)
+            elif at_end:
+                out.append(chain[0])
+                lone.append(True)
+            else:
+                continue
+        elif at_end or _suffix_at(s, j):
+            out.extend(chain)
+            lone.extend([False] * len(chain))
+        else:
+            continue
+        pos = j
+    if any(lone):
+        out = [m for k, m in enumerate(out) if not lone[k] or _has_neighbor(s, m, out, k)]
+    return out
+
+
+def korean_numerals_to_digits(text: str) -> str:
+    """한글 수사를 아라비아 숫자로 치환 (하나 다섯 십삼 → 1 5 13). 숫자 앞뒤에 공백을 둠."""
+    if not text or not text.strip():
+        return text
+    matches = find_numerals(text)
+    if not matches:
+        return text
+    parts: List[str] = []
+    last = 0
+    for m in matches:
+        parts.append(text[last:m.start])
+        parts.append(f" {m.value} ")
+        last = m.end
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def parse_numeral_word(word: str) -> Optional[int]:
+    """단어 전체가 수사면 값, 아니면 None (십삼 → 13, 스물하나 → 21)."""
+    return LEXICON.get(word)
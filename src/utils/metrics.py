@@ -0,0 +1,83 @@
+"""
+프로세스 내 경량 메트릭 (카운터·게이지·최근 관측값 요약).
+
+reply_worker, GroqClient(스레드) 등 어디서든 기록하고, 오버레이 서버 /api/metrics 로 조회.
+외부 의존성 없이 최근 N개 관측값으로 p50/p95를 계산한다.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+DEFAULT_WINDOW = 512  # 요약(p50/p95)에 쓰는 최근 관측값 개수
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(math.ceil(q * len(sorted_values))) - 1))
+    return float(sorted_values[idx])
+
+
+class MetricsRegistry:
+    """스레드 안전 메트릭 저장소."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self._sample_counts: Dict[str, int] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            q = self._samples.get(name)
+            if q is None:
+                q = self._samples[name] = deque(maxlen=self.window)
+            q.append(float(value))
+            self._sample_counts[name] = self._sample_counts.get(name, 0) + 1
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """최근 관측값 기준 분위수. 관측 없으면 None."""
+        with self._lock:
+            values = sorted(self._samples.get(name) or ())
+        if not values:
+            return None
+        return _percentile(values, q)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            counts = dict(self._sample_counts)
+        summaries = {}
+        for name, values in samples.items():
+            if not values:
+                continue
+            summaries[name] = {
+                "count": counts.get(name, len(values)),
+                "p50": round(_percentile(values, 0.5), 4),
+                "p95": round(_percentile(values, 0.95), 4),
+                "max": round(values[-1], 4),
+            }
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+
+metrics = MetricsRegistry()